@@ -1,24 +1,87 @@
+import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS 
+from .bases import ENTETE_PRIMAIRE, SessionRoutage
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': SessionRoutage})
 
-def create_app():
+# En-têtes lisibles par le frontend d'une autre origine (CORS) : ETag, et date de lecture sur la
+# base principale qu'il renvoie après ses écritures (bases.ENTETE_PRIMAIRE) ; repris par app/asgi.py
+ENTETES_EXPOSES = ('ETag', ENTETE_PRIMAIRE)
+
+# Dossier des migrations Alembic (Back/migrations)
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+def create_app(config=None):
     app = Flask(__name__)
     app.config.from_object('config.Config')
+    # Valeurs remplaçant celles de config.Config (tests, outils)
+    app.config.update(config or {})
+
+    # Journal JSON non bloquant, identifiant et durée de chaque requête
+    from .journal import configurer_journal
+    configurer_journal(app)
 
-    # Initialiser SQLAlchemy
+    # Initialiser SQLAlchemy (pool de connexions et réplicas en lecture)
+    from .bases import configurer_bases
+    configurer_bases(app)
     db.init_app(app)
 
+    # Commandes "flask db" (Flask-Migrate chargé à la demande)
+    from .schema import CommandesMigration, mettre_a_jour_schema
+    app.cli.add_command(CommandesMigration(app, db, MIGRATIONS_DIR))
+
+    # Commandes "flask export" et "flask seed"
+    from .commandes import exporter_transactions, generer_donnees
+    app.cli.add_command(exporter_transactions)
+    app.cli.add_command(generer_donnees)
+
+    # Cache des entités lues par id
+    from .cache import creer_cache
+    app.extensions['cache_entites'] = creer_cache(app.config)
+
+    # Sérialisation JSON (orjson) et compression des réponses volumineuses ; exception non
+    # gérée par une route : 500 sans détail (la trace est journalisée par Flask)
+    from .serialisation import CORPS_ERREUR_INTERNE, OrjsonProvider, compresser_reponse
+    app.json = OrjsonProvider(app)
+    app.register_error_handler(500, lambda erreur: (CORPS_ERREUR_INTERNE, 500))
+    app.after_request(lambda response: compresser_reponse(
+        response, app.config['COMPRESS_MIN_SIZE'], app.config['COMPRESS_LEVEL']
+    ))
+
+    # Métriques des requêtes (/metrics, prometheus_client)
+    from .metriques import instrumenter_moteur
+
     # Configurer CORS avant d'enregistrer les routes
-    CORS(app)
+    CORS(app, expose_headers=list(ENTETES_EXPOSES))
 
     # Importer et enregistrer les routes
     from .routes import main
     app.register_blueprint(main)
-    # Créer les tables si elles n'existent pas
+    # Appliquer les migrations en attente (crée les tables si elles n'existent pas) ;
+    # si la version enregistrée en base est déjà la dernière, aucune DDL n'est exécutée
     with app.app_context():
-        db.create_all()
+        migre = mettre_a_jour_schema(app, db, MIGRATIONS_DIR)
+
+        # Clés étrangères appliquées par SQLite (suppressions en cascade)
+        from .bases import activer_cles_etrangeres
+        for moteur in db.engines.values():
+            activer_cles_etrangeres(moteur)
+
+        # Nombre et durée des requêtes SQL de chaque requête HTTP
+        for moteur in db.engines.values():
+            instrumenter_moteur(moteur)
+
+        # Données dérivées (compteurs du tableau de bord, cumuls journaliers, bénéfices) :
+        # construites depuis les tables après une migration, qui peut les avoir créées ; ensuite
+        # les écritures les tiennent à jour et le démarrage ne les relit pas
+        if migre:
+            from .compteurs import initialiser_compteurs
+            from .analytique import initialiser_volumes
+            from .benefices import initialiser_benefices
+            initialiser_compteurs()
+            initialiser_volumes()
+            initialiser_benefices()
 
     return app
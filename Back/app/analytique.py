@@ -0,0 +1,151 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, select, update
+
+from app import db
+from app.compteurs import slot_du_thread
+from app.models import Transaction, VolumeJournalier
+
+# Tailles de période acceptées par l'endpoint de statistiques
+PERIODES = ('jour', 'semaine', 'mois')
+
+
+def jour_de(valeur):
+    # func.date() renvoie une chaîne sous SQLite et une date sous PostgreSQL
+    if isinstance(valeur, str):
+        return date.fromisoformat(valeur[:10])
+    if isinstance(valeur, datetime):
+        return valeur.date()
+    return valeur
+
+
+def _cumuler(lignes, signe=1):
+    # Regroupe des lignes (date, montant FCFA, montant USDT, taux) par jour
+    cumuls = defaultdict(lambda: [0, 0, Decimal(0), 0])
+    for date_transaction, montant_fcfa, montant_usdt, taux in lignes:
+        cumul = cumuls[jour_de(date_transaction)]
+        cumul[0] += signe
+        cumul[1] += signe * int(montant_fcfa)
+        cumul[2] += signe * Decimal(str(montant_usdt))
+        cumul[3] += signe * int(taux)
+    return cumuls
+
+
+def _insert_avec_upsert(dialecte):
+    # insert() du dialecte s'il gère ON CONFLICT DO UPDATE, sinon None (import à la première
+    # écriture : pas de coût au démarrage)
+    if dialecte == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialecte == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+def ajuster_volumes(lignes, signe=1):
+    # Ajoute (signe=1) ou retire (signe=-1) des transactions des cumuls journaliers,
+    # dans la transaction en cours, sur la ligne (jour, slot du thread) : deux écritures
+    # concurrentes du même jour ne verrouillent en général pas la même ligne
+    insert = _insert_avec_upsert(db.engine.dialect.name)
+    table = VolumeJournalier.__table__
+    slot = slot_du_thread()
+    for jour, (nb, fcfa, usdt, taux) in _cumuler(lignes, signe).items():
+        if insert is not None:
+            # Upsert natif : pas de course entre deux premières transactions du même jour
+            statement = insert(table).values(
+                jour=jour, slot=slot, nb_transactions=nb, volume_FCFA=fcfa, volume_USDT=usdt, somme_taux=taux
+            )
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.jour, table.c.slot],
+                set_={
+                    'nb_transactions': table.c.nb_transactions + nb,
+                    'volume_FCFA': table.c.volume_FCFA + fcfa,
+                    'volume_USDT': table.c.volume_USDT + usdt,
+                    'somme_taux': table.c.somme_taux + taux,
+                }
+            ))
+            continue
+
+        resultat = db.session.execute(update(VolumeJournalier).filter_by(jour=jour, slot=slot).values(
+            nb_transactions=VolumeJournalier.nb_transactions + nb,
+            volume_FCFA=VolumeJournalier.volume_FCFA + fcfa,
+            volume_USDT=VolumeJournalier.volume_USDT + usdt,
+            somme_taux=VolumeJournalier.somme_taux + taux,
+        ))
+        if resultat.rowcount == 0:
+            db.session.add(VolumeJournalier(
+                jour=jour, slot=slot, nb_transactions=nb, volume_FCFA=fcfa, volume_USDT=usdt, somme_taux=taux
+            ))
+
+
+def initialiser_volumes():
+    # Construit les cumuls journaliers (slot 0) depuis les transactions si la table est vide
+    if db.session.query(VolumeJournalier.jour).first() is not None:
+        return
+
+    jour = func.date(Transaction.date_transaction)
+    lignes = db.session.execute(
+        select(
+            jour,
+            func.count(Transaction.id),
+            func.sum(Transaction.montant_FCFA),
+            func.sum(Transaction.montant_USDT),
+            func.sum(Transaction.taux_convenu),
+        ).where(Transaction.date_transaction.isnot(None)).group_by(jour)
+    ).all()
+
+    for valeur_jour, nb, fcfa, usdt, taux in lignes:
+        db.session.add(VolumeJournalier(
+            jour=jour_de(valeur_jour), nb_transactions=nb, volume_FCFA=fcfa, volume_USDT=usdt, somme_taux=taux
+        ))
+    db.session.commit()
+
+
+def debut_periode(jour, periode):
+    if periode == 'semaine':
+        return jour - timedelta(days=jour.weekday())  # Lundi de la semaine
+    if periode == 'mois':
+        return jour.replace(day=1)
+    return jour
+
+
+def volumes_par_periode(debut, fin, periode='jour'):
+    # Volumes par jour, semaine ou mois entre debut et fin inclus,
+    # calculés à partir des seuls cumuls journaliers (tous slots additionnés)
+    # Une suppression peut tomber sur un autre slot que l'ajout : seule la somme du jour a un sens
+    query = select(
+        VolumeJournalier.jour,
+        func.sum(VolumeJournalier.nb_transactions),
+        func.sum(VolumeJournalier.volume_FCFA),
+        func.sum(VolumeJournalier.volume_USDT),
+        func.sum(VolumeJournalier.somme_taux),
+    ).group_by(VolumeJournalier.jour).order_by(VolumeJournalier.jour)
+    if debut:
+        query = query.where(VolumeJournalier.jour >= debut)
+    if fin:
+        query = query.where(VolumeJournalier.jour <= fin)
+
+    periodes = {}
+    for jour, nb, fcfa, usdt, taux in db.session.execute(query):
+        if not nb:
+            continue
+        cle = debut_periode(jour_de(jour), periode)
+        totaux = periodes.setdefault(cle, [0, 0, Decimal(0), 0])
+        totaux[0] += int(nb)
+        totaux[1] += int(fcfa)
+        totaux[2] += Decimal(str(usdt))
+        totaux[3] += int(taux)
+
+    return [
+        {
+            "periode": cle.isoformat(),
+            "nb_transactions": nb,
+            "volume_FCFA": fcfa,
+            "volume_USDT": usdt,
+            "taux_moyen": round(taux / nb, 2),
+        }
+        for cle, (nb, fcfa, usdt, taux) in periodes.items()
+    ]
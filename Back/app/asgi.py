@@ -0,0 +1,417 @@
+import asyncio
+import logging
+import re
+import time
+from urllib.parse import parse_qsl
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import joinedload, selectinload
+from werkzeug.datastructures import Headers, MIMEAccept, MultiDict
+from werkzeug.http import parse_accept_header, parse_cookie, parse_etags
+
+from app import ENTETES_EXPOSES
+from app.bases import COOKIE_PRIMAIRE, ENTETE_PRIMAIRE, choisir_replique, lecture_primaire_demandee, options_moteur
+from app.cache import CacheMemoire, CacheNul, cle_beneficiaire, cle_fournisseur
+from app.compteurs import (
+    compteurs_en_cache, compteurs_lus, garder_compteurs, requete_compteurs, requete_versions, versions_lues,
+)
+from app.documents import (
+    document_beneficiaire, document_fournisseur, format_transactions, select_transactions, transaction_en_dict,
+)
+from app.etag import calculer_etag, etag_connu
+from app.journal import ecrire_ligne_requete, fermer_requete, ouvrir_requete
+from app.metriques import commencer_mesure, instrumenter_moteur, terminer_mesure
+from app.models import Beneficiaire, Fournisseur
+from app.pagination import DEFAULT_LIMIT, encode_cursor, parse_limit
+from app.serialisation import (
+    CORPS_ERREUR_INTERNE, TYPES_COMPRESSIBLES, compresser, encodage_accepte, encoder_json, ligne_ndjson,
+)
+
+logger = logging.getLogger(__name__)
+
+# Pilotes asynchrones par moteur de base de données
+PILOTES_ASYNC = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+# Taille des lots lus via le curseur serveur en mode streaming (comme la route Flask)
+STREAM_BATCH_SIZE = 1000
+
+# Vues asynchrones : (méthode, motif de l'URL, règle Flask de la même route, fonction) ; la règle
+# sert d'étiquette aux métriques et au journal. Les autres routes passent par Flask.
+VUES = []
+
+
+def vue(methode, regle):
+    # Motif de l'URL tiré de la règle Flask : seuls les paramètres <int:nom> sont utilisés
+    motif = re.compile(re.sub(r'<int:(\w+)>', r'(?P<\1>\\d+)', regle) + '$')
+
+    def decorateur(fonction):
+        VUES.append((methode, motif, regle, fonction))
+        return fonction
+    return decorateur
+
+
+def url_async(url):
+    # URL avec le pilote asynchrone correspondant (asyncpg, aiosqlite)
+    url = make_url(url)
+    return url.set(drivername=PILOTES_ASYNC.get(url.get_backend_name(), url.drivername))
+
+
+def creer_moteur_async(config, url):
+    url = make_url(url)
+    options = options_moteur(config, url)
+    # asyncpg ne connaît pas l'option "options" de libpq : statement_timeout via server_settings
+    if options.pop('connect_args', None):
+        options['connect_args'] = {'server_settings': {'statement_timeout': str(config['DB_STATEMENT_TIMEOUT_MS'])}}
+    moteur = create_async_engine(url, **options)
+    # Requêtes SQL comptées dans les métriques de la requête HTTP, comme en mode Flask
+    instrumenter_moteur(moteur.sync_engine)
+    return moteur
+
+
+class Requete:
+    # Requête HTTP reçue par l'application ASGI (sous-ensemble de flask.Request utilisé par les vues)
+    def __init__(self, scope):
+        self.methode = scope['method']
+        self.chemin = scope['path']
+        query_string = scope.get('query_string', b'').decode('latin-1')
+        self.args = MultiDict(parse_qsl(query_string, keep_blank_values=True))
+        self.full_path = f"{self.chemin}?{query_string}"
+        self.headers = Headers([(nom.decode('latin-1'), valeur.decode('latin-1')) for nom, valeur in scope['headers']])
+        self.cookies = parse_cookie(self.headers.get('Cookie'))
+        self.if_none_match = parse_etags(self.headers.get('If-None-Match'))
+        self.accept_encodings = parse_accept_header(self.headers.get('Accept-Encoding'))
+        self.accept_mimetypes = parse_accept_header(self.headers.get('Accept'), MIMEAccept)
+        self.moteur = None  # Moteur des lectures de la requête, choisi à la première
+
+
+class Reponse:
+    def __init__(self, contenu=b'', statut=200, mimetype='application/json', flux=None):
+        self.contenu = contenu
+        self.statut = statut
+        self.flux = flux  # Générateur asynchrone de morceaux (réponse en streaming)
+        self.etag = None
+        self.vary = []
+        self.headers = Headers({'Content-Type': mimetype})
+
+
+def reponse_json(obj, statut=200):
+    return Reponse(encoder_json(obj) + b'\n', statut)
+
+
+class ApplicationAsgi:
+    # Mode asynchrone : les routes qui attendent la base sont servies par des vues asynchrones
+    # sur le moteur SQLAlchemy async (asyncpg, aiosqlite), sans occuper de thread pendant
+    # l'attente ; toutes les autres routes sont confiées à l'application Flask via un pool de
+    # ASGI_WSGI_WORKERS threads. Les deux passent par les mêmes fonctions pour les métriques,
+    # l'identifiant de requête, le journal, le choix du réplica et les erreurs 500.
+    def __init__(self, app):
+        self.flask = app
+        self.config = app.config
+        self.cache = app.extensions['cache_entites']
+        self.moteur = creer_moteur_async(
+            app.config, app.config['ASYNC_DATABASE_URL'] or url_async(app.config['SQLALCHEMY_DATABASE_URI'])
+        )
+        self.repliques = [
+            creer_moteur_async(app.config, url_async(url)) for url in app.config.get('DATABASE_REPLICA_URLS') or []
+        ]
+        # Sessions ORM des chargeurs du cache des entités : base principale, comme lire_ou_charger
+        self.sessions = async_sessionmaker(self.moteur, expire_on_commit=False)
+        self.wsgi = WSGIMiddleware(app, workers=app.config['ASGI_WSGI_WORKERS'])
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._cycle_de_vie(receive, send)
+
+        if scope['type'] == 'http':
+            for methode, motif, regle, fonction in VUES:
+                correspondance = motif.match(scope['path'])
+                if correspondance and scope['method'] == methode:
+                    return await self._servir(scope, send, fonction, regle, correspondance.groupdict())
+
+        return await self.wsgi(scope, receive, send)
+
+    async def _cycle_de_vie(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.fermer()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def fermer(self):
+        # Connexions des moteurs asynchrones fermées (arrêt du serveur)
+        for moteur in [self.moteur, *self.repliques]:
+            await moteur.dispose()
+
+    async def _servir(self, scope, send, fonction, regle, parametres):
+        # Équivalent des hooks de l'application Flask (journal.configurer_journal,
+        # metriques.debut_requete/fin_requete) autour d'une vue asynchrone
+        requete = Requete(scope)
+        identifiant = ouvrir_requete(requete.headers.get('X-Request-ID'))
+        mesure = commencer_mesure(requete.methode, regle, capturer=self.config['SLOW_REQUEST_MS'] > 0)
+        statut, taille = 500, None
+        try:
+            try:
+                reponse = await fonction(self, requete, **parametres)
+            except Exception:
+                logger.exception("Erreur lors du traitement de %s %s", requete.methode, requete.chemin)
+                reponse = reponse_json(CORPS_ERREUR_INTERNE, 500)
+            reponse.headers['X-Request-ID'] = identifiant
+            statut = reponse.statut
+            taille = await self._envoyer(requete, reponse, send)
+        finally:
+            if self.config['LOG_REQUESTS']:
+                ecrire_ligne_requete(
+                    requete.methode, requete.chemin, regle, statut, time.perf_counter() - mesure.debut, taille
+                )
+            terminer_mesure(mesure, statut, taille, requete.full_path.rstrip('?'), self.config)
+            fermer_requete()
+
+    async def _envoyer(self, requete, reponse, send):
+        # Envoie la réponse ; renvoie sa taille (None en streaming, comme en mode Flask)
+        headers = reponse.headers
+
+        # Même CORS que flask_cors : origine reprise, mêmes en-têtes exposés
+        if 'Origin' in requete.headers:
+            headers['Access-Control-Allow-Origin'] = requete.headers['Origin']
+            headers['Access-Control-Expose-Headers'] = ', '.join(ENTETES_EXPOSES)
+            reponse.vary.append('Origin')
+
+        # Même compression que serialisation.compresser_reponse, hors streaming
+        if reponse.flux is None and reponse.statut == 200 and headers['Content-Type'] in TYPES_COMPRESSIBLES:
+            reponse.vary.append('Accept-Encoding')
+            encodage = None
+            if len(reponse.contenu) >= self.config['COMPRESS_MIN_SIZE']:
+                encodage = encodage_accepte(requete.accept_encodings)
+            if encodage:
+                reponse.contenu = compresser(reponse.contenu, encodage, self.config['COMPRESS_LEVEL'])
+                headers['Content-Encoding'] = encodage
+                if reponse.etag:
+                    reponse.etag = f"{reponse.etag}-{encodage}"
+
+        if reponse.etag:
+            headers['ETag'] = f'"{reponse.etag}"'
+            # Le navigateur revalide à chaque fois, mais ne retélécharge que si la liste a changé
+            headers['Cache-Control'] = 'no-cache'
+        if reponse.vary:
+            headers['Vary'] = ', '.join(reponse.vary)
+
+        if reponse.flux is None:
+            headers['Content-Length'] = str(len(reponse.contenu))
+        await send({
+            'type': 'http.response.start',
+            'status': reponse.statut,
+            'headers': [(nom.lower().encode('latin-1'), valeur.encode('latin-1')) for nom, valeur in headers.items()],
+        })
+        if reponse.flux is None:
+            await send({'type': 'http.response.body', 'body': reponse.contenu})
+            return len(reponse.contenu)
+        async for morceau in reponse.flux:
+            await send({'type': 'http.response.body', 'body': morceau, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+        return None
+
+    def moteur_lecture(self, requete):
+        # Même règle que bases.SessionRoutage pour une route @lecture_seule : un réplica tiré
+        # une fois par requête, sauf si le client lit ses propres écritures
+        if requete.moteur is None:
+            primaire = lecture_primaire_demandee(
+                requete.cookies.get(COOKIE_PRIMAIRE), requete.headers.get(ENTETE_PRIMAIRE),
+                self.config['READ_YOUR_WRITES_SECONDS'],
+            )
+            requete.moteur = (None if primaire else choisir_replique(self.repliques)) or self.moteur
+        return requete.moteur
+
+    async def _cache(self, methode, *args):
+        # Le cache mémoire répond sans attente ; un cache distant (Redis) est interrogé
+        # dans un thread pour ne pas bloquer la boucle d'événements
+        fonction = getattr(self.cache, methode)
+        if isinstance(self.cache, (CacheMemoire, CacheNul)):
+            return fonction(*args)
+        return await asyncio.to_thread(fonction, *args)
+
+    async def lire_ou_charger(self, cle, chargeur):
+        # Équivalent asynchrone de cache.lire_ou_charger (chargeur sur la base principale)
+        valeur = await self._cache('get', cle)
+        if valeur is None:
+            valeur = await chargeur()
+            if valeur is not None:
+                await self._cache('set', cle, valeur)
+        return valeur
+
+    async def lire_compteurs(self, requete, ttl=0):
+        # Équivalent asynchrone de compteurs.lire_compteurs (même cache "ttl")
+        valeurs = compteurs_en_cache(ttl)
+        if valeurs is None:
+            async with self.moteur_lecture(requete).connect() as conn:
+                valeurs = compteurs_lus((await conn.execute(requete_compteurs())).all())
+            garder_compteurs(valeurs, ttl)
+        return valeurs
+
+    async def versions_tables(self, requete, *tables):
+        # Équivalent asynchrone de compteurs.versions_tables
+        noms, requete_sql = requete_versions(*tables)
+        async with self.moteur_lecture(requete).connect() as conn:
+            return versions_lues(noms, (await conn.execute(requete_sql)).all())
+
+
+def create_asgi_app(app=None):
+    # Application ASGI (uvicorn, hypercorn...) construite à partir de la même application Flask
+    if app is None:
+        from app import create_app
+        app = create_app()
+    return ApplicationAsgi(app)
+
+
+###############################################
+#######  Get all TRANSACTION ##################
+@vue('GET', '/trans/all')
+async def get_all_transactions(appli, requete):
+    # Même ETag que etag_tables('transactions', format=...) de la route Flask
+    format = format_transactions(requete.args.get('format'), requete.accept_mimetypes)
+    etag = calculer_etag(requete.full_path, await appli.versions_tables(requete, 'transactions'), format)
+    connu = etag_connu(etag, requete.if_none_match)
+    if connu:
+        reponse = Reponse(statut=304)
+        reponse.etag = connu
+        reponse.vary.append('Accept')
+        return reponse
+
+    limit = requete.args.get('limit')
+    after = requete.args.get('after')
+
+    try:
+        query = select_transactions(after)
+        limit = parse_limit(limit, default=None)
+    except ValueError as e:
+        return reponse_json({"message": str(e)}, 400)
+
+    moteur = appli.moteur_lecture(requete)
+
+    # Mode streaming NDJSON : une transaction par ligne, lue par lots via un curseur serveur
+    if format == 'ndjson':
+        if limit:
+            query = query.limit(limit)
+
+        async def generate():
+            async with moteur.connect() as conn:
+                rows = await conn.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+                async for row in rows:
+                    yield ligne_ndjson(transaction_en_dict(row))
+
+        reponse = Reponse(mimetype='application/x-ndjson', flux=generate())
+
+    # Mode paginé : pagination par curseur (keyset) sur (date_transaction, id)
+    elif limit or after:
+        limit = limit or DEFAULT_LIMIT
+        async with moteur.connect() as conn:
+            rows = (await conn.execute(query.limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        reponse = reponse_json({
+            "transactions": [transaction_en_dict(row) for row in rows],
+            "next": encode_cursor(rows[-1].date_transaction, rows[-1].id) if has_more else None
+        })
+
+    # Sans limit ni curseur (ancien usage, déprécié) : au plus TRANS_ALL_MAX_ROWS transactions
+    else:
+        logger.warning("GET /trans/all sans limit est déprécié : utiliser limit/after ou format=ndjson",
+                       extra={"user_agent": requete.headers.get('User-Agent', '')})
+        maximum = appli.config['TRANS_ALL_MAX_ROWS']
+        async with moteur.connect() as conn:
+            rows = (await conn.execute(query.limit(maximum + 1))).all()
+        if not rows:
+            return reponse_json({"message": "Aucune transaction trouvée."}, 404)
+        tronquee = len(rows) > maximum
+        rows = rows[:maximum]
+        reponse = reponse_json({
+            "transactions": [transaction_en_dict(row) for row in rows],
+            "next": encode_cursor(rows[-1].date_transaction, rows[-1].id) if tronquee else None
+        })
+
+    reponse.etag = etag
+    reponse.vary.append('Accept')
+    return reponse
+
+
+############################################
+#######  get by id ####################
+@vue('GET', '/four/<int:id>')
+async def get_fournisseur_by_id(appli, requete, id):
+    id = int(id)
+
+    async def charger():
+        async with appli.sessions() as session:
+            fournisseur = await session.get(Fournisseur, id, options=[
+                joinedload(Fournisseur.transaction),
+                selectinload(Fournisseur.beneficiaires),
+            ])
+            if not fournisseur:
+                return None
+            return document_fournisseur(fournisseur, fournisseur.transaction, fournisseur.beneficiaires)
+
+    result = await appli.lire_ou_charger(cle_fournisseur(id), charger)
+    if not result:
+        return reponse_json({"message": f"Fournisseur avec l'ID {id} introuvable"}, 404)
+
+    return reponse_json({
+        "message": "Fournisseur récupéré avec succès",
+        "fournisseur": result
+    })
+
+
+@vue('GET', '/benef/<int:id>')
+async def get_beneficiaire_by_id(appli, requete, id):
+    id = int(id)
+
+    async def charger():
+        async with appli.sessions() as session:
+            beneficiaire = await session.get(Beneficiaire, id, options=[joinedload(Beneficiaire.fournisseur)])
+            if not beneficiaire:
+                return None
+            return document_beneficiaire(beneficiaire, beneficiaire.fournisseur)
+
+    result = await appli.lire_ou_charger(cle_beneficiaire(id), charger)
+    if not result:
+        return reponse_json({"message": "Bénéficiaire non trouvé"}, 404)
+
+    return reponse_json({
+        "message": "Bénéficiaire récupéré avec succès",
+        "beneficiaire": result
+    })
+
+
+##########################################################################################
+############## DASHBORD ################## DASHBORD ##################
+@vue('GET', '/total/fr')
+async def get_total_fournisseurs(appli, requete):
+    compteurs = await appli.lire_compteurs(requete)
+    return reponse_json({"total_fournisseurs": int(compteurs['fournisseurs'])})
+
+
+@vue('GET', '/total/tr')
+async def get_total_transactions(appli, requete):
+    compteurs = await appli.lire_compteurs(requete)
+    return reponse_json({"total": int(compteurs['transactions'])})
+
+
+@vue('GET', '/total/bn')
+async def get_total_beneficiaires(appli, requete):
+    compteurs = await appli.lire_compteurs(requete)
+    return reponse_json({"total_beneficiaires": int(compteurs['beneficiaires'])})
+
+
+@vue('GET', '/dashboard/summary')
+async def get_dashboard_summary(appli, requete):
+    compteurs = await appli.lire_compteurs(requete, ttl=appli.config.get('DASHBOARD_CACHE_TTL', 0))
+    return reponse_json({
+        "total_transactions": int(compteurs['transactions']),
+        "total_fournisseurs": int(compteurs['fournisseurs']),
+        "total_beneficiaires": int(compteurs['beneficiaires']),
+        "volume_FCFA": int(compteurs['volume_FCFA']),
+        "volume_USDT": compteurs['volume_USDT']
+    })
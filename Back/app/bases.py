@@ -0,0 +1,164 @@
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Delete, Insert, Update, event
+from sqlalchemy.engine import make_url
+
+# Préfixe des clés SQLALCHEMY_BINDS des réplicas en lecture
+PREFIXE_REPLIQUE = 'replique_'
+
+# Après une écriture, les lectures du client restent sur la base principale jusqu'à la date
+# indiquée (lecture de ses propres écritures) : cookie pour un client de même origine, en-tête
+# de réponse que le frontend d'une autre origine (CORS sans cookies) renvoie tel quel dans ses
+# requêtes suivantes
+COOKIE_PRIMAIRE = 'lecture_primaire'
+ENTETE_PRIMAIRE = 'X-Lecture-Primaire'
+
+
+def options_moteur(config, url):
+    # Options du pool de connexions (SQLALCHEMY_ENGINE_OPTIONS) pour une URL donnée
+    url = make_url(url)
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+    # SQLite en mémoire utilise un pool à connexion unique, sans taille configurable
+    if not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')):
+        options['pool_size'] = config['DB_POOL_SIZE']
+        options['max_overflow'] = config['DB_MAX_OVERFLOW']
+        options['pool_timeout'] = config['DB_POOL_TIMEOUT']
+    if url.get_backend_name() == 'postgresql' and config['DB_STATEMENT_TIMEOUT_MS']:
+        options['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"}
+    return options
+
+
+def configurer_bases(app):
+    # Pool de la base principale et binds des réplicas, à appeler avant db.init_app()
+    config = app.config
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **options_moteur(config, config['SQLALCHEMY_DATABASE_URI']),
+        **config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+    }
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    for i, url in enumerate(config.get('DATABASE_REPLICA_URLS') or []):
+        binds[f'{PREFIXE_REPLIQUE}{i}'] = {'url': url, **options_moteur(config, url)}
+    config['SQLALCHEMY_BINDS'] = binds
+
+    @app.after_request
+    def marquer_lecture_primaire(response):
+        # Après une écriture, le client lit sur la base principale pendant
+        # READ_YOUR_WRITES_SECONDS secondes, le temps que les réplicas rattrapent
+        if g.get('ecriture'):
+            delai = config['READ_YOUR_WRITES_SECONDS']
+            jusqua = str(time.time() + delai)
+            response.set_cookie(COOKIE_PRIMAIRE, jusqua, max_age=delai, httponly=True)
+            response.headers[ENTETE_PRIMAIRE] = jusqua
+        return response
+
+
+def _pragma_cles_etrangeres(connexion_dbapi, enregistrement):
+    curseur = connexion_dbapi.cursor()
+    curseur.execute('PRAGMA foreign_keys=ON')
+    curseur.close()
+
+
+def activer_cles_etrangeres(moteur, neuf=False):
+    # SQLite n'applique les clés étrangères (dont ON DELETE CASCADE) que sur demande, à chaque
+    # connexion. À appeler après les migrations, qui recréent des tables sous SQLite et ne
+    # doivent pas déclencher les cascades ("neuf" : moteur sans connexion ouverte).
+    if moteur.dialect.name != 'sqlite':
+        return
+    event.listen(moteur, 'connect', _pragma_cles_etrangeres)
+    if neuf:
+        return
+    if moteur.url.database in (None, '', ':memory:'):
+        # Base en mémoire : elle disparaîtrait avec sa connexion, qu'on configure directement
+        with moteur.connect() as connexion:
+            connexion.exec_driver_sql('PRAGMA foreign_keys=ON')
+    else:
+        # Connexions ouvertes par les migrations : rouvertes avec le PRAGMA
+        moteur.dispose()
+
+
+def lecture_seule(vue):
+    # Décorateur des routes en lecture seule : leurs requêtes peuvent aller sur un réplica
+    @wraps(vue)
+    def wrapper(*args, **kwargs):
+        g.lecture_seule = True
+        return vue(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def lectures_sur_primaire():
+    # Dans ce bloc, les lectures vont sur la base principale même dans une route @lecture_seule
+    if not has_request_context():
+        yield
+        return
+    precedent = g.get('lecture_primaire', False)
+    g.lecture_primaire = True
+    try:
+        yield
+    finally:
+        g.lecture_primaire = precedent
+
+
+def lecture_primaire_demandee(cookie, entete, delai):
+    # Date renvoyée par le client (cookie ou en-tête) pas encore atteinte ; une date plus
+    # lointaine que READ_YOUR_WRITES_SECONDS ("delai") n'a pas été posée par le serveur et
+    # est ignorée. Commun aux routes Flask et aux vues asynchrones (app/asgi.py).
+    maintenant = time.time()
+    for valeur in (cookie, entete):
+        try:
+            if valeur and maintenant < float(valeur) <= maintenant + delai:
+                return True
+        except ValueError:
+            pass
+    return False
+
+
+def choisir_replique(repliques):
+    # Réplica d'une requête, tiré au sort parmi "repliques" (None s'il n'y en a pas)
+    return random.choice(repliques) if repliques else None
+
+
+def _lecture_primaire_demandee():
+    return lecture_primaire_demandee(
+        request.cookies.get(COOKIE_PRIMAIRE), request.headers.get(ENTETE_PRIMAIRE),
+        current_app.config['READ_YOUR_WRITES_SECONDS'],
+    )
+
+
+def _lecture_sur_replique():
+    if not has_request_context() or not g.get('lecture_seule') or g.get('ecriture') or g.get('lecture_primaire'):
+        return False
+    return not _lecture_primaire_demandee()
+
+
+class SessionRoutage(Session):
+    # Session qui envoie les lectures des routes @lecture_seule vers un réplica et tout le
+    # reste (écritures, flush, routes non marquées) vers la base principale
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+                if has_request_context():
+                    g.ecriture = True
+            elif _lecture_sur_replique():
+                replique = self._replique_de_la_requete()
+                if replique is not None:
+                    return replique
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replique_de_la_requete(self):
+        # Réplica tiré au sort une fois par requête : toutes ses lectures voient le même état
+        if 'replique' not in g:
+            repliques = [
+                moteur for cle, moteur in self._db.engines.items()
+                if cle and cle.startswith(PREFIXE_REPLIQUE)
+            ]
+            g.replique = choisir_replique(repliques)
+        return g.replique
@@ -0,0 +1,165 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, true
+
+from app import db
+from app.analytique import debut_periode, jour_de
+from app.models import Benefice, Transaction, Fournisseur, Beneficiaire
+from app.pagination import keyset_filter
+
+# Colonnes de la table "benefices" remplies par requete_benefices, dans l'ordre du SELECT
+COLONNES_BENEFICES = (
+    'transaction_id', 'date_transaction', 'nb_fournisseurs', 'nb_beneficiaires',
+    'quantite_USDT', 'marge', 'commissions', 'benefice',
+)
+
+
+def requete_benefices(condition):
+    # Bénéfice des transactions qui vérifient "condition", en une requête d'agrégation sur
+    # transactions ⟕ fournisseurs ⟕ bénéficiaires (mêmes formules que /calculer) :
+    #   marge de chaque fournisseur      (taux_convenu - taux_jour) * quantite_USDT
+    #   commission de chaque bénéficiaire commission_USDT * quantite_USDT du fournisseur
+    # Les commissions sont d'abord sommées par fournisseur, pour ne pas compter la marge
+    # d'un fournisseur une fois par bénéficiaire.
+    commissions = select(
+        Beneficiaire.fournisseur_id,
+        func.count(Beneficiaire.id).label('nb'),
+        func.sum(Beneficiaire.commission_USDT).label('commission'),
+    ).group_by(Beneficiaire.fournisseur_id).subquery()
+
+    marge = func.coalesce(func.sum((Transaction.taux_convenu - Fournisseur.taux_jour) * Fournisseur.quantite_USDT), 0)
+    commission = func.coalesce(func.sum(commissions.c.commission * Fournisseur.quantite_USDT), 0)
+
+    return select(
+        Transaction.id,
+        Transaction.date_transaction,
+        func.count(Fournisseur.id),
+        func.coalesce(func.sum(commissions.c.nb), 0),
+        func.coalesce(func.sum(Fournisseur.quantite_USDT), 0),
+        func.round(marge, 2),
+        func.round(commission, 2),
+        func.round(marge - commission, 2),
+    ).outerjoin(
+        Fournisseur, Fournisseur.transaction_id == Transaction.id
+    ).outerjoin(
+        commissions, commissions.c.fournisseur_id == Fournisseur.id
+    ).where(condition).group_by(Transaction.id, Transaction.date_transaction)
+
+
+def rafraichir_benefices(condition):
+    # Recalcule les lignes des transactions qui vérifient "condition", dans la transaction
+    # en cours (les lignes des transactions supprimées partent par ON DELETE CASCADE)
+    db.session.execute(
+        delete(Benefice).where(Benefice.transaction_id.in_(select(Transaction.id).where(condition))),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.execute(insert(Benefice).from_select(COLONNES_BENEFICES, requete_benefices(condition)))
+
+
+def transactions_des_fournisseurs(*fournisseur_ids):
+    # Condition "transaction d'un de ces fournisseurs", pour rafraichir_benefices
+    return Transaction.id.in_(select(Fournisseur.transaction_id).where(Fournisseur.id.in_(fournisseur_ids)))
+
+
+def initialiser_benefices():
+    # Calcule les bénéfices de toutes les transactions si la table est vide
+    if db.session.query(Benefice.transaction_id).first() is not None:
+        return
+    if db.session.query(Transaction.id).first() is None:
+        return
+
+    rafraichir_benefices(true())
+    db.session.commit()
+
+
+def benefice_en_dict(ligne):
+    return {
+        "transaction_id": ligne.transaction_id,
+        "dateTransaction": ligne.date_transaction.isoformat() if ligne.date_transaction else None,
+        "nb_fournisseurs": ligne.nb_fournisseurs,
+        "nb_beneficiaires": ligne.nb_beneficiaires,
+        "quantite_USDT": ligne.quantite_USDT,
+        "marge": ligne.marge,
+        "commissions": ligne.commissions,
+        "benefice": ligne.benefice,
+    }
+
+
+def select_benefices(after=None):
+    # Bénéfices par transaction, triés sur la clé (date_transaction, transaction_id)
+    query = select(Benefice.__table__).order_by(Benefice.date_transaction, Benefice.transaction_id)
+    if after:
+        query = query.where(keyset_filter(Benefice.date_transaction, Benefice.transaction_id, after))
+    return query
+
+
+def _periode_suivante(debut, periode):
+    # Premier jour de la période qui suit celle commençant le jour "debut"
+    if periode == 'semaine':
+        return debut + timedelta(days=7)
+    if periode == 'mois':
+        return (debut.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return debut + timedelta(days=1)
+
+
+def benefices_par_periode(periode, debut, fin, after, limit):
+    # Bénéfices cumulés par jour, semaine ou mois entre debut et fin inclus (dates), au plus
+    # "limit" périodes après la période "after" (date de début renvoyée comme curseur) ;
+    # renvoie (périodes, curseur suivant ou None). Les jours sont agrégés par la base et lus
+    # dans l'ordre jusqu'à la période limit + 1.
+    jour = func.date(Benefice.date_transaction)
+    conditions = [Benefice.date_transaction.isnot(None)]
+    if debut:
+        conditions.append(Benefice.date_transaction >= datetime.combine(debut, datetime.min.time()))
+    if fin:
+        conditions.append(Benefice.date_transaction < datetime.combine(fin + timedelta(days=1), datetime.min.time()))
+    if after:
+        suivante = _periode_suivante(debut_periode(after, periode), periode)
+        conditions.append(Benefice.date_transaction >= datetime.combine(suivante, datetime.min.time()))
+
+    lignes = db.session.execute(
+        select(
+            jour,
+            func.count(Benefice.transaction_id),
+            func.sum(Benefice.quantite_USDT),
+            func.sum(Benefice.marge),
+            func.sum(Benefice.commissions),
+            func.sum(Benefice.benefice),
+        ).where(*conditions).group_by(jour).order_by(jour)
+    )
+
+    periodes = {}
+    for valeur_jour, nb, quantite, marge, commissions, benefice in lignes:
+        cle = debut_periode(jour_de(valeur_jour), periode)
+        if cle not in periodes and len(periodes) == limit:
+            lignes.close()
+            return _periodes_en_liste(periodes), max(periodes).isoformat()
+        totaux = periodes.setdefault(cle, [0, 0, 0, 0, 0])
+        for i, valeur in enumerate((nb, quantite, marge, commissions, benefice)):
+            totaux[i] += valeur
+
+    return _periodes_en_liste(periodes), None
+
+
+def _periodes_en_liste(periodes):
+    return [
+        {
+            "periode": cle.isoformat(),
+            "nb_transactions": nb,
+            "quantite_USDT": quantite,
+            "marge": marge,
+            "commissions": commissions,
+            "benefice": benefice,
+        }
+        for cle, (nb, quantite, marge, commissions, benefice) in periodes.items()
+    ]
+
+
+def lire_date(valeur, nom):
+    # Paramètre de date AAAA-MM-JJ facultatif ; ValueError si invalide
+    if not valeur:
+        return None
+    try:
+        return date.fromisoformat(valeur)
+    except ValueError:
+        raise ValueError(f"{nom} invalide (format AAAA-MM-JJ attendu)")
@@ -0,0 +1,89 @@
+from decimal import InvalidOperation
+
+from sqlalchemy import delete, insert, update
+
+from app import db
+from app.compteurs import arrondi_usdt
+from app.models import Beneficiaire
+
+
+def differences_beneficiaires(existants, soumis):
+    # Compare les bénéficiaires actuels d'un fournisseur (lignes id, nom, commission_USDT) à la
+    # liste soumise : un élément correspond à une ligne existante par son "id" s'il en a un,
+    # sinon par son "nom". Renvoie (ids à supprimer, lignes à modifier, lignes à insérer) ;
+    # les lignes inchangées n'apparaissent nulle part et gardent leur id.
+    par_id = {benef.id: benef for benef in existants}
+    par_nom = {benef.nom: benef for benef in existants}
+    conserves, noms, a_modifier, a_inserer = set(), set(), [], []
+
+    for element in soumis:
+        if not isinstance(element, dict) or "nom" not in element or "commission_USDT" not in element:
+            raise ValueError("Chaque bénéficiaire doit avoir un 'nom' et une 'commission_USDT'")
+        if element["nom"] in noms:
+            raise ValueError(f"Bénéficiaire en double : '{element['nom']}'")
+        noms.add(element["nom"])
+        try:
+            commission = arrondi_usdt(element["commission_USDT"])
+        except InvalidOperation:
+            commission = None
+        # Decimal accepte "NaN" (et float("nan") passe str()) : seules les valeurs finies sont gardées
+        if commission is None or not commission.is_finite():
+            raise ValueError(f"commission_USDT invalide pour '{element['nom']}'")
+
+        if element.get("id") is not None:
+            existant = par_id.get(element["id"])
+            if existant is None:
+                raise ValueError(f"Le bénéficiaire {element['id']} n'appartient pas à ce fournisseur")
+        else:
+            existant = par_nom.get(element["nom"])
+
+        if existant is None:
+            a_inserer.append({"nom": element["nom"], "commission_USDT": commission})
+            continue
+        if existant.id in conserves:
+            raise ValueError(f"Bénéficiaire en double : '{element['nom']}'")
+        conserves.add(existant.id)
+        if existant.nom != element["nom"] or existant.commission_USDT != commission:
+            a_modifier.append({"id": existant.id, "nom": element["nom"], "commission_USDT": commission})
+
+    a_supprimer = [benef.id for benef in existants if benef.id not in conserves]
+    return a_supprimer, a_modifier, a_inserer
+
+
+def _nom_provisoire(id):
+    # Nom unique le temps d'un échange de noms (hors des noms saisis : caractère de contrôle)
+    return f"\x1f{id}"
+
+
+def synchroniser_beneficiaires(fournisseur_id, existants, soumis):
+    # Applique la différence en au plus trois requêtes groupées (suppressions d'abord, pour
+    # libérer les noms uniques), dans la transaction en cours ; renvoie la variation du
+    # nombre de bénéficiaires et si quelque chose a changé
+    a_supprimer, a_modifier, a_inserer = differences_beneficiaires(existants, soumis)
+
+    if a_supprimer:
+        db.session.execute(
+            delete(Beneficiaire).where(Beneficiaire.id.in_(a_supprimer)),
+            execution_options={'synchronize_session': False}
+        )
+    if a_modifier:
+        # Renommages qui reprennent le nom actuel d'une autre ligne modifiée (échange A <-> B) :
+        # la contrainte UNIQUE(nom) est vérifiée ligne par ligne, ces lignes passent d'abord
+        # par un nom provisoire
+        noms_actuels = {benef.id: benef.nom for benef in existants}
+        renommes = [ligne for ligne in a_modifier if ligne["nom"] != noms_actuels[ligne["id"]]]
+        liberes = {noms_actuels[ligne["id"]] for ligne in renommes}
+        conflits = [ligne for ligne in renommes if ligne["nom"] in liberes]
+        if conflits:
+            db.session.execute(update(Beneficiaire), [
+                {"id": ligne["id"], "nom": _nom_provisoire(ligne["id"])} for ligne in conflits
+            ])
+            # Les autres lignes d'abord (elles libèrent leurs noms), puis celles en nom provisoire
+            a_modifier = [ligne for ligne in a_modifier if ligne not in conflits] + conflits
+        db.session.execute(update(Beneficiaire), a_modifier)
+    if a_inserer:
+        db.session.execute(insert(Beneficiaire), [
+            {**ligne, "fournisseur_id": fournisseur_id} for ligne in a_inserer
+        ])
+
+    return len(a_inserer) - len(a_supprimer), bool(a_supprimer or a_modifier or a_inserer)
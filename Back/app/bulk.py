@@ -0,0 +1,89 @@
+import csv
+import io
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+
+# Nombre de lignes validées et insérées par commit lors d'un import en masse
+BULK_CHUNK_SIZE = 1000
+
+# Bornes des colonnes : Integer (montant_FCFA, taux_convenu) et Numeric(10, 2) (montant_USDT)
+MAX_ENTIER = 2**31 - 1
+MAX_USDT = 1e8
+
+
+def iter_chunks(rows, size=BULK_CHUNK_SIZE):
+    # Découpe un itérable en lots de "size" lignes, avec l'index de la première ligne
+    iterator = iter(rows)
+    offset = 0
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield offset, chunk
+        offset += len(chunk)
+
+
+def iter_csv_rows(stream):
+    # Lecture ligne à ligne d'un CSV (montantFCFA,tauxConv[,dateTransaction]) sans tout charger en mémoire
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    yield from csv.DictReader(text)
+
+
+def _float_column(rows, key):
+    # Colonne numérique, NaN pour les valeurs absentes ou non numériques
+    values = np.full(len(rows), np.nan)
+    for i, row in enumerate(rows):
+        try:
+            values[i] = float(row.get(key))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    return values
+
+
+def validate_chunk(rows, offset=0):
+    # Validation vectorisée d'un lot : renvoie (lignes à insérer, numéros de ligne, erreurs)
+    montants = _float_column(rows, 'montantFCFA')
+    taux = _float_column(rows, 'tauxConv')
+
+    valides = np.isfinite(montants) & np.isfinite(taux) & (montants > 0) & (taux > 0)
+    # Montants et taux entiers (colonnes Integer) : une valeur décimale serait tronquée et ne
+    # correspondrait plus au montant USDT calculé
+    entiers = (montants == np.floor(montants)) & (taux == np.floor(taux))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        montants_usdt = np.round(montants / taux, 2)
+    dans_les_bornes = (montants <= MAX_ENTIER) & (taux <= MAX_ENTIER) & (montants_usdt < MAX_USDT)
+
+    records, lignes, errors = [], [], []
+    for i in range(len(rows)):
+        ligne = offset + i + 1
+        if not valides[i]:
+            errors.append({"ligne": ligne, "message": "Données invalides"})
+            continue
+        if not entiers[i]:
+            errors.append({"ligne": ligne, "message": "montantFCFA et tauxConv doivent être des entiers"})
+            continue
+        if not dans_les_bornes[i]:
+            errors.append({"ligne": ligne, "message": "Valeur hors limites"})
+            continue
+
+        record = {
+            "montant_FCFA": int(montants[i]),
+            "taux_convenu": int(taux[i]),
+            "montant_USDT": float(montants_usdt[i]),
+        }
+
+        # Date optionnelle, sinon la valeur par défaut de la base est utilisée
+        date = rows[i].get('dateTransaction')
+        if date:
+            try:
+                record["date_transaction"] = datetime.fromisoformat(date)
+            except (TypeError, ValueError):
+                errors.append({"ligne": ligne, "message": "dateTransaction invalide"})
+                continue
+
+        records.append(record)
+        lignes.append(ligne)
+
+    return records, lignes, errors
@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import orjson
+from flask import current_app
+
+from app.bases import lectures_sur_primaire
+from app.serialisation import encoder_json
+
+logger = logging.getLogger(__name__)
+
+
+class CacheMemoire:
+    # Cache local au processus : éviction LRU au-delà de "taille_max" entrées, expiration après "ttl" secondes
+    def __init__(self, taille_max=10_000, ttl=300):
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def get(self, cle):
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                return None
+            expire, valeur = entree
+            if expire < time.monotonic():
+                del self._entrees[cle]
+                return None
+            self._entrees.move_to_end(cle)
+            return valeur
+
+    def set(self, cle, valeur):
+        with self._verrou:
+            self._entrees[cle] = (time.monotonic() + self.ttl, valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+
+    def delete(self, *cles):
+        with self._verrou:
+            for cle in cles:
+                self._entrees.pop(cle, None)
+
+
+class CacheRedis:
+    # Cache partagé via le protocole Redis (serveur Redis, KeyDB, ou substitut local en test) ;
+    # l'éviction LRU relève du serveur (maxmemory-policy allkeys-lru), l'expiration de SETEX.
+    # Serveur injoignable : l'erreur est journalisée et la lecture passe par la base
+    def __init__(self, url, ttl=300, prefixe='full-crypto:'):
+        import redis  # Dépendance optionnelle, seulement pour ce backend
+
+        self.client = redis.Redis.from_url(url)
+        self.erreurs = redis.RedisError
+        self.ttl = ttl
+        self.prefixe = prefixe
+
+    def get(self, cle):
+        try:
+            valeur = self.client.get(self.prefixe + cle)
+        except self.erreurs:
+            logger.warning("Cache Redis indisponible (lecture de %s)", cle, exc_info=True)
+            return None
+        return orjson.loads(valeur) if valeur is not None else None
+
+    def set(self, cle, valeur):
+        # Même encodage que les réponses JSON (Decimal en nombre, dates en ISO 8601)
+        try:
+            self.client.setex(self.prefixe + cle, self.ttl, encoder_json(valeur))
+        except self.erreurs:
+            logger.warning("Cache Redis indisponible (écriture de %s)", cle, exc_info=True)
+
+    def delete(self, *cles):
+        if not cles:
+            return
+        try:
+            self.client.delete(*(self.prefixe + cle for cle in cles))
+        except self.erreurs:
+            # Les documents restent en cache jusqu'à leur expiration (ENTITY_CACHE_TTL)
+            logger.error("Cache Redis indisponible, invalidation perdue : %s", ', '.join(cles), exc_info=True)
+
+
+class CacheNul:
+    # Cache désactivé (ENTITY_CACHE_BACKEND = None)
+    def get(self, cle):
+        return None
+
+    def set(self, cle, valeur):
+        pass
+
+    def delete(self, *cles):
+        pass
+
+
+def creer_cache(config):
+    backend = config.get('ENTITY_CACHE_BACKEND')
+    ttl = config.get('ENTITY_CACHE_TTL', 300)
+    if backend == 'memoire':
+        # Les autres processus garderaient les documents périmés jusqu'à leur expiration
+        if config.get('WEB_CONCURRENCY', 1) > 1:
+            raise RuntimeError(
+                "ENTITY_CACHE_BACKEND='memoire' n'est pas partagé entre les processus "
+                "(WEB_CONCURRENCY > 1) : utiliser 'redis' ou désactiver le cache ('none')"
+            )
+        return CacheMemoire(config.get('ENTITY_CACHE_SIZE', 10_000), ttl)
+    if backend == 'redis':
+        return CacheRedis(config['ENTITY_CACHE_URL'] or 'redis://localhost:6379/0', ttl)
+    if backend in (None, '', 'none'):
+        return CacheNul()
+    raise RuntimeError(f"ENTITY_CACHE_BACKEND inconnu : {backend!r}")
+
+
+def cache_entites():
+    return current_app.extensions['cache_entites']
+
+
+def lire_ou_charger(cle, chargeur):
+    # Lecture à travers le cache : en cas d'absence, "chargeur" lit la base et le résultat est
+    # mis en cache (sauf None, pour ne pas mémoriser les entités introuvables). Le chargeur
+    # lit la base principale : un réplica en retard ne doit pas remplir le cache pour tous
+    cache = cache_entites()
+    valeur = cache.get(cle)
+    if valeur is None:
+        with lectures_sur_primaire():
+            valeur = chargeur()
+        if valeur is not None:
+            cache.set(cle, valeur)
+    return valeur
+
+
+def invalider(*cles):
+    cache_entites().delete(*cles)
+
+
+# Clés des documents mis en cache
+def cle_fournisseur(id):
+    return f"fournisseur:{id}"
+
+
+def cle_beneficiaire(id):
+    return f"beneficiaire:{id}"
+
+
+def cle_utilisateur(email):
+    return f"utilisateur:{email}"
@@ -0,0 +1,78 @@
+import numpy as np
+
+# Paramètres d'entrée du calculateur de bénéfices
+PARAMETRES = ('montantFCFA', 'tauxConvenu', 'tauxFournisseur', 'quantiteUSDT', 'commission')
+
+# Nombre maximal de scénarios calculés en une requête
+MAX_SCENARIOS = 1_000_000
+
+
+def _finies(valeurs):
+    # float() et numpy acceptent "nan" et "inf" : refusés, les résultats seraient null
+    if not np.isfinite(valeurs).all():
+        raise ValueError("Les valeurs doivent être des nombres finis")
+    return valeurs
+
+
+def _valeurs(spec):
+    # Une liste de valeurs, un nombre seul, ou une plage {"debut", "fin", "pas"} (fin incluse)
+    if isinstance(spec, dict):
+        debut, fin, pas = _finies(np.array([spec['debut'], spec['fin'], spec['pas']], dtype=float))
+        if pas <= 0 or fin < debut:
+            raise ValueError("Plage invalide : il faut pas > 0 et fin >= debut")
+        if (fin - debut) / pas >= MAX_SCENARIOS:
+            raise ValueError(f"Trop de scénarios (maximum {MAX_SCENARIOS})")
+        return np.arange(debut, fin + pas / 2, pas)
+    return _finies(np.atleast_1d(np.asarray(spec, dtype=float)).ravel())
+
+
+def construire_colonnes(data):
+    # Colonnes de même longueur à partir de tableaux (diffusion des scalaires)
+    # ou d'une grille {"grille": {...}} dont on prend le produit cartésien
+    grille = data.get('grille')
+    if grille:
+        noms = [nom for nom in PARAMETRES if nom in grille]
+        axes = [_valeurs(grille[nom]) for nom in noms]
+        if int(np.prod([len(axe) for axe in axes])) > MAX_SCENARIOS:
+            raise ValueError(f"Trop de scénarios (maximum {MAX_SCENARIOS})")
+        maillage = np.meshgrid(*axes, indexing='ij')
+        colonnes = {nom: axe.ravel() for nom, axe in zip(noms, maillage)}
+    else:
+        colonnes = {nom: _valeurs(data[nom]) for nom in PARAMETRES if nom in data}
+
+    # Paramètres absents de la grille : valeur fixe (0 par défaut, comme /calculer)
+    for nom in PARAMETRES:
+        if nom not in colonnes:
+            colonnes[nom] = _valeurs(data.get(nom, 0))
+
+    try:
+        colonnes = dict(zip(colonnes, np.broadcast_arrays(*colonnes.values())))
+    except ValueError:
+        raise ValueError("Les colonnes doivent avoir la même longueur")
+    if len(colonnes['tauxConvenu']) > MAX_SCENARIOS:
+        raise ValueError(f"Trop de scénarios (maximum {MAX_SCENARIOS})")
+    return colonnes
+
+
+def calculer_colonnes(colonnes):
+    # Même formules que /calculer, appliquées à tous les scénarios en une passe ; ValueError
+    # si un résultat dépasse la capacité d'un flottant
+    with np.errstate(over='ignore', invalid='ignore'):
+        montant_usdt = colonnes['montantFCFA'] / colonnes['tauxConvenu']
+        benefice_par_usdt = colonnes['tauxConvenu'] - colonnes['tauxFournisseur']
+        benefice_total_fcfa = benefice_par_usdt * colonnes['quantiteUSDT']
+        benefice_beneficiaire = colonnes['commission'] * colonnes['quantiteUSDT']
+    for resultat in (montant_usdt, benefice_par_usdt, benefice_total_fcfa, benefice_beneficiaire):
+        _finies(resultat)
+
+    # Arrondi avec round() de Python pour des résultats identiques à /calculer
+    # (np.round peut différer sur certaines valeurs à mi-chemin)
+    def arrondir(valeurs):
+        return [round(v, 2) for v in valeurs.tolist()]
+
+    return {
+        "montantUSDT": arrondir(montant_usdt),
+        "beneficeUSDT": arrondir(benefice_par_usdt),
+        "beneficeTotalFCFA": arrondir(benefice_total_fcfa),
+        "beneficeBeneficiaire": arrondir(benefice_beneficiaire),
+    }
@@ -0,0 +1,64 @@
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.export import FORMATS_EXPORT, ExportIndisponible, exporter
+from app.generation import SEED_BATCH_SIZE, generer, generer_utilisateurs, lire_taille, vider
+from app.models import Transaction
+from app.recherche import periode
+
+
+@click.command('export', help="Exporte le grand livre (transactions, fournisseurs, bénéficiaires) en CSV ou Parquet.")
+@click.option('--format', 'format', type=click.Choice(FORMATS_EXPORT), default='csv', show_default=True)
+@click.option('--debut', help="Date de début (ISO 8601, incluse)")
+@click.option('--fin', help="Date de fin (ISO 8601, exclue)")
+@click.option('--sortie', type=click.File('wb'), default='-', help="Fichier de sortie (par défaut la sortie standard)")
+@with_appcontext
+def exporter_transactions(format, debut, fin, sortie):
+    try:
+        morceaux = exporter(db.session, format, *periode(Transaction.date_transaction, debut, fin))
+    except (ValueError, ExportIndisponible) as e:
+        raise click.UsageError(str(e))
+    for morceau in morceaux:
+        sortie.write(morceau)
+
+
+@click.command('seed', help="Génère des données synthétiques (utilisateurs, transactions, fournisseurs, bénéficiaires).")
+@click.option('--transactions', 'taille', default='10k', show_default=True, help="Nombre de transactions (ex. 10k, 100k, 1M)")
+@click.option('--utilisateurs', type=int, default=100, show_default=True)
+@click.option('--mot-de-passe', default='motdepasse', show_default=True, help="Mot de passe des utilisateurs générés")
+@click.option('--jours', type=int, default=365, show_default=True, help="Période couverte par les dates des transactions")
+@click.option('--graine', type=int, help="Graine du générateur (données reproductibles)")
+@click.option('--lot', type=int, default=SEED_BATCH_SIZE, show_default=True, help="Transactions insérées par lot")
+@click.option('--vider', 'vider_tables', is_flag=True, help="Supprime d'abord toutes les transactions et les utilisateurs générés")
+@with_appcontext
+def generer_donnees(taille, utilisateurs, mot_de_passe, jours, graine, lot, vider_tables):
+    try:
+        nb_transactions = lire_taille(taille)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    if jours <= 0 or lot <= 0:
+        raise click.UsageError("--jours et --lot doivent être positifs")
+
+    if vider_tables:
+        vider()
+    if utilisateurs:
+        generer_utilisateurs(utilisateurs, generate_password_hash(
+            mot_de_passe, method=current_app.config['PASSWORD_HASH_METHOD']
+        ))
+
+    debut = time.perf_counter()
+
+    def progression(nb_transactions_inserees, nb_fournisseurs, nb_beneficiaires):
+        click.echo(f"\r{nb_transactions_inserees}/{nb_transactions} transactions", nl=False, err=True)
+
+    totaux = generer(nb_transactions, graine=graine, jours=jours, taille_lot=lot, progression=progression)
+    click.echo(err=True)
+    click.echo(
+        f"{utilisateurs} utilisateurs, {totaux[0]} transactions, {totaux[1]} fournisseurs et "
+        f"{totaux[2]} bénéficiaires générés en {time.perf_counter() - debut:.1f} s"
+    )
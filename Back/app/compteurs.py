@@ -0,0 +1,148 @@
+import os
+import random
+import threading
+import time
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import case, func, literal, select, update
+
+from app import db
+from app.models import Compteur, Transaction, Fournisseur, Beneficiaire
+
+# Compteurs du tableau de bord (table "compteurs")
+COMPTEURS = ('transactions', 'fournisseurs', 'beneficiaires', 'volume_FCFA', 'volume_USDT')
+
+# Numéros de version des tables, incrémentés à chaque écriture (ETag des listes)
+VERSIONS = ('version_transactions', 'version_fournisseurs', 'version_beneficiaires')
+
+# Nombre de lignes (slots) de chaque compteur : une écriture n'en modifie qu'une, la lecture
+# les additionne. Sous PostgreSQL, deux transactions concurrentes qui écrivent sur des slots
+# différents ne s'attendent pas jusqu'au commit (changer cette valeur demande une migration
+# qui crée les lignes, voir 0007_compteurs_repartis).
+COMPTEUR_SLOTS = 16
+
+# Dernière lecture des compteurs : (valeurs, date d'expiration)
+_cache = {}
+
+# Slot des écritures de chaque thread, tiré au hasard à sa première écriture (et de nouveau
+# après un fork) : toutes les écritures d'une transaction portent sur le même slot (compteurs
+# et cumuls journaliers)
+_slot = threading.local()
+
+
+def arrondi_usdt(valeur):
+    # Montant USDT tel que stocké dans une colonne Numeric(10, 2)
+    return Decimal(str(valeur)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def _calculer_depuis_tables():
+    # Balayage complet, utilisé uniquement pour initialiser les compteurs absents
+    return {
+        'transactions': db.session.query(func.count(Transaction.id)).scalar(),
+        'fournisseurs': db.session.query(func.count(Fournisseur.id)).scalar(),
+        'beneficiaires': db.session.query(func.count(Beneficiaire.id)).scalar(),
+        'volume_FCFA': db.session.query(func.coalesce(func.sum(Transaction.montant_FCFA), 0)).scalar(),
+        'volume_USDT': db.session.query(func.coalesce(func.sum(Transaction.montant_USDT), 0)).scalar(),
+    }
+
+
+def initialiser_compteurs():
+    # Crée les lignes manquantes : valeur calculée depuis les tables dans le slot 0 d'un
+    # compteur absent, zéro dans les autres slots
+    existants = set(db.session.execute(select(Compteur.nom, Compteur.slot)).all())
+    manquants = [
+        (nom, slot) for nom in COMPTEURS + VERSIONS for slot in range(COMPTEUR_SLOTS)
+        if (nom, slot) not in existants
+    ]
+    if not manquants:
+        return
+
+    noms_existants = {nom for nom, _ in existants}
+    valeurs = _calculer_depuis_tables() if any(nom not in noms_existants for nom, _ in manquants) else {}
+    for nom, slot in manquants:
+        valeur = valeurs.get(nom, 0) if slot == 0 and nom not in noms_existants else 0
+        db.session.add(Compteur(nom=nom, slot=slot, valeur=valeur))
+    db.session.commit()
+
+
+def slot_du_thread():
+    if getattr(_slot, 'pid', None) != os.getpid():
+        _slot.valeur = random.randrange(COMPTEUR_SLOTS)
+        _slot.pid = os.getpid()
+    return _slot.valeur
+
+
+def ajuster_compteurs(**deltas):
+    # Incrément atomique (valeur = valeur + delta) de tous les compteurs en une seule
+    # requête, sur le slot du thread, dans la transaction en cours : validé par le même
+    # commit que la modification
+    deltas = {nom: Decimal(str(delta)) for nom, delta in deltas.items() if delta}
+    if deltas:
+        increment = case(
+            *[(Compteur.nom == nom, literal(delta, Compteur.valeur.type)) for nom, delta in deltas.items()],
+            else_=literal(0, Compteur.valeur.type)
+        )
+        db.session.execute(
+            update(Compteur)
+            .where(Compteur.nom.in_(deltas), Compteur.slot == slot_du_thread())
+            .values(valeur=Compteur.valeur + increment),
+            execution_options={'synchronize_session': False}
+        )
+    _cache.clear()
+
+
+def marquer_modifiees(*tables, **deltas):
+    # Incrémente la version des tables modifiées (avec d'éventuels autres compteurs)
+    ajuster_compteurs(**deltas, **{f'version_{table}': 1 for table in tables})
+
+
+def requete_versions(*tables):
+    # Noms des lignes de version des tables demandées et requête qui les lit (slots
+    # additionnés) ; partagé avec les vues asynchrones (app/asgi.py)
+    noms = [f'version_{table}' for table in tables]
+    return noms, select(Compteur.nom, func.sum(Compteur.valeur)).where(Compteur.nom.in_(noms)).group_by(Compteur.nom)
+
+
+def versions_lues(noms, lignes):
+    versions = dict(lignes)
+    return tuple(int(versions.get(nom, 0)) for nom in noms)
+
+
+def versions_tables(*tables):
+    # Versions actuelles des tables (lecture directe, sans cache) : seules les lignes de
+    # version des tables demandées sont lues, pas celles des compteurs du tableau de bord
+    noms, requete = requete_versions(*tables)
+    return versions_lues(noms, db.session.execute(requete).all())
+
+
+def requete_compteurs():
+    # Tous les compteurs en une requête, slots additionnés par la base
+    return select(Compteur.nom, func.sum(Compteur.valeur)).group_by(Compteur.nom)
+
+
+def compteurs_lus(lignes):
+    valeurs = {nom: Decimal(0) for nom in COMPTEURS + VERSIONS}
+    valeurs.update(lignes)
+    return valeurs
+
+
+def compteurs_en_cache(ttl):
+    # Dernière lecture des compteurs si elle a moins de "ttl" secondes, sinon None
+    cache = _cache.get('compteurs')
+    if ttl and cache and cache[1] > time.monotonic():
+        return cache[0]
+    return None
+
+
+def garder_compteurs(valeurs, ttl):
+    if ttl:
+        _cache['compteurs'] = (valeurs, time.monotonic() + ttl)
+
+
+def lire_compteurs(ttl=0):
+    # Lecture des compteurs, mise en cache "ttl" secondes
+    valeurs = compteurs_en_cache(ttl)
+    if valeurs is None:
+        valeurs = compteurs_lus(db.session.execute(requete_compteurs()).all())
+        garder_compteurs(valeurs, ttl)
+    return valeurs
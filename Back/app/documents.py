@@ -0,0 +1,76 @@
+from sqlalchemy import select
+
+from app.models import Transaction
+from app.pagination import keyset_filter
+
+
+# Mise en forme des réponses, partagée par les routes et l'export : les objets reçus peuvent être des modèles ORM ou des lignes (Row) de même nom de colonnes.
+# Les valeurs sont laissées telles quelles (Decimal, datetime) : l'encodage JSON est celui de app.serialisation,
+# commun à toutes les routes (montants en nombres, dates en ISO 8601)
+
+def transaction_en_dict(transaction):
+    return {
+        "id": transaction.id,
+        "montantFCFA": transaction.montant_FCFA,
+        "tauxConv": transaction.taux_convenu,
+        "montantUSDT": transaction.montant_USDT,
+        "dateTransaction": transaction.date_transaction.isoformat()  # Format ISO pour DateTime
+    }
+
+
+def format_transactions(parametre, accept):
+    # Représentation de /trans/all : "ndjson" (paramètre format ou en-tête Accept déjà analysé) ou "json"
+    if parametre == 'ndjson' or accept.best == 'application/x-ndjson':
+        return 'ndjson'
+    return 'json'
+
+
+def select_transactions(after=None):
+    # Sélection des seules colonnes utiles, triées sur la clé (date_transaction, id)
+    query = select(
+        Transaction.id,
+        Transaction.montant_FCFA,
+        Transaction.taux_convenu,
+        Transaction.montant_USDT,
+        Transaction.date_transaction,
+    ).order_by(Transaction.date_transaction, Transaction.id)
+    if after:
+        query = query.where(keyset_filter(Transaction.date_transaction, Transaction.id, after))
+    return query
+
+
+def document_fournisseur(fournisseur, transaction, beneficiaires):
+    return {
+        "id": fournisseur.id,
+        "nom": fournisseur.nom,
+        "taux_jour": fournisseur.taux_jour,
+        "quantite_USDT": fournisseur.quantite_USDT,
+        "transaction_id": fournisseur.transaction_id,
+        "transaction": {
+            "id": transaction.id,
+            "montant_FCFA": transaction.montant_FCFA,
+            "taux_convenu": transaction.taux_convenu,
+            "montant_USDT": transaction.montant_USDT,
+        } if transaction else None,
+        "beneficiaires": [
+            {
+                "id": benef.id,
+                "nom": benef.nom,
+                "commission_USDT": benef.commission_USDT
+            } for benef in beneficiaires
+        ]
+    }
+
+
+def document_beneficiaire(beneficiaire, fournisseur):
+    return {
+        "id": beneficiaire.id,
+        "nom": beneficiaire.nom,
+        "commission_USDT": beneficiaire.commission_USDT,
+        "fournisseur": {
+            "id": fournisseur.id if fournisseur else None,
+            "nom": fournisseur.nom if fournisseur else "Inconnu",
+            "taux_jour": fournisseur.taux_jour if fournisseur else None,
+            "quantite_USDT": fournisseur.quantite_USDT if fournisseur else None
+        }
+    }
@@ -0,0 +1,177 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+
+from app import db
+from app.analytique import ajuster_volumes
+from app.benefices import rafraichir_benefices
+from app.compteurs import arrondi_usdt, marquer_modifiees
+from app.metriques import TAILLE_LOTS
+from app.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+# Thread d'écriture groupée propre à chaque processus serveur (recréé après un fork)
+_ecrivain = {'pid': None, 'app': None, 'file': None, 'thread': None}
+_verrou = threading.Lock()
+
+# Élément déposé dans la file pour arrêter le thread d'écriture (après les lots en attente)
+_ARRET = object()
+
+
+class EcritureIndisponible(Exception):
+    # Levée quand la file d'écriture est pleine ou que le lot n'est pas validé à temps
+    pass
+
+
+def inserer_transactions(records):
+    # Insertion multi-lignes de transactions (montant_FCFA, taux_convenu, montant_USDT), avec
+    # compteurs, cumuls journaliers et bénéfices, dans la transaction en cours (sans commit) ;
+    # renvoie les lignes insérées (id, date_transaction, ...) dans l'ordre de "records"
+    inserees = db.session.execute(
+        insert(Transaction).returning(
+            Transaction.id,
+            Transaction.date_transaction,
+            Transaction.montant_FCFA,
+            Transaction.montant_USDT,
+            Transaction.taux_convenu,
+            sort_by_parameter_order=True
+        ),
+        records
+    ).all()
+    ajuster_volumes([ligne[1:] for ligne in inserees])
+    rafraichir_benefices(Transaction.id.in_([ligne.id for ligne in inserees]))
+    marquer_modifiees(
+        'transactions',
+        transactions=len(records),
+        volume_FCFA=sum(record["montant_FCFA"] for record in records),
+        volume_USDT=sum(arrondi_usdt(record["montant_USDT"]) for record in records)
+    )
+    return inserees
+
+
+def message_erreur(erreur):
+    # Motif d'un refus de la base présentable au client (le détail reste dans le journal)
+    if isinstance(erreur, IntegrityError):
+        return "Ligne refusée par la base (contrainte non respectée)"
+    if isinstance(erreur, DataError):
+        return "Valeur refusée par la base (hors limites ou mal formée)"
+    return "Ligne refusée par la base"
+
+
+def valider_transactions(records):
+    # Insère les transactions et valide (commit) en une fois ; si la base refuse le lot, chaque
+    # transaction est reprise seule pour qu'une ligne invalide ne fasse pas échouer les autres.
+    # Renvoie, dans l'ordre de "records", la ligne insérée ou l'erreur SQLAlchemy.
+    try:
+        inserees = inserer_transactions(records)
+        db.session.commit()
+        return list(inserees)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        if len(records) == 1:
+            logger.warning("Transaction refusée par la base : %s", getattr(e, "orig", None) or e)
+            return [e]
+        logger.warning("Lot de %d transactions rejeté, reprise ligne par ligne : %s",
+                       len(records), getattr(e, "orig", None) or e)
+        return [resultat for record in records for resultat in valider_transactions([record])]
+
+
+def _valider_lot(lot):
+    for (_, resultat), ligne in zip(lot, valider_transactions([record for record, _ in lot])):
+        if isinstance(ligne, SQLAlchemyError):
+            resultat.set_exception(ligne)
+        else:
+            resultat.set_result(ligne)
+
+
+def _lire_lot(file, taille_lot, attente):
+    # Attend une première transaction, puis complète le lot pendant au plus "attente" secondes
+    # (ou tant que d'autres sont déjà en file) ; renvoie (lot, arrêt demandé)
+    premier = file.get()
+    if premier is _ARRET:
+        return [], True
+    lot = [premier]
+    limite = time.monotonic() + attente
+    while len(lot) < taille_lot:
+        reste = limite - time.monotonic()
+        try:
+            element = file.get(timeout=reste) if reste > 0 else file.get_nowait()
+        except queue.Empty:
+            break
+        if element is _ARRET:
+            return lot, True
+        lot.append(element)
+    return lot, False
+
+
+def _ecrire(app, file):
+    config = app.config
+    taille_lot = config['TRANSACTION_BATCH_SIZE']
+    attente = config['TRANSACTION_BATCH_WAIT_MS'] / 1000
+    with app.app_context():
+        arret = False
+        while not arret:
+            lot, arret = _lire_lot(file, taille_lot, attente)
+            if not lot:
+                continue
+            try:
+                _valider_lot(lot)
+            except Exception as e:
+                # Erreur hors base (connexion perdue...) : les appelants sont prévenus, le thread continue
+                logger.exception("Échec de l'écriture d'un lot de %d transactions", len(lot))
+                for _, resultat in lot:
+                    if not resultat.done():
+                        resultat.set_exception(e)
+            finally:
+                # Connexion rendue au pool entre deux lots
+                db.session.remove()
+            TAILLE_LOTS.observe(len(lot))
+
+
+def _arreter():
+    # Fin du processus : les lots en attente sont validés avant l'arrêt du thread
+    with _verrou:
+        if _ecrivain['pid'] != os.getpid() or _ecrivain['thread'] is None:
+            return
+        _ecrivain['file'].put(_ARRET)
+        _ecrivain['thread'].join(timeout=_ecrivain['app'].config['TRANSACTION_ACK_TIMEOUT'])
+        _ecrivain.update(pid=None, app=None, file=None, thread=None)
+
+
+def _file():
+    app = current_app._get_current_object()
+    with _verrou:
+        if _ecrivain['pid'] != os.getpid() or _ecrivain['app'] is not app:
+            if _ecrivain['pid'] == os.getpid():
+                # Autre application dans le même processus (tests, bench) : ancien thread arrêté
+                _ecrivain['file'].put(_ARRET)
+            else:
+                atexit.register(_arreter)
+            file = queue.Queue(maxsize=app.config['TRANSACTION_QUEUE_SIZE'])
+            thread = threading.Thread(target=_ecrire, args=(app, file), name='ecriture-transactions', daemon=True)
+            thread.start()
+            _ecrivain.update(pid=os.getpid(), app=app, file=file, thread=thread)
+    return _ecrivain['file']
+
+
+def ajouter_en_file(record):
+    # Confie la transaction au thread d'écriture et attend le commit de son lot ; renvoie la
+    # ligne insérée (id, date_transaction, ...) ou lève l'erreur de la base
+    resultat = Future()
+    try:
+        _file().put_nowait((record, resultat))
+    except queue.Full:
+        raise EcritureIndisponible("File d'écriture pleine, réessayez plus tard")
+    try:
+        return resultat.result(timeout=current_app.config['TRANSACTION_ACK_TIMEOUT'])
+    except TimeoutError:
+        raise EcritureIndisponible("Écriture non confirmée dans le délai, la transaction a pu être enregistrée")
@@ -0,0 +1,50 @@
+import hashlib
+from functools import wraps
+
+from flask import make_response, request
+
+from app.compteurs import versions_tables
+
+
+def calculer_etag(chemin, versions, format=None):
+    # ETag d'une liste : URL demandée, versions des tables lues et représentation choisie
+    # (JSON, NDJSON...) quand elle dépend des en-têtes de la requête
+    return hashlib.sha1(f"{chemin}|{versions}|{format}".encode()).hexdigest()
+
+
+def etag_connu(etag, if_none_match):
+    # Variante de l'ETag déjà détenue par le client, compressées comprises
+    # (voir serialisation.compresser_reponse), ou None
+    variantes = [etag, f"{etag}-gzip", f"{etag}-br"]
+    return next((variante for variante in variantes if variante in if_none_match), None)
+
+
+def etag_tables(*tables, format=None):
+    # Décorateur des routes de liste : ETag fort calculé à partir des versions des tables
+    # lues par la route et de l'URL demandée. Si le client envoie un If-None-Match
+    # correspondant, on répond 304 sans exécuter la route (ni sa requête de liste).
+    # "format" : fonction renvoyant la représentation choisie d'après l'en-tête Accept,
+    # incluse dans l'ETag (réponses marquées "Vary: Accept")
+    def decorateur(vue):
+        @wraps(vue)
+        def wrapper(*args, **kwargs):
+            versions = versions_tables(*tables)
+            etag = calculer_etag(request.full_path, versions, format() if format else None)
+            connu = etag_connu(etag, request.if_none_match)
+
+            if connu:
+                response = make_response('', 304)
+                response.set_etag(connu)
+            else:
+                response = make_response(vue(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response.set_etag(etag)
+
+            # Le navigateur revalide à chaque fois, mais ne retélécharge que si la liste a changé
+            response.headers['Cache-Control'] = 'no-cache'
+            if format:
+                response.vary.add('Accept')
+            return response
+        return wrapper
+    return decorateur
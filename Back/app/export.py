@@ -0,0 +1,138 @@
+import csv
+import io
+
+from sqlalchemy import select
+
+from app.models import Transaction, Fournisseur, Beneficiaire
+
+# Nombre de lignes lues par lot via le curseur serveur (et par groupe de lignes Parquet)
+EXPORT_BATCH_SIZE = 5000
+
+FORMATS_EXPORT = ('csv', 'parquet')
+TYPES_EXPORT = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+
+# Colonnes exportées : une ligne par bénéficiaire, ou par fournisseur / transaction sans enfant
+COLONNES_EXPORT = (
+    'transaction_id', 'date_transaction', 'montant_FCFA', 'taux_convenu', 'montant_USDT',
+    'fournisseur_id', 'fournisseur_nom', 'taux_jour', 'quantite_USDT',
+    'beneficiaire_id', 'beneficiaire_nom', 'commission_USDT',
+)
+
+
+class ExportIndisponible(Exception):
+    # Format demandé dont la dépendance optionnelle n'est pas installée
+    pass
+
+
+def requete_export(*conditions):
+    # Grand livre : transactions ⟕ fournisseurs ⟕ bénéficiaires, dans l'ordre des transactions
+    return select(
+        Transaction.id.label('transaction_id'),
+        Transaction.date_transaction,
+        Transaction.montant_FCFA,
+        Transaction.taux_convenu,
+        Transaction.montant_USDT,
+        Fournisseur.id.label('fournisseur_id'),
+        Fournisseur.nom.label('fournisseur_nom'),
+        Fournisseur.taux_jour,
+        Fournisseur.quantite_USDT,
+        Beneficiaire.id.label('beneficiaire_id'),
+        Beneficiaire.nom.label('beneficiaire_nom'),
+        Beneficiaire.commission_USDT,
+    ).outerjoin(
+        Fournisseur, Fournisseur.transaction_id == Transaction.id
+    ).outerjoin(
+        Beneficiaire, Beneficiaire.fournisseur_id == Fournisseur.id
+    ).where(*conditions).order_by(
+        Transaction.date_transaction, Transaction.id, Fournisseur.id, Beneficiaire.id
+    )
+
+
+def lots_export(session, query, taille=EXPORT_BATCH_SIZE):
+    # Lots de lignes lus via un curseur serveur : la mémoire utilisée ne dépend que de "taille"
+    resultat = session.execute(query.execution_options(stream_results=True, yield_per=taille))
+    yield from resultat.partitions()
+
+
+def csv_par_lots(lots):
+    # Un morceau CSV (bytes) par lot, précédé de l'en-tête
+    tampon = io.StringIO()
+    writer = csv.writer(tampon)
+    writer.writerow(COLONNES_EXPORT)
+    for lot in lots:
+        writer.writerows(lot)
+        yield tampon.getvalue().encode()
+        tampon.seek(0)
+        tampon.truncate()
+    if tampon.tell():
+        yield tampon.getvalue().encode()
+
+
+class _Tampon(io.RawIOBase):
+    # Destination de ParquetWriter dont on récupère les octets écrits au fil de l'eau
+    def __init__(self):
+        self._morceaux = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, donnees):
+        self._morceaux.append(bytes(donnees))
+        self._position += len(donnees)
+        return len(donnees)
+
+    def tell(self):
+        return self._position
+
+    def vider(self):
+        donnees = b''.join(self._morceaux)
+        self._morceaux = []
+        return donnees
+
+
+def parquet_disponible():
+    try:
+        import pyarrow.parquet  # noqa: F401  Dépendance optionnelle : export Parquet
+    except ImportError:
+        return False
+    return True
+
+
+def parquet_par_lots(lots):
+    # Un groupe de lignes Parquet par lot, envoyé dès qu'il est écrit (le pied de fichier
+    # arrive à la fin) ; pyarrow n'est importé qu'à la première utilisation
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    montant = pa.decimal128(10, 2)
+    schema = pa.schema([
+        ('transaction_id', pa.int64()), ('date_transaction', pa.timestamp('us')),
+        ('montant_FCFA', pa.int64()), ('taux_convenu', pa.int64()), ('montant_USDT', montant),
+        ('fournisseur_id', pa.int64()), ('fournisseur_nom', pa.string()),
+        ('taux_jour', pa.int64()), ('quantite_USDT', montant),
+        ('beneficiaire_id', pa.int64()), ('beneficiaire_nom', pa.string()),
+        ('commission_USDT', montant),
+    ])
+
+    tampon = _Tampon()
+    with pq.ParquetWriter(tampon, schema, compression='snappy') as writer:
+        for lot in lots:
+            colonnes = list(zip(*lot))
+            writer.write_table(pa.table(
+                [pa.array(colonne, type=champ.type) for colonne, champ in zip(colonnes, schema)],
+                schema=schema
+            ))
+            yield tampon.vider()
+    yield tampon.vider()
+
+
+def exporter(session, format, *conditions):
+    # Générateur des morceaux (bytes) de l'export au format demandé ; ExportIndisponible
+    # est levée avant toute lecture si le format n'est pas utilisable
+    if format == 'parquet' and not parquet_disponible():
+        raise ExportIndisponible("Export Parquet indisponible : le paquet pyarrow n'est pas installé")
+    lots = lots_export(session, requete_export(*conditions))
+    if format == 'parquet':
+        return parquet_par_lots(lots)
+    return csv_par_lots(lots)
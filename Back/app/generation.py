@@ -0,0 +1,163 @@
+import itertools
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select
+
+from app import db
+from app.analytique import initialiser_volumes
+from app.benefices import initialiser_benefices
+from app.compteurs import COMPTEURS, arrondi_usdt, initialiser_compteurs, marquer_modifiees
+from app.models import Benefice, Compteur, User, Transaction, Fournisseur, Beneficiaire, VolumeJournalier
+
+# Nombre de transactions insérées (avec leurs fournisseurs et bénéficiaires) par lot
+SEED_BATCH_SIZE = 10000
+
+# Proportions des données générées : fournisseurs par transaction (0, 1 ou 2) et
+# bénéficiaires par fournisseur (0 à 3)
+POIDS_FOURNISSEURS = (0.2, 0.6, 0.2)
+POIDS_BENEFICIAIRES = (0.1, 0.4, 0.3, 0.2)
+
+# Adresses des utilisateurs générés (supprimés par "flask seed --vider")
+DOMAINE_UTILISATEURS = 'seed.exemple.com'
+
+PRENOMS = (
+    'Awa', 'Moussa', 'Fatou', 'Ibrahim', 'Aminata', 'Koffi', 'Mariam', 'Seydou',
+    'Adjoa', 'Yao', 'Kadiatou', 'Oumar', 'Rokia', 'Boubacar', 'Aïcha', 'Komi',
+)
+NOMS = (
+    'Diallo', 'Traoré', 'Koné', 'Mensah', 'Ouédraogo', 'Sow', 'Camara', 'Kouassi',
+    'Bamba', 'Agbeko', 'Diop', 'Sanogo', 'Tchakounté', 'Ndiaye', 'Coulibaly', 'Amah',
+)
+
+
+def lire_taille(valeur):
+    # Nombre de lignes écrit "10000", "10k", "100k" ou "1M" ; ValueError si invalide
+    texte = str(valeur).strip().lower().replace('_', '')
+    multiplicateur = {'k': 1_000, 'm': 1_000_000}.get(texte[-1:], 1)
+    if multiplicateur > 1:
+        texte = texte[:-1]
+    try:
+        taille = int(float(texte) * multiplicateur)
+    except ValueError:
+        raise ValueError(f"Taille invalide : {valeur!r} (ex. 10000, 100k, 1M)")
+    if taille < 0:
+        raise ValueError(f"Taille invalide : {valeur!r} (ex. 10000, 100k, 1M)")
+    return taille
+
+
+def _nom(hasard, numero):
+    # Noms uniques (contrainte UNIQUE) mais vraisemblables
+    return f"{hasard.choice(PRENOMS)} {hasard.choice(NOMS)} {numero}"
+
+
+def _transactions(hasard, nombre, debut, jours):
+    # Taux convenu entre 590 et 660 FCFA/USDT, montants de 50 000 à 5 000 000 FCFA
+    lignes = []
+    for _ in range(nombre):
+        taux = hasard.randint(590, 660)
+        montant = hasard.randrange(50_000, 5_000_000, 500)
+        lignes.append({
+            "montant_FCFA": montant,
+            "taux_convenu": taux,
+            "montant_USDT": arrondi_usdt(montant / taux),
+            "date_transaction": debut + timedelta(seconds=hasard.randrange(jours * 86400)),
+        })
+    return lignes
+
+
+def generer_lot(hasard, nombre, debut, jours, compteur_noms):
+    # Insère "nombre" transactions avec leurs fournisseurs et bénéficiaires (requêtes
+    # multi-lignes, ids récupérés par RETURNING) ; renvoie les nombres de lignes insérées
+    transactions = _transactions(hasard, nombre, debut, jours)
+    ids = db.session.scalars(
+        insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True), transactions
+    ).all()
+
+    fournisseurs = []
+    for transaction_id, transaction in zip(ids, transactions):
+        nb = hasard.choices(range(len(POIDS_FOURNISSEURS)), POIDS_FOURNISSEURS)[0]
+        for _ in range(nb):
+            # Le fournisseur vend sous le taux convenu (marge de 2 à 15 FCFA par USDT)
+            quantite = transaction["montant_USDT"] / nb
+            fournisseurs.append({
+                "nom": _nom(hasard, next(compteur_noms)),
+                "taux_jour": transaction["taux_convenu"] - hasard.randint(2, 15),
+                "quantite_USDT": arrondi_usdt(quantite),
+                "transaction_id": transaction_id,
+            })
+    fournisseur_ids = db.session.scalars(
+        insert(Fournisseur).returning(Fournisseur.id, sort_by_parameter_order=True), fournisseurs
+    ).all() if fournisseurs else []
+
+    beneficiaires = [
+        {
+            "nom": _nom(hasard, next(compteur_noms)),
+            "commission_USDT": arrondi_usdt(hasard.uniform(0.5, 3)),
+            "fournisseur_id": fournisseur_id,
+        }
+        for fournisseur_id in fournisseur_ids
+        for _ in range(hasard.choices(range(len(POIDS_BENEFICIAIRES)), POIDS_BENEFICIAIRES)[0])
+    ]
+    if beneficiaires:
+        db.session.execute(insert(Beneficiaire), beneficiaires)
+
+    return len(ids), len(fournisseur_ids), len(beneficiaires)
+
+
+def generer_utilisateurs(nombre, mot_de_passe_hache):
+    # Utilisateurs "utilisateur-<n>@seed.exemple.com", tous avec le même mot de passe
+    # (haché une seule fois : le hachage coûte plusieurs centaines de millisecondes)
+    debut = db.session.query(User.id).filter(User.email.like(f'%@{DOMAINE_UTILISATEURS}')).count()
+    db.session.execute(insert(User), [
+        {"email": f"utilisateur-{n}@{DOMAINE_UTILISATEURS}", "password": mot_de_passe_hache}
+        for n in range(debut, debut + nombre)
+    ])
+    db.session.commit()
+
+
+def vider():
+    # Supprime toutes les transactions (fournisseurs, bénéficiaires et bénéfices par
+    # ON DELETE CASCADE) et les utilisateurs générés
+    db.session.execute(delete(Transaction))
+    db.session.execute(delete(User).where(User.email.like(f'%@{DOMAINE_UTILISATEURS}')))
+    db.session.commit()
+
+
+def recalculer_agregats():
+    # Compteurs, cumuls journaliers et bénéfices reconstruits depuis les tables après
+    # une insertion massive qui ne passe pas par les routes ; les versions des tables
+    # sont incrémentées (les ETag déjà distribués ne correspondent plus)
+    db.session.execute(delete(Compteur).where(Compteur.nom.in_(COMPTEURS)))
+    db.session.execute(delete(VolumeJournalier))
+    db.session.execute(delete(Benefice))
+    db.session.commit()
+
+    initialiser_compteurs()
+    initialiser_volumes()
+    initialiser_benefices()
+    marquer_modifiees('transactions', 'fournisseurs', 'beneficiaires')
+    db.session.commit()
+
+
+def generer(nb_transactions, graine=None, jours=365, taille_lot=SEED_BATCH_SIZE, progression=None):
+    # Génère nb_transactions transactions réparties sur les "jours" derniers jours, par lots
+    # validés un par un ; "progression" est appelée après chaque lot avec les totaux
+    hasard = random.Random(graine)
+    debut = datetime.now().replace(microsecond=0) - timedelta(days=jours)
+    # Suffixe des noms : au-delà des ids existants, pour ne pas reprendre un nom déjà pris
+    premier = db.session.query(
+        func.coalesce(func.max(Fournisseur.id), 0) + select(func.coalesce(func.max(Beneficiaire.id), 0)).scalar_subquery()
+    ).scalar() + 1
+    compteur_noms = itertools.count(premier)
+
+    totaux = [0, 0, 0]
+    for depart in range(0, nb_transactions, taille_lot):
+        lot = generer_lot(hasard, min(taille_lot, nb_transactions - depart), debut, jours, compteur_noms)
+        db.session.commit()
+        totaux = [total + nombre for total, nombre in zip(totaux, lot)]
+        if progression:
+            progression(*totaux)
+
+    recalculer_agregats()
+    return tuple(totaux)
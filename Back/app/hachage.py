@@ -0,0 +1,86 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Pool de processus propre à chaque processus serveur (recréé après un fork, ou si la
+# configuration change : plusieurs applications dans un même processus)
+_pool = {'cle': None, 'executor': None, 'places': None}
+_verrou = threading.Lock()
+
+
+class HachageIndisponible(Exception):
+    # Levée quand aucune place ne se libère dans le pool avant HASH_QUEUE_TIMEOUT, ou que le
+    # calcul n'est pas terminé après HASH_TIMEOUT secondes
+    pass
+
+
+def _executor():
+    config = current_app.config
+    workers = config.get('HASH_WORKERS') or 0
+    places = config.get('HASH_MAX_PENDING', 32)
+    with _verrou:
+        if _pool['cle'] != (os.getpid(), workers, places):
+            if _pool['executor'] is not None and _pool['cle'][0] == os.getpid():
+                _pool['executor'].shutdown(wait=False)
+            _pool['executor'] = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+            _pool['places'] = threading.BoundedSemaphore(places)
+            _pool['cle'] = (os.getpid(), workers, places)
+    return _pool['executor'], _pool['places']
+
+
+def _executer(fonction, *args):
+    executor, places = _executor()
+    config = current_app.config
+
+    # File d'attente bornée : au-delà de HASH_MAX_PENDING calculs en cours, on attend
+    # au plus HASH_QUEUE_TIMEOUT secondes avant de refuser la requête
+    if not places.acquire(timeout=config.get('HASH_QUEUE_TIMEOUT', 5)):
+        raise HachageIndisponible()
+    if executor is None:
+        try:
+            return fonction(*args)
+        finally:
+            places.release()
+
+    # La place n'est libérée qu'à la fin du calcul, même si la requête a cessé de l'attendre :
+    # un pool bloqué finit par refuser les nouvelles requêtes au lieu d'accumuler les calculs
+    try:
+        futur = executor.submit(fonction, *args)
+    except BrokenProcessPool:
+        places.release()
+        _oublier_pool()
+        raise HachageIndisponible()
+    futur.add_done_callback(lambda _: places.release())
+    try:
+        return futur.result(timeout=config.get('HASH_TIMEOUT', 10))
+    except TimeoutError:
+        raise HachageIndisponible()
+    except BrokenProcessPool:
+        # Processus de hachage tué : le pool sera recréé à la requête suivante
+        _oublier_pool()
+        raise HachageIndisponible()
+
+
+def _oublier_pool():
+    with _verrou:
+        if _pool['executor'] is not None:
+            _pool['executor'].shutdown(wait=False, cancel_futures=True)
+        _pool['cle'] = None
+
+
+def hacher_mot_de_passe(password):
+    # Hachage avec la méthode et le coût configurés (PASSWORD_HASH_METHOD)
+    return _executer(generate_password_hash, password, current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def verifier_mot_de_passe(pwhash, password):
+    return _executer(check_password_hash, pwhash, password)
+
+
+def doit_rehacher(pwhash):
+    # Vrai si le hash a été produit avec d'autres paramètres que ceux configurés
+    return pwhash.split('$', 1)[0] != current_app.config['PASSWORD_HASH_METHOD']
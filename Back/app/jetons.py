@@ -0,0 +1,76 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+from app import db
+from app.models import JetonRevoque
+
+# Jetons révoqués connus de ce processus : (ensemble des jti, date de rafraîchissement)
+_revoques = {'jtis': set(), 'rafraichi': 0.0}
+
+
+def _serializer():
+    # SECRET_KEY signe les nouveaux jetons, SECRET_KEY_FALLBACKS (anciennes clés)
+    # reste acceptée pour vérifier les jetons émis avant une rotation
+    config = current_app.config
+    cles = list(config.get('SECRET_KEY_FALLBACKS') or []) + [config['SECRET_KEY']]
+    return URLSafeTimedSerializer(cles, salt='jeton-session')
+
+
+def creer_jeton(user):
+    # Jeton signé portant l'id et l'email : aucune lecture de "users" pour le vérifier
+    return _serializer().dumps({"id": user.id, "email": user.email, "jti": uuid.uuid4().hex})
+
+
+def _jetons_revoques():
+    # Liste de révocation relue au plus toutes les TOKEN_REVOCATION_REFRESH secondes
+    maintenant = time.monotonic()
+    if maintenant - _revoques['rafraichi'] >= current_app.config.get('TOKEN_REVOCATION_REFRESH', 30):
+        jtis = db.session.query(JetonRevoque.jti).filter(JetonRevoque.expire_le > datetime.utcnow()).all()
+        _revoques['jtis'] = {jti for (jti,) in jtis}
+        _revoques['rafraichi'] = maintenant
+    return _revoques['jtis']
+
+
+def verifier_jeton(jeton):
+    # Renvoie le contenu du jeton, ou None s'il est invalide, expiré ou révoqué
+    try:
+        contenu = _serializer().loads(jeton, max_age=current_app.config['TOKEN_MAX_AGE'])
+    except (BadSignature, SignatureExpired):
+        return None
+    if contenu.get('jti') in _jetons_revoques():
+        return None
+    return contenu
+
+
+def revoquer_jeton(contenu):
+    # Révocation jusqu'à l'expiration naturelle du jeton, purge des entrées expirées
+    maintenant = datetime.utcnow()
+    db.session.query(JetonRevoque).filter(JetonRevoque.expire_le <= maintenant).delete()
+    db.session.merge(JetonRevoque(
+        jti=contenu['jti'],
+        expire_le=maintenant + timedelta(seconds=current_app.config['TOKEN_MAX_AGE'])
+    ))
+    db.session.commit()
+    _revoques['jtis'].add(contenu['jti'])
+
+
+def jeton_requis(vue):
+    # Décorateur : exige "Authorization: Bearer <jeton>" et place son contenu dans g.utilisateur
+    @wraps(vue)
+    def wrapper(*args, **kwargs):
+        entete = request.headers.get('Authorization', '')
+        if not entete.startswith('Bearer '):
+            return jsonify({"message": "Jeton d'authentification requis"}), 401
+
+        contenu = verifier_jeton(entete[len('Bearer '):])
+        if contenu is None:
+            return jsonify({"message": "Jeton invalide ou expiré"}), 401
+
+        g.utilisateur = contenu
+        return vue(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,185 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, request
+
+logger = logging.getLogger('app.requetes')
+
+# Identifiant de la requête HTTP en cours, ajouté à chaque ligne de journal
+_id_requete = contextvars.ContextVar('id_requete', default=None)
+
+# Identifiant reçu dans X-Request-ID (proxy, client) repris tel quel s'il est raisonnable
+ID_REQUETE_VALIDE = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+# Attributs standard des LogRecord : tous les autres viennent de "extra" et sont écrits en JSON
+ATTRIBUTS_STANDARD = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class FormateurJson(logging.Formatter):
+    # Une ligne JSON par message : date, niveau, logger, message, id de requête et champs "extra"
+    def format(self, record):
+        ligne = {
+            "date": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "niveau": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for nom, valeur in vars(record).items():
+            if nom not in ATTRIBUTS_STANDARD and not nom.startswith('_'):
+                ligne[nom] = valeur
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            ligne["exception"] = record.exc_text
+        return json.dumps(ligne, ensure_ascii=False, default=str)
+
+
+class FiltreEchantillonnage(logging.Filter):
+    # Ne garde qu'une fraction des messages DEBUG (taux par défaut, ou extra={"echantillon": taux}),
+    # avant leur mise en file : les messages écartés ne coûtent presque rien
+    def __init__(self, taux):
+        super().__init__()
+        self.taux = taux
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        taux = getattr(record, 'echantillon', self.taux)
+        return taux >= 1 or random.random() < taux
+
+
+class GestionnaireFile(QueueHandler):
+    # Le thread de la requête ne fait que préparer le message et le déposer dans une file bornée ;
+    # un thread d'écriture (QueueListener) le formate et l'écrit. File pleine : le message est
+    # abandonné plutôt que de bloquer la requête, et les abandons sont signalés ensuite.
+    def __init__(self, file):
+        super().__init__(file)
+        self.perdus = 0
+
+    def prepare(self, record):
+        # Copie autonome (message final, trace d'exception en texte) : le record peut être
+        # formaté plus tard dans un autre thread, sans référence aux objets de la requête
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if not hasattr(record, 'request_id'):
+            identifiant = _id_requete.get()
+            if identifiant:
+                record.request_id = identifiant
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.perdus:
+                # Compte remis à zéro seulement une fois le signalement déposé dans la file
+                self.queue.put_nowait(self.prepare(logging.makeLogRecord({
+                    'name': 'app.journal', 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                    'msg': "%d messages de journal abandonnés (file pleine)", 'args': (self.perdus,),
+                })))
+                self.perdus = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.perdus += 1
+
+
+_journal = {'gestionnaire': None, 'ecrivain': None, 'cible': None}
+
+
+def _demarrer_ecrivain(taille_file):
+    file = queue.Queue(maxsize=taille_file)
+    _journal['gestionnaire'].queue = file
+    ecrivain = QueueListener(file, _journal['cible'], respect_handler_level=True)
+    ecrivain.start()
+    _journal['ecrivain'] = ecrivain
+
+
+def _arreter_ecrivain():
+    # Vide la file avant la sortie du processus
+    ecrivain = _journal['ecrivain']
+    if ecrivain is not None and ecrivain._thread is not None:
+        ecrivain.stop()
+
+
+def configurer_journal(app):
+    # Journal JSON non bloquant pour les loggers "app.*", plus l'identifiant et la durée de
+    # chaque requête (gestionnaire et thread d'écriture créés une fois par processus)
+    config = app.config
+    if _journal['gestionnaire'] is None:
+        cible = logging.StreamHandler(sys.stdout)
+        cible.setFormatter(FormateurJson())
+        gestionnaire = GestionnaireFile(queue.Queue(maxsize=config['LOG_QUEUE_SIZE']))
+        gestionnaire.addFilter(FiltreEchantillonnage(config['LOG_DEBUG_SAMPLE_RATE']))
+        _journal.update(gestionnaire=gestionnaire, cible=cible)
+        _demarrer_ecrivain(config['LOG_QUEUE_SIZE'])
+        atexit.register(_arreter_ecrivain)
+        # Le thread d'écriture ne survit pas à un fork (gunicorn preload_app) : nouvelle
+        # file et nouveau thread dans le processus fils
+        os.register_at_fork(after_in_child=lambda: _demarrer_ecrivain(config['LOG_QUEUE_SIZE']))
+
+    racine = logging.getLogger('app')
+    racine.setLevel(config['LOG_LEVEL'])
+    racine.propagate = False
+    if _journal['gestionnaire'] not in racine.handlers:
+        racine.addHandler(_journal['gestionnaire'])
+
+    @app.before_request
+    def identifier_requete():
+        g.id_requete = ouvrir_requete(request.headers.get('X-Request-ID'))
+        g.debut_journal = time.perf_counter()
+
+    @app.after_request
+    def journaliser_requete(response):
+        if 'id_requete' not in g:
+            return response
+        response.headers['X-Request-ID'] = g.id_requete
+        if config['LOG_REQUESTS']:
+            ecrire_ligne_requete(
+                request.method, request.path,
+                request.url_rule.rule if request.url_rule is not None else None,
+                response.status_code, time.perf_counter() - g.debut_journal, response.calculate_content_length(),
+            )
+        return response
+
+    @app.teardown_request
+    def oublier_requete(exception=None):
+        fermer_requete()
+
+
+# Fonctions communes aux hooks Flask ci-dessus et aux vues asynchrones (app/asgi.py)
+
+def ouvrir_requete(entrant):
+    # Identifiant de la requête : celui reçu dans X-Request-ID s'il est valide, sinon un
+    # nouveau ; ajouté aux lignes de journal écrites dans le contexte courant
+    identifiant = entrant if entrant and ID_REQUETE_VALIDE.match(entrant) else uuid.uuid4().hex
+    _id_requete.set(identifiant)
+    return identifiant
+
+
+def fermer_requete():
+    _id_requete.set(None)
+
+
+def ecrire_ligne_requete(methode, chemin, route, statut, duree, taille):
+    # Ligne de fin de requête (LOG_REQUESTS)
+    logger.info("%s %s %s", methode, chemin, statut, extra={
+        "methode": methode,
+        "route": route,
+        "statut": statut,
+        "duree_ms": round(duree * 1000, 2),
+        "taille": taille,
+    })
@@ -0,0 +1,187 @@
+import contextvars
+import glob
+import logging
+import os
+import time
+
+from flask import current_app, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+
+logger = logging.getLogger('app.requetes_lentes')
+
+# Mode multiprocessus de prometheus_client : avec PROMETHEUS_MULTIPROC_DIR (variable
+# d'environnement, lue à l'import, définie par gunicorn.conf.py), chaque processus écrit ses
+# valeurs dans ce dossier et /metrics additionne celles de tous les workers
+DOSSIER_MULTIPROCESSUS = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+# Clé de l'environ WSGI des requêtes internes de préchauffage (prechauffage.py), non mesurées
+ENVIRON_PRECHAUFFAGE = 'app.prechauffage'
+
+# Bornes des histogrammes : durées en secondes, tailles en octets
+BORNES_DUREE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BORNES_TAILLE = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+BORNES_SQL = (0, 1, 2, 5, 10, 20, 50, 100)
+BORNES_LOT = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+ETIQUETTES = ('method', 'route')
+
+# Métriques exposées sur /metrics
+REQUETES = Counter('http_requests_total', "Requêtes servies par route, méthode et statut", ETIQUETTES + ('status',))
+# Jauge additionnée sur les workers vivants seulement
+REQUETES_EN_COURS = Gauge(
+    'http_requests_in_progress', "Requêtes en cours par route et méthode", ETIQUETTES, multiprocess_mode='livesum'
+)
+DUREE = Histogram('http_request_duration_seconds', "Durée de traitement des requêtes", ETIQUETTES, buckets=BORNES_DUREE)
+TAILLE = Histogram(
+    'http_response_size_bytes', "Taille des réponses envoyées (après compression)", ETIQUETTES, buckets=BORNES_TAILLE
+)
+NB_SQL = Histogram('db_statements_per_request', "Requêtes SQL exécutées par requête HTTP", ETIQUETTES, buckets=BORNES_SQL)
+DUREE_SQL = Histogram('db_time_seconds_per_request', "Temps passé en base par requête HTTP", ETIQUETTES, buckets=BORNES_DUREE)
+TAILLE_LOTS = Histogram(
+    'transaction_write_batch_size', "Transactions validées par commit groupé (/trans/add)", buckets=BORNES_LOT
+)
+
+# Mesures SQL de la requête HTTP en cours (None hors requête : démarrage, commandes)
+_requete_courante = contextvars.ContextVar('requete_courante', default=None)
+
+
+class MesureRequete:
+    def __init__(self, etiquettes, capturer):
+        self.debut = time.perf_counter()
+        self.etiquettes = etiquettes
+        self.nb_sql = 0
+        self.duree_sql = 0.0
+        # Requêtes SQL et leurs durées, gardées seulement si le journal des requêtes lentes est actif
+        self.instructions = [] if capturer else None
+
+
+def _avant_execution(connexion, curseur, instruction, parametres, contexte, executemany):
+    if contexte is not None and _requete_courante.get() is not None:
+        contexte._debut_metrique = time.perf_counter()
+
+
+def _apres_execution(connexion, curseur, instruction, parametres, contexte, executemany):
+    mesure = _requete_courante.get()
+    debut = getattr(contexte, '_debut_metrique', None)
+    if mesure is None or debut is None:
+        return
+    duree = time.perf_counter() - debut
+    mesure.nb_sql += 1
+    mesure.duree_sql += duree
+    if mesure.instructions is not None:
+        mesure.instructions.append((instruction, duree))
+
+
+def instrumenter_moteur(moteur):
+    # Nombre et durée des requêtes SQL de chaque requête HTTP (événements du moteur)
+    event.listen(moteur, 'before_cursor_execute', _avant_execution)
+    event.listen(moteur, 'after_cursor_execute', _apres_execution)
+
+
+def commencer_mesure(methode, route, capturer):
+    # Début d'une requête HTTP (Flask ou vue asynchrone) : requête en cours, mesures SQL du
+    # contexte courant remises à zéro ; "capturer" garde le texte des requêtes SQL
+    mesure = MesureRequete((methode, route), capturer)
+    _requete_courante.set(mesure)
+    REQUETES_EN_COURS.labels(methode, route).inc()
+    return mesure
+
+
+def terminer_mesure(mesure, statut, taille, chemin, config):
+    # Fin d'une requête HTTP : durée totale, statut, taille (None si inconnue) et mesures SQL,
+    # requête lente journalisée au-delà de SLOW_REQUEST_MS
+    _requete_courante.set(None)
+    duree = time.perf_counter() - mesure.debut
+
+    etiquettes = mesure.etiquettes
+    REQUETES_EN_COURS.labels(*etiquettes).dec()
+    REQUETES.labels(*etiquettes, str(statut)).inc()
+    DUREE.labels(*etiquettes).observe(duree)
+    NB_SQL.labels(*etiquettes).observe(mesure.nb_sql)
+    DUREE_SQL.labels(*etiquettes).observe(mesure.duree_sql)
+    if taille is not None:
+        TAILLE.labels(*etiquettes).observe(taille)
+
+    seuil = config['SLOW_REQUEST_MS']
+    if seuil > 0 and duree * 1000 >= seuil:
+        journaliser_requete_lente(mesure, duree, statut, chemin, config['SLOW_REQUEST_MAX_STATEMENTS'])
+
+
+def _route():
+    regle = request.url_rule
+    return regle.rule if regle is not None else 'inconnue'
+
+
+def debut_requete():
+    # before_request du blueprint ; les requêtes de préchauffage ne sont pas comptées
+    if request.environ.get(ENVIRON_PRECHAUFFAGE):
+        return
+    g.mesure = commencer_mesure(request.method, _route(), capturer=current_app.config['SLOW_REQUEST_MS'] > 0)
+
+
+def reponse_requete(response):
+    # after_request du blueprint : la réponse est gardée pour teardown_request, qui la voit
+    # après la compression (after_request de l'application, exécuté ensuite)
+    g.reponse_mesuree = response
+    return response
+
+
+def fin_requete(exception=None):
+    # teardown_request du blueprint
+    mesure = g.pop('mesure', None)
+    if mesure is None:
+        return
+    reponse = g.pop('reponse_mesuree', None)
+    statut = 500 if exception is not None or reponse is None else reponse.status_code
+    # Taille inconnue pour les réponses en streaming (non mesurée)
+    taille = reponse.calculate_content_length() if reponse is not None and not reponse.is_streamed else None
+    terminer_mesure(mesure, statut, taille, request.full_path.rstrip('?'), current_app.config)
+
+
+def journaliser_requete_lente(mesure, duree, statut, chemin, limite):
+    methode = mesure.etiquettes[0]
+    instructions = sorted(mesure.instructions, key=lambda instruction: -instruction[1])[:limite]
+    logger.warning(
+        "Requête lente : %s %s %s en %.1f ms (%d requêtes SQL, %.1f ms en base)",
+        methode, chemin, statut, duree * 1000,
+        mesure.nb_sql, mesure.duree_sql * 1000,
+        extra={
+            "methode": methode,
+            "chemin": chemin,
+            "statut": statut,
+            "duree_ms": round(duree * 1000, 2),
+            "nb_sql": mesure.nb_sql,
+            "duree_sql_ms": round(mesure.duree_sql * 1000, 2),
+            "instructions": [
+                {"duree_ms": round(duree_sql * 1000, 2), "sql": ' '.join(sql.split())[:500]}
+                for sql, duree_sql in instructions
+            ],
+        },
+    )
+
+
+def vider_dossier_metriques():
+    # Au démarrage du serveur, avant les workers : valeurs laissées par un serveur précédent
+    if not DOSSIER_MULTIPROCESSUS:
+        return
+    for chemin in glob.glob(os.path.join(DOSSIER_MULTIPROCESSUS, '*.db')):
+        os.remove(chemin)
+
+
+def processus_termine(pid):
+    # Worker arrêté : ses jauges "livesum" ne sont plus comptées (ses compteurs restent)
+    if DOSSIER_MULTIPROCESSUS:
+        multiprocess.mark_process_dead(pid, DOSSIER_MULTIPROCESSUS)
+
+
+def exposer_metriques():
+    # Format texte de Prometheus : valeurs de ce processus, ou de tous les workers en mode
+    # multiprocessus ; renvoie (contenu, type MIME)
+    if DOSSIER_MULTIPROCESSUS:
+        registre = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registre, DOSSIER_MULTIPROCESSUS)
+    else:
+        registre = REGISTRY
+    return generate_latest(registre), CONTENT_TYPE_LATEST
@@ -16,13 +16,17 @@ class Transaction(db.Model):
     __tablename__ = 'transactions'
 
     id = db.Column(db.Integer, primary_key=True)
-    montant_FCFA = db.Column(db.Integer, nullable=False)  # Entier naturel
+    montant_FCFA = db.Column(db.Integer, nullable=False, index=True)  # Entier naturel
     taux_convenu = db.Column(db.Integer, nullable=False)  # Entier naturel
-    montant_USDT = db.Column(db.Numeric(10, 2), nullable=False)  # Deux chiffres après la virgule
+    montant_USDT = db.Column(db.Numeric(10, 2), nullable=False, index=True)  # Deux chiffres après la virgule
     date_transaction = db.Column(db.DateTime, default=db.func.current_timestamp())
 
-    # Relation avec Fournisseur (1:N)
-    fournisseurs = db.relationship('Fournisseur', backref='transaction', lazy=True, cascade="all, delete")
+    # Index sur la clé de tri/pagination (date_transaction, id)
+    __table_args__ = (db.Index('ix_transactions_date_transaction_id', 'date_transaction', 'id'),)
+
+    # Relation avec Fournisseur (1:N) : suppression en cascade par la base (ON DELETE CASCADE),
+    # sans charger les fournisseurs
+    fournisseurs = db.relationship('Fournisseur', backref='transaction', lazy=True, cascade="all, delete", passive_deletes=True)
 
     def __repr__(self):
         return f"<Transaction {self.id}: {self.montant_FCFA} FCFA>"
@@ -33,12 +37,12 @@ class Fournisseur(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     nom = db.Column(db.String(100), nullable=False, unique=True)
-    taux_jour = db.Column(db.Integer, nullable=False)  # Entier naturel
+    taux_jour = db.Column(db.Integer, nullable=False, index=True)  # Entier naturel
     quantite_USDT = db.Column(db.Numeric(10, 2), nullable=False)  # Deux chiffres après la virgule
-    transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id'), nullable=False)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id', ondelete='CASCADE'), nullable=False, index=True)
 
-    # Relation avec Beneficiaire (1:N)
-    beneficiaires = db.relationship('Beneficiaire', backref='fournisseur', lazy=True, cascade="all, delete")
+    # Relation avec Beneficiaire (1:N) : suppression en cascade par la base, comme ci-dessus
+    beneficiaires = db.relationship('Beneficiaire', backref='fournisseur', lazy=True, cascade="all, delete", passive_deletes=True)
 
     def __repr__(self):
         return f"<Fournisseur {self.nom}: {self.taux_jour} taux>"
@@ -50,12 +54,63 @@ class Beneficiaire(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     nom = db.Column(db.String(100), nullable=False, unique=True)
     commission_USDT = db.Column(db.Numeric(10, 2), nullable=False)  # Deux chiffres après la virgule
-    fournisseur_id = db.Column(db.Integer, db.ForeignKey('fournisseurs.id'), nullable=False)
+    fournisseur_id = db.Column(db.Integer, db.ForeignKey('fournisseurs.id', ondelete='CASCADE'), nullable=False, index=True)
 
     def __repr__(self):
         return f"<Beneficiaire {self.nom}: {self.commission_USDT} USDT>"
 
+# Table Compteur (agrégats du tableau de bord tenus à jour par les routes d'écriture) ;
+# chaque compteur est réparti sur plusieurs lignes (slots) dont la somme donne la valeur
+class Compteur(db.Model):
+    __tablename__ = 'compteurs'
+
+    nom = db.Column(db.String(50), primary_key=True)
+    slot = db.Column(db.Integer, primary_key=True, default=0)
+    valeur = db.Column(db.Numeric(20, 2), nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Compteur {self.nom}[{self.slot}]: {self.valeur}>"
 
+# Table VolumeJournalier (cumuls des transactions par jour, pour les statistiques) ; comme les
+# compteurs, chaque jour est réparti sur plusieurs lignes (jour, slot) dont la somme donne le cumul
+class VolumeJournalier(db.Model):
+    __tablename__ = 'volumes_journaliers'
+
+    jour = db.Column(db.Date, primary_key=True)
+    slot = db.Column(db.Integer, primary_key=True, default=0)
+    nb_transactions = db.Column(db.Integer, nullable=False, default=0)
+    volume_FCFA = db.Column(db.BigInteger, nullable=False, default=0)
+    volume_USDT = db.Column(db.Numeric(20, 2), nullable=False, default=0)
+    somme_taux = db.Column(db.BigInteger, nullable=False, default=0)  # Pour le taux moyen
+
+    def __repr__(self):
+        return f"<VolumeJournalier {self.jour}[{self.slot}]: {self.nb_transactions} transactions>"
 
+# Table Benefice (bénéfice de chaque transaction, recalculé par les routes d'écriture)
+class Benefice(db.Model):
+    __tablename__ = 'benefices'
 
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id', ondelete='CASCADE'), primary_key=True)
+    date_transaction = db.Column(db.DateTime)  # Copie de la date de la transaction (rapports par période)
+    nb_fournisseurs = db.Column(db.Integer, nullable=False, default=0)
+    nb_beneficiaires = db.Column(db.Integer, nullable=False, default=0)
+    quantite_USDT = db.Column(db.Numeric(20, 2), nullable=False, default=0)
+    marge = db.Column(db.Numeric(20, 2), nullable=False, default=0)  # Somme de (taux_convenu - taux_jour) * quantite_USDT
+    commissions = db.Column(db.Numeric(20, 2), nullable=False, default=0)  # Somme de commission_USDT * quantite_USDT
+    benefice = db.Column(db.Numeric(20, 2), nullable=False, default=0)  # marge - commissions
 
+    # Index sur la clé de tri/pagination (date_transaction, transaction_id)
+    __table_args__ = (db.Index('ix_benefices_date_transaction_transaction_id', 'date_transaction', 'transaction_id'),)
+
+    def __repr__(self):
+        return f"<Benefice {self.transaction_id}: {self.benefice}>"
+
+# Table JetonRevoque (jetons de session révoqués avant leur expiration)
+class JetonRevoque(db.Model):
+    __tablename__ = 'jetons_revoques'
+
+    jti = db.Column(db.String(32), primary_key=True)
+    expire_le = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<JetonRevoque {self.jti}>"
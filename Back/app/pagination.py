@@ -0,0 +1,48 @@
+import base64
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+# Taille de page par défaut et maximale pour la pagination par curseur
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def parse_limit(value, default=DEFAULT_LIMIT):
+    # Lecture du paramètre "limit" borné entre 1 et MAX_LIMIT
+    if value is None or value == '':
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit doit être un entier positif")
+    if limit <= 0:
+        raise ValueError("limit doit être un entier positif")
+    return min(limit, MAX_LIMIT)
+
+
+def encode_cursor(date_value, id_value):
+    # Curseur opaque : "<date ISO>|<id>" encodé en base64 url-safe
+    raw = f"{date_value.isoformat() if date_value else ''}|{id_value}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    # Opération inverse de encode_cursor, lève ValueError si le curseur est invalide
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        date_part, id_part = raw.rsplit('|', 1)
+        return (datetime.fromisoformat(date_part) if date_part else None), int(id_part)
+    except Exception:
+        raise ValueError("Curseur invalide")
+
+
+def keyset_filter(date_column, id_column, cursor):
+    # Condition "(date, id) > (date_curseur, id_curseur)" portable (sans tuple_),
+    # écrite avec "date >= date_curseur" pour permettre un parcours d'index par plage
+    date_value, id_value = decode_cursor(cursor)
+    return and_(
+        date_column >= date_value,
+        or_(date_column > date_value, id_column > id_value),
+    )
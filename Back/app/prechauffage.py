@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import text
+
+from app import db
+from app.metriques import ENVIRON_PRECHAUFFAGE
+
+
+def liberer_connexions_heritees(app):
+    # Après un fork : les connexions du pool ouvertes par le processus parent (migrations,
+    # compteurs) ne doivent pas être partagées, le processus fils ouvre les siennes
+    with app.app_context():
+        for moteur in db.engines.values():
+            moteur.dispose(close=False)
+
+
+def fermer_connexions(app):
+    # Processus maître : il ne sert pas de requêtes, inutile de garder ses connexions ouvertes
+    with app.app_context():
+        for moteur in db.engines.values():
+            moteur.dispose()
+
+
+def _ouvrir(moteur, nb):
+    # Ouvre "nb" connexions simultanément puis les rend au pool, qui les garde ouvertes
+    connexions = []
+    try:
+        for _ in range(nb):
+            connexion = moteur.connect()
+            connexions.append(connexion)
+            connexion.execute(text('SELECT 1'))
+    finally:
+        for connexion in connexions:
+            connexion.close()
+
+
+def prechauffer(app, connexions):
+    # Avant d'accepter du trafic : connexions du pool déjà ouvertes (base principale et
+    # réplicas) et premières requêtes servies en interne (caches des compteurs et des
+    # entités, cache de compilation SQL, imports paresseux), absentes des métriques
+    with app.app_context():
+        moteurs = list(db.engines.values())
+    nb = min(connexions, app.config['DB_POOL_SIZE'])
+    with ThreadPoolExecutor(max_workers=len(moteurs)) as executeur:
+        list(executeur.map(lambda moteur: _ouvrir(moteur, nb), moteurs))
+
+    client = app.test_client()
+    for chemin in app.config['WARMUP_PATHS']:
+        client.get(chemin, environ_base={ENVIRON_PRECHAUFFAGE: True})
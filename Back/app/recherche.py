@@ -0,0 +1,61 @@
+import math
+from datetime import datetime
+
+from sqlalchemy import func
+
+# Modes de recherche sur le nom des fournisseurs et bénéficiaires
+MODES_NOM = ('prefixe', 'contient')
+
+
+def _echapper_like(texte):
+    # Les caractères spéciaux de LIKE saisis par l'utilisateur sont recherchés tels quels
+    return texte.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def filtre_nom(colonne, texte, mode='contient'):
+    # Recherche insensible à la casse sur lower(nom), indexé (btree pour le préfixe,
+    # trigrammes pour la sous-chaîne sous PostgreSQL, voir la migration 0005)
+    if mode not in MODES_NOM:
+        raise ValueError(f"mode doit valoir {', '.join(MODES_NOM)}")
+    motif = _echapper_like(texte.lower())
+    motif = f"{motif}%" if mode == 'prefixe' else f"%{motif}%"
+    return func.lower(colonne).like(motif, escape='\\')
+
+
+def _nombre(valeur):
+    try:
+        nombre = float(valeur)
+    except (TypeError, ValueError):
+        nombre = math.nan
+    # "nan" et "inf" passent float() mais ne bornent rien
+    if not math.isfinite(nombre):
+        raise ValueError(f"Valeur numérique invalide : {valeur!r}")
+    return nombre
+
+
+def _date(valeur):
+    try:
+        return datetime.fromisoformat(valeur)
+    except (TypeError, ValueError):
+        raise ValueError(f"Date invalide : {valeur!r} (format ISO 8601 attendu)")
+
+
+def intervalle(colonne, minimum=None, maximum=None):
+    # Conditions minimum <= colonne <= maximum pour les bornes présentes dans la requête ;
+    # ValueError si une borne n'est pas un nombre
+    conditions = []
+    if minimum:
+        conditions.append(colonne >= _nombre(minimum))
+    if maximum:
+        conditions.append(colonne <= _nombre(maximum))
+    return conditions
+
+
+def periode(colonne, debut=None, fin=None):
+    # Conditions debut <= colonne < fin (dates ISO 8601) pour les bornes présentes
+    conditions = []
+    if debut:
+        conditions.append(colonne >= _date(debut))
+    if fin:
+        conditions.append(colonne < _date(fin))
+    return conditions
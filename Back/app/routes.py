@@ -1,13 +1,45 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app, g
+from sqlalchemy import and_, delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import joinedload, selectinload
 from app import db
+from app.beneficiaires import synchroniser_beneficiaires
+from app.analytique import PERIODES, ajuster_volumes, volumes_par_periode
+from app.benefices import (
+    benefice_en_dict, benefices_par_periode, lire_date, rafraichir_benefices, select_benefices,
+    transactions_des_fournisseurs,
+)
+from app.compteurs import arrondi_usdt, lire_compteurs, marquer_modifiees
+from app.pagination import DEFAULT_LIMIT, parse_limit, encode_cursor
+from app.recherche import filtre_nom, intervalle, periode
+from app.export import FORMATS_EXPORT, TYPES_EXPORT, ExportIndisponible, exporter
+from app.ecriture import (
+    EcritureIndisponible, ajouter_en_file, inserer_transactions, message_erreur, valider_transactions,
+)
+from app.documents import (
+    document_beneficiaire, document_fournisseur, format_transactions, select_transactions, transaction_en_dict,
+)
 from app.models import User
-from app.models import Transaction , Fournisseur , Beneficiaire
-from werkzeug.security import check_password_hash
-from werkzeug.security import generate_password_hash
-from datetime import datetime
+from app.models import Transaction , Fournisseur , Beneficiaire , Benefice
+from app.bases import lecture_seule
+from app.etag import etag_tables
+from app.serialisation import ligne_ndjson
+from app.metriques import debut_requete, exposer_metriques, fin_requete, reponse_requete
+from app.cache import cle_beneficiaire, cle_fournisseur, cle_utilisateur, invalider, lire_ou_charger
+from app.jetons import creer_jeton, jeton_requis, revoquer_jeton
+from app.hachage import HachageIndisponible, doit_rehacher, hacher_mot_de_passe, verifier_mot_de_passe
+from datetime import date, datetime
+import logging
 
 main = Blueprint('main', __name__) 
 
+logger = logging.getLogger(__name__)
+
+# Mesure de chaque requête (durée, taille, requêtes SQL), exposée sur /metrics
+main.before_request(debut_requete)
+main.after_request(reponse_requete)
+main.teardown_request(fin_requete)
+
 ##########################################################################################
 ##########################################################################################
 @main.route('/save', methods=['POST'])
@@ -24,8 +56,11 @@ def save_user():
     if existing_user:
         return jsonify({"message": "Cet email est déjà utilisé !"}), 409
 
-    # Hachage du mot de passe
-    hashed_password = generate_password_hash(password)
+    # Hachage du mot de passe (dans le pool de processus dédié)
+    try:
+        hashed_password = hacher_mot_de_passe(password)
+    except HachageIndisponible:
+        return jsonify({"message": "Service surchargé, réessayez plus tard"}), 503
 
     # Création et sauvegarde du nouvel utilisateur
     new_user = User(email=email, password=hashed_password)
@@ -46,10 +81,42 @@ def login_user():
     user = User.query.filter_by(email=email).first()
 
     # Si l'utilisateur n'existe pas ou le mot de passe est incorrect
-    if user and check_password_hash(user.password, password):
-        return jsonify({"message": "Connexion réussie !"}), 200
-    else:
-        return jsonify({"message": "Email ou mot de passe incorrect !"}), 401
+    try:
+        if not user or not password or not verifier_mot_de_passe(user.password, password):
+            return jsonify({"message": "Email ou mot de passe incorrect !"}), 401
+
+        # Re-hachage transparent si la méthode ou le coût configurés ont changé
+        if doit_rehacher(user.password):
+            user.password = hacher_mot_de_passe(password)
+            db.session.commit()
+    except HachageIndisponible:
+        return jsonify({"message": "Service surchargé, réessayez plus tard"}), 503
+
+    # Jeton signé à renvoyer dans l'en-tête "Authorization: Bearer <jeton>"
+    return jsonify({
+        "message": "Connexion réussie !",
+        "token": creer_jeton(user),
+        "expires_in": current_app.config['TOKEN_MAX_AGE']
+    }), 200
+
+
+####### utilisateur logout ##################
+@main.route('/logout', methods=['POST'])
+@jeton_requis
+def logout_user():
+    revoquer_jeton(g.utilisateur)
+    return jsonify({"message": "Déconnexion réussie !"}), 200
+
+
+####### utilisateur connecté ##################
+@main.route('/user/me', methods=['GET'])
+@jeton_requis
+def get_current_user():
+    # Informations lues dans le jeton, sans requête sur la table users
+    return jsonify({
+        "id": g.utilisateur["id"],
+        "email": g.utilisateur["email"],
+    }), 200
 
 
 ###############################################
@@ -58,15 +125,16 @@ def login_user():
 def get_user():
     email = request.args.get('email')  # Récupère l'email passé en paramètre de requête
     
-    # Trouver l'utilisateur par email
-    user = User.query.filter_by(email=email).first()
+    # Trouver l'utilisateur par email (à travers le cache des entités)
+    def charger():
+        user = User.query.filter_by(email=email).first()
+        return {"id": user.id, "email": user.email} if user else None
+
+    user = lire_ou_charger(cle_utilisateur(email), charger) if email else None
 
     if user:
         # Si l'utilisateur existe, renvoyer ses informations
-        return jsonify({
-            "id": user.id,
-            "email": user.email,
-        }), 200
+        return jsonify(user), 200
     else:
         # Si l'utilisateur n'existe pas
         return jsonify({"message": "Utilisateur non trouvé !"}), 404 
@@ -78,7 +146,8 @@ def get_user():
 def ajouter_transaction():
     try:
         data = request.json
-        print("📩 Données reçues:", data)
+        # Message à fort volume : une fraction seulement est écrite (LOG_DEBUG_SAMPLE_RATE)
+        logger.debug("Transaction reçue", extra={"donnees": data})
 
         montant_fcfa = float(data.get('montantFCFA', 0))
         taux_conv = float(data.get('tauxConv', 0))
@@ -87,20 +156,22 @@ def ajouter_transaction():
             return jsonify({'message': 'Données invalides'}), 400
 
         montant_usdt = montant_fcfa / taux_conv
-
-        transaction = Transaction(
-            montant_FCFA=montant_fcfa,
-            taux_convenu=taux_conv,
-            montant_USDT=montant_usdt
-            # Pas besoin de 'dateTransaction', c'est géré par SQLAlchemy
-        )
-
-        db.session.add(transaction)
-        db.session.commit()
+        record = {"montant_FCFA": montant_fcfa, "taux_convenu": taux_conv, "montant_USDT": montant_usdt}
+
+        if current_app.config['TRANSACTION_WRITE_BEHIND']:
+            # Écriture groupée : validée avec d'autres transactions par le thread d'écriture,
+            # réponse envoyée après le commit de son lot
+            transaction = ajouter_en_file(record)
+            g.ecriture = True
+        else:
+            # Id et date attribués par la base (RETURNING)
+            transaction = inserer_transactions([record])[0]
+            db.session.commit()
 
         return jsonify({
             'message': 'Transaction ajoutée',
             'transaction': {
+                'id': transaction.id,
                 'montantFCFA': montant_fcfa,
                 'tauxConv': taux_conv,
                 'montantUSDT': montant_usdt,
@@ -109,29 +180,150 @@ def ajouter_transaction():
             }
         }), 201
 
-    except Exception as e:
-        print("🔥 Erreur serveur:", str(e))
-        return jsonify({'message': 'Erreur interne', 'error': str(e)}), 500
+    except EcritureIndisponible as e:
+        return jsonify({'message': str(e)}), 503
+    except Exception:
+        logger.exception("Erreur lors de l'ajout d'une transaction")
+        return jsonify({'message': 'Erreur interne'}), 500
+
+##############################################
+#######  IMPORT EN MASSE TRANSACTIONS ########
+@main.route('/trans/bulk', methods=['POST'])
+def importer_transactions():
+    # numpy n'est importé qu'à la première utilisation (démarrage plus rapide)
+    from app.bulk import iter_chunks, iter_csv_rows, validate_chunk
+
+    # Tableau JSON (ou {"transactions": [...]}), fichier CSV multipart ou corps text/csv
+    if request.is_json:
+        data = request.get_json()
+        rows = data.get('transactions') if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            return jsonify({'message': 'Un tableau de transactions est requis'}), 400
+    elif 'file' in request.files:
+        rows = iter_csv_rows(request.files['file'].stream)
+    elif request.mimetype == 'text/csv':
+        rows = iter_csv_rows(request.stream)
+    else:
+        return jsonify({'message': 'Format non supporté (JSON ou CSV attendu)'}), 415
+
+    inserees = 0
+    erreurs = []
+    for offset, chunk in iter_chunks(rows):
+        records, lignes, chunk_errors = validate_chunk(chunk, offset)
+        erreurs.extend(chunk_errors)
+        if not records:
+            continue
+
+        # Insertion multi-lignes du lot puis un seul commit ; les lignes refusées par la base
+        # sont signalées une à une (le reste du lot est tout de même enregistré)
+        for ligne, resultat in zip(lignes, valider_transactions(records)):
+            if isinstance(resultat, SQLAlchemyError):
+                erreurs.append({"ligne": ligne, "message": message_erreur(resultat)})
+            else:
+                inserees += 1
+
+    erreurs.sort(key=lambda erreur: erreur["ligne"])
+    return jsonify({
+        'message': 'Import terminé',
+        'inserees': inserees,
+        'rejetees': len(erreurs),
+        'erreurs': erreurs
+    }), 201 if inserees else 400
 
 ##############################################
 #######  DELETE TRANSACTION ##################
+def _supprimer_transactions(condition):
+    # Supprime en une requête les transactions qui vérifient "condition" ; leurs fournisseurs
+    # et bénéficiaires sont supprimés par la base (ON DELETE CASCADE), sans être chargés.
+    # Compteurs et cumuls journaliers sont ajustés dans la transaction en cours ; renvoie le
+    # nombre de transactions supprimées et les ids des fournisseurs et bénéficiaires
+    # supprimés avec elles (à retirer du cache après le commit).
+    enfants = db.session.execute(
+        select(Fournisseur.id, Beneficiaire.id)
+        .outerjoin(Beneficiaire, Beneficiaire.fournisseur_id == Fournisseur.id)
+        .where(Fournisseur.transaction_id.in_(select(Transaction.id).where(condition)))
+    ).all()
+    fournisseur_ids = {f_id for f_id, _ in enfants}
+    beneficiaire_ids = {b_id for _, b_id in enfants if b_id is not None}
+
+    # Colonnes des transactions supprimées renvoyées par la requête (RETURNING)
+    supprimees = db.session.execute(
+        delete(Transaction).where(condition).returning(
+            Transaction.date_transaction,
+            Transaction.montant_FCFA,
+            Transaction.montant_USDT,
+            Transaction.taux_convenu
+        ),
+        execution_options={'synchronize_session': False}
+    ).all()
+    if not supprimees:
+        return 0, set(), set()
+
+    marquer_modifiees(
+        'transactions', 'fournisseurs', 'beneficiaires',
+        transactions=-len(supprimees),
+        fournisseurs=-len(fournisseur_ids),
+        beneficiaires=-len(beneficiaire_ids),
+        volume_FCFA=-sum(t.montant_FCFA for t in supprimees),
+        volume_USDT=-sum(t.montant_USDT for t in supprimees)
+    )
+    ajuster_volumes(supprimees, signe=-1)
+    return len(supprimees), fournisseur_ids, beneficiaire_ids
+
 @main.route('/trans/delete/<int:id>', methods=['DELETE'])
 def delete_transaction(id):
-    # Trouver la transaction par son ID
-    transaction = Transaction.query.get(id)
-    
+    nb, fournisseur_ids, beneficiaire_ids = _supprimer_transactions(Transaction.id == id)
+
     # Si la transaction n'existe pas
-    if not transaction:
+    if not nb:
         return jsonify({"message": "Transaction non trouvée !"}), 404
-    
-    # Supprimer la transaction
-    db.session.delete(transaction)
+
     db.session.commit()
+    invalider(*map(cle_fournisseur, fournisseur_ids), *map(cle_beneficiaire, beneficiaire_ids))
     
     # Retourner un message de succès
     return jsonify({"message": "Transaction supprimée avec succès !"}), 200
 
 
+##############################################
+#######  SUPPRESSION EN MASSE TRANSACTIONS ###
+@main.route('/trans/delete', methods=['DELETE'])
+def delete_transactions():
+    # {"ids": [...]} ou {"debut": ..., "fin": ...} (dates ISO 8601, debut incluse, fin exclue)
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"message": "Données JSON invalides"}), 400
+
+    if "ids" in data:
+        ids = data["ids"]
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return jsonify({"message": "ids doit être une liste d'entiers"}), 400
+        condition = Transaction.id.in_(ids)
+    elif data.get("debut") or data.get("fin"):
+        try:
+            condition = and_(*periode(Transaction.date_transaction, data.get("debut"), data.get("fin")))
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+    else:
+        return jsonify({"message": "Indiquer 'ids' ou une période 'debut'/'fin'"}), 400
+
+    try:
+        nb, fournisseur_ids, beneficiaire_ids = _supprimer_transactions(condition)
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Erreur lors de la suppression de transactions")
+        return jsonify({"message": "Erreur lors de la suppression"}), 500
+    invalider(*map(cle_fournisseur, fournisseur_ids), *map(cle_beneficiaire, beneficiaire_ids))
+
+    return jsonify({
+        "message": f"{nb} transaction(s) supprimée(s)",
+        "transactions": nb,
+        "fournisseurs": len(fournisseur_ids),
+        "beneficiaires": len(beneficiaire_ids)
+    }), 200
+
+
 
 ##############################################
 #######  Modifier TRANSACTION ################
@@ -156,15 +348,40 @@ def update_transaction(id):
     if montant_fcfa is None or taux_conv is None or taux_conv <= 0:
         return jsonify({'message': 'Données invalides'}), 400
 
+    # Mise à jour des compteurs avec l'écart par rapport aux anciennes valeurs
+    marquer_modifiees(
+        'transactions',
+        volume_FCFA=montant_fcfa - transaction.montant_FCFA,
+        volume_USDT=arrondi_usdt(montant_fcfa / taux_conv) - transaction.montant_USDT
+    )
+
+    # La transaction quitte le cumul de son ancienne date
+    ajuster_volumes([(
+        transaction.date_transaction,
+        transaction.montant_FCFA,
+        transaction.montant_USDT,
+        transaction.taux_convenu
+    )], signe=-1)
+
     # Mettre à jour les champs de la transaction
     transaction.montant_FCFA = montant_fcfa
     transaction.taux_convenu = taux_conv
     transaction.montant_USDT = montant_fcfa / taux_conv  # Recalculer le montant en USDT
     transaction.date_transaction = db.func.current_timestamp()  # Mettre à jour la date de modification
+    db.session.flush()
+
+    # Et rejoint celui de sa nouvelle date
+    ajuster_volumes([(transaction.date_transaction, montant_fcfa, arrondi_usdt(montant_fcfa / taux_conv), taux_conv)])
+
+    # Le bénéfice dépend du taux convenu
+    rafraichir_benefices(Transaction.id == id)
 
     # Sauvegarder les modifications dans la base de données
     db.session.commit()
 
+    # La transaction est incluse dans le document en cache de ses fournisseurs
+    invalider(*(cle_fournisseur(f_id) for (f_id,) in db.session.query(Fournisseur.id).filter_by(transaction_id=id)))
+
     # Retourner un message de succès avec les informations mises à jour
     return jsonify({
         "message": "Transaction mise à jour avec succès !",
@@ -179,30 +396,67 @@ def update_transaction(id):
 
 ###############################################
 #######  Get all TRANSACTION ##################
+# Taille des lots lus via le curseur serveur en mode streaming
+STREAM_BATCH_SIZE = 1000
+
+def _format_transactions():
+    return format_transactions(request.args.get('format'), request.accept_mimetypes)
+
 @main.route('/trans/all', methods=['GET'])
+@lecture_seule
+@etag_tables('transactions', format=_format_transactions)
 def get_all_transactions():
-    # Récupérer toutes les transactions
-    transactions = Transaction.query.all()
+    limit = request.args.get('limit')
+    after = request.args.get('after')
+    stream = _format_transactions() == 'ndjson'
+
+    try:
+        query = select_transactions(after)
+        limit = parse_limit(limit, default=None)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    # Mode streaming NDJSON : une transaction par ligne, lue par lots via un curseur serveur
+    if stream:
+        if limit:
+            query = query.limit(limit)
+
+        def generate():
+            rows = db.session.execute(query.execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE))
+            for row in rows:
+                yield ligne_ndjson(transaction_en_dict(row))
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson'), 200
+
+    # Mode paginé : pagination par curseur (keyset) sur (date_transaction, id)
+    if limit or after:
+        limit = limit or DEFAULT_LIMIT
+        rows = db.session.execute(query.limit(limit + 1)).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].date_transaction, rows[-1].id) if has_more else None
+        return jsonify({
+            "transactions": [transaction_en_dict(row) for row in rows],
+            "next": next_cursor
+        }), 200
+
+    # Sans limit ni curseur (ancien usage, déprécié) : au plus TRANS_ALL_MAX_ROWS transactions
+    # dans l'ordre de pagination, avec le curseur de la suite si la liste est tronquée
+    logger.warning("GET /trans/all sans limit est déprécié : utiliser limit/after ou format=ndjson",
+                   extra={"user_agent": request.user_agent.string})
+    maximum = current_app.config['TRANS_ALL_MAX_ROWS']
+    rows = db.session.execute(query.limit(maximum + 1)).all()
 
     # Si aucune transaction n'est trouvée
-    if not transactions:
+    if not rows:
         return jsonify({"message": "Aucune transaction trouvée."}), 404
-    
-    # Formater les résultats pour les renvoyer
-    transactions_list = []
-    for transaction in transactions:
-        transactions_list.append({
-            "id": transaction.id,
-            "montantFCFA": str(transaction.montant_FCFA),  # Convertir en string pour JSON
-            "tauxConv": str(transaction.taux_convenu),
-            "montantUSDT": str(transaction.montant_USDT),
-            "dateTransaction": transaction.date_transaction.isoformat()  # Format ISO pour DateTime
-        })
-    
-    # Retourner les transactions sous forme de JSON
-    return jsonify({"transactions": transactions_list}), 200
-
 
+    tronquee = len(rows) > maximum
+    rows = rows[:maximum]
+    return jsonify({
+        "transactions": [transaction_en_dict(row) for row in rows],
+        "next": encode_cursor(rows[-1].date_transaction, rows[-1].id) if tronquee else None
+    }), 200
 
 
 ##########################################################################################
@@ -226,6 +480,9 @@ def add_fournisseur():
         )
 
         db.session.add(new_fournisseur)
+        db.session.flush()
+        marquer_modifiees('fournisseurs', fournisseurs=1)
+        rafraichir_benefices(Transaction.id == new_fournisseur.transaction_id)
         db.session.commit()
 
         return jsonify({
@@ -233,42 +490,42 @@ def add_fournisseur():
             "fournisseur": {
                 "id": new_fournisseur.id,
                 "nom": new_fournisseur.nom,
-                "taux_jour": float(new_fournisseur.taux_jour),
-                "quantite_USDT": float(new_fournisseur.quantite_USDT),
+                "taux_jour": new_fournisseur.taux_jour,
+                "quantite_USDT": new_fournisseur.quantite_USDT,
                 "transaction_id": new_fournisseur.transaction_id
             }
         }), 201
 
-    except Exception as e:
+    except Exception:
         db.session.rollback()  # Annule la transaction en cas d'erreur
-        return jsonify({"message": "Erreur lors de l'ajout", "error": str(e)}), 500
+        logger.exception("Erreur lors de l'ajout d'un fournisseur")
+        return jsonify({"message": "Erreur lors de l'ajout"}), 500
 
 ###############################################
 #######  Get all FOURNISS ##################
 @main.route('/all/four', methods=['GET'])
+@lecture_seule
+@etag_tables('fournisseurs', 'beneficiaires')
 def get_all_fournisseurs():
     try:
-        # Récupération de tous les fournisseurs
-        fournisseurs = Fournisseur.query.all()
+        # Récupération de tous les fournisseurs et de leurs bénéficiaires (2 requêtes au total)
+        fournisseurs = Fournisseur.query.options(selectinload(Fournisseur.beneficiaires)).all()
 
         # Construction de la réponse
         result = []
         for fournisseur in fournisseurs:
-            # Récupération des bénéficiaires associés à chaque fournisseur
-            beneficiaires = Beneficiaire.query.filter_by(fournisseur_id=fournisseur.id).all()
-
             result.append({
                 "id": fournisseur.id,
                 "nom": fournisseur.nom,
-                "taux_jour": float(fournisseur.taux_jour),
-                "quantite_USDT": float(fournisseur.quantite_USDT),
+                "taux_jour": fournisseur.taux_jour,
+                "quantite_USDT": fournisseur.quantite_USDT,
                 "transaction_id": fournisseur.transaction_id,
                 "beneficiaires": [
                     {
                         "id": benef.id,
                         "nom": benef.nom,
-                        "commission_USDT": float(benef.commission_USDT)
-                    } for benef in beneficiaires
+                        "commission_USDT": benef.commission_USDT
+                    } for benef in fournisseur.beneficiaires
                 ]
             })
 
@@ -277,8 +534,9 @@ def get_all_fournisseurs():
             "fournisseurs": result
         }), 200
 
-    except Exception as e:
-        return jsonify({"message": "Erreur lors de la récupération des fournisseurs", "error": str(e)}), 500
+    except Exception:
+        logger.exception("Erreur lors de la récupération des fournisseurs")
+        return jsonify({"message": "Erreur lors de la récupération des fournisseurs"}), 500
 
 
 
@@ -287,6 +545,8 @@ def get_all_fournisseurs():
 ###############################################
 #######  Get all fourn NOM ##################
 @main.route('/all/four/nom', methods=['GET'])
+@lecture_seule
+@etag_tables('fournisseurs')
 def get_all_fournisseurs_noms():
     try:
         # Récupération des fournisseurs avec uniquement id et nom
@@ -300,91 +560,44 @@ def get_all_fournisseurs_noms():
             "fournisseurs": result
         }), 200
 
-    except Exception as e:
-        return jsonify({"message": "Erreur lors de la récupération des noms des fournisseurs", "error": str(e)}), 500
+    except Exception:
+        logger.exception("Erreur lors de la récupération des noms des fournisseurs")
+        return jsonify({"message": "Erreur lors de la récupération des noms des fournisseurs"}), 500
 
 
 ############################################
 #######  get by id ####################
-@main.route('/four/<int:id>', methods=['GET'])
-def get_fournisseur_by_id(id):
-    try:
-        # Récupération du fournisseur par ID
-        fournisseur = Fournisseur.query.get(id)
-
-        if not fournisseur:
-            return jsonify({"message": f"Fournisseur avec l'ID {id} introuvable"}), 404
-
-        # Récupération de la transaction associée au fournisseur
-        transaction = fournisseur.transaction
+def _fournisseur_document(id):
+    # Récupération du fournisseur par ID avec sa transaction et ses bénéficiaires
+    fournisseur = db.session.get(Fournisseur, id, options=[
+        joinedload(Fournisseur.transaction),
+        selectinload(Fournisseur.beneficiaires),
+    ])
 
-        # Récupération des bénéficiaires associés au fournisseur
-        beneficiaires = Beneficiaire.query.filter_by(fournisseur_id=fournisseur.id).all()
-
-        # Construction de la réponse
-        result = {
-            "id": fournisseur.id,
-            "nom": fournisseur.nom,
-            "taux_jour": float(fournisseur.taux_jour),
-            "quantite_USDT": float(fournisseur.quantite_USDT),
-            "transaction_id": fournisseur.transaction_id,
-            "transaction": {
-                "id": transaction.id,
-                "montant_FCFA": transaction.montant_FCFA,
-                "taux_convenu": transaction.taux_convenu,
-                "montant_USDT": float(transaction.montant_USDT),
-            } if transaction else None,
-            "beneficiaires": [
-                {
-                    "id": benef.id,
-                    "nom": benef.nom,
-                    "commission_USDT": float(benef.commission_USDT)
-                } for benef in beneficiaires
-            ]
-        }
-
-        return jsonify({
-            "message": "Fournisseur récupéré avec succès",
-            "fournisseur": result
-        }), 200
+    if not fournisseur:
+        return None
 
-    except Exception as e:
-        return jsonify({"message": "Erreur lors de la récupération du fournisseur", "error": str(e)}), 500
+    # Transaction et bénéficiaires déjà chargés par la requête ci-dessus
+    return document_fournisseur(fournisseur, fournisseur.transaction, fournisseur.beneficiaires)
 
+@main.route('/four/<int:id>', methods=['GET'])
+@lecture_seule
+def get_fournisseur_by_id(id):
     try:
-        # Récupération du fournisseur par ID
-        fournisseur = Fournisseur.query.get(id)
+        # Document lu dans le cache des entités, ou en base en cas d'absence
+        result = lire_ou_charger(cle_fournisseur(id), lambda: _fournisseur_document(id))
 
-        if not fournisseur:
+        if not result:
             return jsonify({"message": f"Fournisseur avec l'ID {id} introuvable"}), 404
 
-        # Récupération des bénéficiaires associés au fournisseur
-        beneficiaires = Beneficiaire.query.filter_by(fournisseur_id=fournisseur.id).all()
-
-        # Construction de la réponse
-        result = {
-            "id": fournisseur.id,
-            "nom": fournisseur.nom,
-            "taux_jour": float(fournisseur.taux_jour),
-            "quantite_USDT": float(fournisseur.quantite_USDT),
-            "transaction_id": fournisseur.transaction_id,
-           
-            "beneficiaires": [
-                {
-                    "id": benef.id,
-                    "nom": benef.nom,
-                    "commission_USDT": float(benef.commission_USDT)
-                } for benef in beneficiaires
-            ]
-        }
-
         return jsonify({
             "message": "Fournisseur récupéré avec succès",
             "fournisseur": result
         }), 200
 
-    except Exception as e:
-        return jsonify({"message": "Erreur lors de la récupération du fournisseur", "error": str(e)}), 500
+    except Exception:
+        logger.exception("Erreur lors de la récupération du fournisseur")
+        return jsonify({"message": "Erreur lors de la récupération du fournisseur"}), 500
 
 
 ###############################################
@@ -399,7 +612,14 @@ def update_fournisseur(id):
         if not fournisseur:
             return jsonify({"message": "Fournisseur non trouvé"}), 404
 
+        # Bénéficiaires actuels (comparés à la liste soumise) ; leurs documents en cache
+        # incluent ce fournisseur
+        anciens_beneficiaires = db.session.execute(
+            select(Beneficiaire.id, Beneficiaire.nom, Beneficiaire.commission_USDT).filter_by(fournisseur_id=id)
+        ).all()
+
         # Mise à jour des champs du fournisseur
+        ancienne_transaction_id = fournisseur.transaction_id
         if "nom" in data:
             fournisseur.nom = data["nom"]
         if "taux_jour" in data:
@@ -409,28 +629,26 @@ def update_fournisseur(id):
         if "transaction_id" in data:
             fournisseur.transaction_id = data["transaction_id"]
 
-        # Gestion des bénéficiaires
+        # Gestion des bénéficiaires : seules les différences sont écrites, les lignes
+        # inchangées gardent leur id
         if "beneficiaires" in data:
             beneficiaires_data = data["beneficiaires"]
             if not isinstance(beneficiaires_data, list):
                 return jsonify({"message": "La liste des bénéficiaires doit être un tableau"}), 400
 
-            # Suppression des bénéficiaires existants
-            Beneficiaire.query.filter_by(fournisseur_id=id).delete()
-
-            # Ajout des nouveaux bénéficiaires
-            for benef_data in beneficiaires_data:
-                if "nom" not in benef_data or "commission_USDT" not in benef_data:
-                    return jsonify({"message": "Chaque bénéficiaire doit avoir un 'nom' et une 'commission_USDT'"}), 400
-
-                new_beneficiaire = Beneficiaire(
-                    nom=benef_data["nom"],
-                    commission_USDT=benef_data["commission_USDT"],
-                    fournisseur_id=id
-                )
-                db.session.add(new_beneficiaire)
-
+            try:
+                variation, modifies = synchroniser_beneficiaires(id, anciens_beneficiaires, beneficiaires_data)
+            except ValueError as e:
+                db.session.rollback()
+                return jsonify({"message": str(e)}), 400
+            if modifies:
+                marquer_modifiees('beneficiaires', beneficiaires=variation)
+
+        marquer_modifiees('fournisseurs')
+        db.session.flush()
+        rafraichir_benefices(Transaction.id.in_({ancienne_transaction_id, fournisseur.transaction_id}))
         db.session.commit()  # Commit des modifications
+        invalider(cle_fournisseur(id), *(cle_beneficiaire(benef.id) for benef in anciens_beneficiaires))
 
         # Récupération des bénéficiaires mis à jour
         beneficiaires_mis_a_jour = Beneficiaire.query.filter_by(fournisseur_id=id).all()
@@ -440,30 +658,38 @@ def update_fournisseur(id):
             "fournisseur": {
                 "id": fournisseur.id,
                 "nom": fournisseur.nom,
-                "taux_jour": float(fournisseur.taux_jour),
-                "quantite_USDT": float(fournisseur.quantite_USDT),
+                "taux_jour": fournisseur.taux_jour,
+                "quantite_USDT": fournisseur.quantite_USDT,
                 "transaction_id": fournisseur.transaction_id,
                 "beneficiaires": [
-                    {"id": b.id, "nom": b.nom, "commission_USDT": float(b.commission_USDT)}
+                    {"id": b.id, "nom": b.nom, "commission_USDT": b.commission_USDT}
                     for b in beneficiaires_mis_a_jour
                 ]
             }
         }), 200
 
-    except Exception as e:
+    except Exception:
         db.session.rollback()  # Annule la transaction en cas d'erreur
-        return jsonify({"message": "Erreur lors de la mise à jour", "error": str(e)}), 500
+        logger.exception("Erreur lors de la mise à jour d'un fournisseur")
+        return jsonify({"message": "Erreur lors de la mise à jour"}), 500
 
 ##############################################
 #######  DELETE FOUR ##################
 @main.route('/delete/four/<int:id>', methods=['DELETE'])
 def delete_fournisseur(id):
-    fournisseur = Fournisseur.query.get(id)
-    if not fournisseur:
+    # Bénéficiaires supprimés par la base (ON DELETE CASCADE)
+    beneficiaire_ids = [b_id for (b_id,) in db.session.query(Beneficiaire.id).filter_by(fournisseur_id=id)]
+    supprime = db.session.execute(
+        delete(Fournisseur).where(Fournisseur.id == id).returning(Fournisseur.transaction_id),
+        execution_options={'synchronize_session': False}
+    ).first()
+    if not supprime:
         return jsonify({"message": "Fournisseur introuvable"}), 404
 
-    db.session.delete(fournisseur)
+    marquer_modifiees('fournisseurs', 'beneficiaires', fournisseurs=-1, beneficiaires=-len(beneficiaire_ids))
+    rafraichir_benefices(Transaction.id == supprime.transaction_id)
     db.session.commit()
+    invalider(cle_fournisseur(id), *map(cle_beneficiaire, beneficiaire_ids))
     return jsonify({"message": "Fournisseur supprimé avec succès"}), 200
 
 
@@ -495,8 +721,14 @@ def add_beneficiaire():
     )
 
     db.session.add(new_beneficiaire)
+    db.session.flush()
+    marquer_modifiees('beneficiaires', beneficiaires=1)
+    rafraichir_benefices(Transaction.id == fournisseur.transaction_id)
     db.session.commit()
 
+    # La liste des bénéficiaires du fournisseur en cache a changé
+    invalider(cle_fournisseur(fournisseur.id))
+
     # Retourner les informations du bénéficiaire ajouté avec le nom du fournisseur
     result = {
         "id": new_beneficiaire.id,
@@ -515,9 +747,11 @@ def add_beneficiaire():
 ###############################################
 #######  Get all BENEF ##################
 @main.route('/all/benef', methods=['GET'])
+@lecture_seule
+@etag_tables('beneficiaires', 'fournisseurs')
 def get_all_beneficiaires():
-    # Récupérer tous les bénéficiaires
-    beneficiaires = Beneficiaire.query.all()
+    # Récupérer tous les bénéficiaires avec leur fournisseur en une seule requête
+    beneficiaires = Beneficiaire.query.options(joinedload(Beneficiaire.fournisseur)).all()
 
     # Si aucun bénéficiaire n'est trouvé
     if not beneficiaires:
@@ -526,7 +760,7 @@ def get_all_beneficiaires():
     # Préparer la réponse avec les informations des bénéficiaires
     result = []
     for beneficiaire in beneficiaires:
-        fournisseur = Fournisseur.query.get(beneficiaire.fournisseur_id)
+        fournisseur = beneficiaire.fournisseur
         result.append({
             "id": beneficiaire.id,
             "nom": beneficiaire.nom,
@@ -545,30 +779,25 @@ def get_all_beneficiaires():
 
 ###############################################
 #######  Get  BENEF by ID  ##################
-@main.route('/benef/<int:id>', methods=['GET'])
-def get_beneficiaire_by_id(id):
-    # Récupérer le bénéficiaire par son ID
-    beneficiaire = Beneficiaire.query.get(id)
+def _beneficiaire_document(id):
+    # Récupérer le bénéficiaire par son ID avec son fournisseur
+    beneficiaire = db.session.get(Beneficiaire, id, options=[joinedload(Beneficiaire.fournisseur)])
     
     # Vérifier si le bénéficiaire existe
     if not beneficiaire:
-        return jsonify({"message": "Bénéficiaire non trouvé"}), 404
-    
-    # Récupérer le fournisseur associé
-    fournisseur = Fournisseur.query.get(beneficiaire.fournisseur_id)
+        return None
     
-    # Préparer la réponse avec les détails du fournisseur
-    result = {
-        "id": beneficiaire.id,
-        "nom": beneficiaire.nom,
-        "commission_USDT": beneficiaire.commission_USDT,
-        "fournisseur": {
-            "id": fournisseur.id if fournisseur else None,
-            "nom": fournisseur.nom if fournisseur else "Inconnu",
-            "taux_jour": fournisseur.taux_jour if fournisseur else None,
-            "quantite_USDT": float(fournisseur.quantite_USDT) if fournisseur else None
-        }
-    }
+    # Fournisseur associé, déjà chargé par la jointure
+    return document_beneficiaire(beneficiaire, beneficiaire.fournisseur)
+
+@main.route('/benef/<int:id>', methods=['GET'])
+@lecture_seule
+def get_beneficiaire_by_id(id):
+    # Document lu dans le cache des entités, ou en base en cas d'absence
+    result = lire_ou_charger(cle_beneficiaire(id), lambda: _beneficiaire_document(id))
+
+    if not result:
+        return jsonify({"message": "Bénéficiaire non trouvé"}), 404
     
     return jsonify({
         "message": "Bénéficiaire récupéré avec succès",
@@ -601,14 +830,22 @@ def update_beneficiaire_by_id(id):
     if not beneficiaire:
         return jsonify({"message": "Bénéficiaire introuvable"}), 404
 
+    ancien_fournisseur_id = beneficiaire.fournisseur_id
+
     # Mise à jour des informations du bénéficiaire
     beneficiaire.nom = data['nom']
     beneficiaire.commission_USDT = data['commission_USDT']
     beneficiaire.fournisseur_id = fournisseur.id  # Associe le fournisseur au bénéficiaire
 
     # Enregistrer les modifications dans la base de données
+    db.session.flush()
+    marquer_modifiees('beneficiaires')
+    rafraichir_benefices(transactions_des_fournisseurs(ancien_fournisseur_id, fournisseur.id))
     db.session.commit()
 
+    # Le bénéficiaire et les listes de ses anciens et nouveaux fournisseurs en cache
+    invalider(cle_beneficiaire(id), cle_fournisseur(ancien_fournisseur_id), cle_fournisseur(fournisseur.id))
+
     # Retourner les informations du bénéficiaire mis à jour avec le fournisseur
     result = {
         "id": beneficiaire.id,
@@ -631,8 +868,13 @@ def delete_beneficiaire(id):
     if not beneficiaire:
         return jsonify({"message": "Bénéficiaire introuvable"}), 404
 
+    fournisseur_id = beneficiaire.fournisseur_id
     db.session.delete(beneficiaire)
+    db.session.flush()
+    marquer_modifiees('beneficiaires', beneficiaires=-1)
+    rafraichir_benefices(transactions_des_fournisseurs(fournisseur_id))
     db.session.commit()
+    invalider(cle_beneficiaire(id), cle_fournisseur(fournisseur_id))
     return jsonify({"message": "Bénéficiaire supprimé avec succès"}), 200
 
 
@@ -651,6 +893,155 @@ def delete_beneficiaire(id):
 ##########################################################################################    
 ##########################################################################################
 ##########################################################################################    
+##########################################################################################
+##########################################################################################
+############## RECHERCHE ################## RECHERCHE ##################
+
+#######################################################
+#######  Recherche de transactions ####################
+@main.route('/trans/search', methods=['GET'])
+@lecture_seule
+@etag_tables('transactions')
+def search_transactions():
+    # Filtres : debut/fin (dates ISO, fin exclue), montant_min/montant_max (FCFA),
+    # usdt_min/usdt_max ; pagination par curseur comme /trans/all
+    args = request.args
+    try:
+        limit = parse_limit(args.get('limit'), default=DEFAULT_LIMIT)
+        conditions = [
+            *periode(Transaction.date_transaction, args.get('debut'), args.get('fin')),
+            *intervalle(Transaction.montant_FCFA, args.get('montant_min'), args.get('montant_max')),
+            *intervalle(Transaction.montant_USDT, args.get('usdt_min'), args.get('usdt_max')),
+        ]
+        query = select_transactions(args.get('after')).where(*conditions)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify({
+        "transactions": [transaction_en_dict(row) for row in rows],
+        "next": encode_cursor(rows[-1].date_transaction, rows[-1].id) if has_more else None
+    }), 200
+
+
+def _page_par_id(query, colonne_id, args):
+    # Pagination par curseur sur l'id : "after" est le dernier id de la page précédente
+    limit = parse_limit(args.get('limit'), default=DEFAULT_LIMIT)
+    after = args.get('after')
+    if after:
+        if not after.isdigit():
+            raise ValueError("after doit être un id entier")
+        query = query.where(colonne_id > int(after))
+    rows = db.session.execute(query.order_by(colonne_id).limit(limit + 1)).all()
+    return rows[:limit], (str(rows[limit - 1].id) if len(rows) > limit else None)
+
+
+def _filtres_nom(colonne, args):
+    nom = args.get('nom')
+    return [filtre_nom(colonne, nom, args.get('mode', 'contient'))] if nom else []
+
+
+#######################################################
+#######  Recherche de fournisseurs ####################
+@main.route('/four/search', methods=['GET'])
+@lecture_seule
+@etag_tables('fournisseurs')
+def search_fournisseurs():
+    # Filtres : nom (insensible à la casse, mode "prefixe" ou "contient"), taux_min/taux_max
+    args = request.args
+    try:
+        query = select(
+            Fournisseur.id,
+            Fournisseur.nom,
+            Fournisseur.taux_jour,
+            Fournisseur.quantite_USDT,
+            Fournisseur.transaction_id,
+        ).where(
+            *_filtres_nom(Fournisseur.nom, args),
+            *intervalle(Fournisseur.taux_jour, args.get('taux_min'), args.get('taux_max')),
+        )
+        rows, next_cursor = _page_par_id(query, Fournisseur.id, args)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    return jsonify({
+        "fournisseurs": [
+            {
+                "id": row.id,
+                "nom": row.nom,
+                "taux_jour": row.taux_jour,
+                "quantite_USDT": row.quantite_USDT,
+                "transaction_id": row.transaction_id
+            } for row in rows
+        ],
+        "next": next_cursor
+    }), 200
+
+
+#######################################################
+#######  Recherche de bénéficiaires ###################
+@main.route('/benef/search', methods=['GET'])
+@lecture_seule
+@etag_tables('beneficiaires')
+def search_beneficiaires():
+    # Filtres : nom (insensible à la casse, mode "prefixe" ou "contient"), fournisseur_id
+    args = request.args
+    try:
+        query = select(
+            Beneficiaire.id,
+            Beneficiaire.nom,
+            Beneficiaire.commission_USDT,
+            Beneficiaire.fournisseur_id,
+        ).where(*_filtres_nom(Beneficiaire.nom, args))
+        if args.get('fournisseur_id'):
+            if not args['fournisseur_id'].isdigit():
+                raise ValueError("fournisseur_id doit être un entier")
+            query = query.where(Beneficiaire.fournisseur_id == int(args['fournisseur_id']))
+        rows, next_cursor = _page_par_id(query, Beneficiaire.id, args)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    return jsonify({
+        "beneficiaires": [
+            {
+                "id": row.id,
+                "nom": row.nom,
+                "commission_USDT": row.commission_USDT,
+                "fournisseur_id": row.fournisseur_id
+            } for row in rows
+        ],
+        "next": next_cursor
+    }), 200
+
+
+#######################################################
+#######  Export du grand livre ########################
+@main.route('/trans/export', methods=['GET'])
+@lecture_seule
+def export_transactions():
+    # CSV (par défaut) ou Parquet, diffusé par lots lus via un curseur serveur ;
+    # période facultative debut/fin (dates ISO, fin exclue)
+    format = request.args.get('format', 'csv')
+    if format not in FORMATS_EXPORT:
+        return jsonify({"message": f"format doit valoir {', '.join(FORMATS_EXPORT)}"}), 400
+
+    try:
+        conditions = periode(Transaction.date_transaction, request.args.get('debut'), request.args.get('fin'))
+        morceaux = exporter(db.session, format, *conditions)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    except ExportIndisponible as e:
+        return jsonify({"message": str(e)}), 501
+
+    return Response(
+        stream_with_context(morceaux),
+        mimetype=TYPES_EXPORT[format],
+        headers={"Content-Disposition": f"attachment; filename=transactions.{format}"}
+    ), 200
+
+
 ##########################################################################################
 ##########################################################################################
 ############## DASHBORD ################## DASHBORD ##################
@@ -659,27 +1050,69 @@ def delete_beneficiaire(id):
 #####################################################
 #######  Get all four NUMBER TOTAL ##################
 @main.route('/total/fr', methods=['GET'])
+@lecture_seule
 def get_total_fournisseurs():
-    total_fournisseurs = Fournisseur.query.count()
+    total_fournisseurs = int(lire_compteurs()['fournisseurs'])
     return jsonify({"total_fournisseurs": total_fournisseurs}), 200
 
 
 #######################################################
 #######  Get all transa NUMBER TOTAL ##################
 @main.route('/total/tr', methods=['GET'])
+@lecture_seule
 def get_total_transactions():
-    total_transactions = Transaction.query.count()  # Compter le nombre total de transactions
+    total_transactions = int(lire_compteurs()['transactions'])  # Nombre total de transactions (compteur)
     return jsonify({"total": total_transactions}), 200
 
     
 #######################################################
 #######  Get all transa NUMBER TOTAL ##################
 @main.route('/total/bn', methods=['GET'])
+@lecture_seule
 def get_total_beneficiaires():
-    total_beneficiaires = Beneficiaire.query.count()
+    total_beneficiaires = int(lire_compteurs()['beneficiaires'])
     return jsonify({"total_beneficiaires": total_beneficiaires}), 200
 
 
+#######################################################
+#######  Volumes par période ##########################
+@main.route('/analytics/volumes', methods=['GET'])
+@lecture_seule
+def get_volumes_par_periode():
+    periode = request.args.get('periode', 'jour')
+    if periode not in PERIODES:
+        return jsonify({"message": f"periode doit valoir {', '.join(PERIODES)}"}), 400
+
+    try:
+        debut = request.args.get('debut')
+        fin = request.args.get('fin')
+        debut = date.fromisoformat(debut) if debut else None
+        fin = date.fromisoformat(fin) if fin else None
+    except ValueError:
+        return jsonify({"message": "Dates invalides (format AAAA-MM-JJ attendu)"}), 400
+
+    return jsonify({
+        "periode": periode,
+        "volumes": volumes_par_periode(debut, fin, periode)
+    }), 200
+
+
+#######################################################
+#######  Résumé du tableau de bord ####################
+@main.route('/dashboard/summary', methods=['GET'])
+@lecture_seule
+def get_dashboard_summary():
+    # Tous les totaux en une réponse, lus depuis la table des compteurs
+    compteurs = lire_compteurs(ttl=current_app.config.get('DASHBOARD_CACHE_TTL', 0))
+    return jsonify({
+        "total_transactions": int(compteurs['transactions']),
+        "total_fournisseurs": int(compteurs['fournisseurs']),
+        "total_beneficiaires": int(compteurs['beneficiaires']),
+        "volume_FCFA": int(compteurs['volume_FCFA']),
+        "volume_USDT": compteurs['volume_USDT']
+    }), 200
+
+
 
 
 
@@ -697,6 +1130,15 @@ def get_total_beneficiaires():
 ##########################################################################################    
 ##########################################################################################
 ##########################################################################################    
+##########################################################################################
+##########################################################################################
+############## MÉTRIQUES ################## MÉTRIQUES ##################
+@main.route('/metrics', methods=['GET'])
+def get_metriques():
+    # Format texte de Prometheus
+    contenu, type_mime = exposer_metriques()
+    return Response(contenu, content_type=type_mime), 200
+
 ##########################################################################################
 ##########################################################################################
 ############## CALCUL ################## CALCUL ##################
@@ -729,39 +1171,82 @@ def calculer():
     
     return jsonify(resultats)
 
-############## CALCUL GET ALL  ##########
+############## CALCUL EN MASSE ##########
+@main.route('/calculer/batch', methods=['POST'])
+def calculer_batch():
+    # numpy n'est importé qu'à la première utilisation (démarrage plus rapide)
+    from app.calcul import construire_colonnes, calculer_colonnes
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Données JSON invalides"}), 400
+
+    try:
+        colonnes = construire_colonnes(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    if (colonnes['tauxConvenu'] == 0).any():
+        return jsonify({"error": "Le taux convenu ne peut pas être zéro"}), 400
+
+    try:
+        resultats = calculer_colonnes(colonnes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Format colonnaire : un tableau par paramètre et par résultat, même ordre de lignes
+    return jsonify({
+        "n": len(colonnes['tauxConvenu']),
+        "parametres": {nom: valeurs.tolist() for nom, valeurs in colonnes.items()},
+        "resultats": resultats
+    })
+
+############## BÉNÉFICES PAR TRANSACTION ##########
 @main.route('/cal', methods=['GET'])
-def getalltransactions():
-    transactions = Transaction.query.all()
-    results = [
-        {
-            "id": t.id,
-            "montantFCFA": t.montant_FCFA,
-            "tauxConvenu": t.taux_convenu,
-            "tauxFournisseur": t.taux_jour,
-            "quantiteUSDT": t.quantiteUSDT,
-            "commission": t.commission
-        }
-        for t in transactions
-    ]
-    return jsonify(results)
-
-############## CALCUL LES 3 DERNIERS ############    
-#@main.route('/transactions/last3', methods=['GET'])
-#def get_last_three_transactions():
-#    transactions = Transaction.query.order_by(Transaction.id.desc()).limit(3).all()
-    # results = [
-        # {
-            # "id": t.id,
-            # "montantFCFA": t.montantFCFA,
-    #         "tauxConvenu": t.tauxConvenu,
-    #         "tauxFournisseur": t.tauxFournisseur,
-    #         "quantiteUSDT": t.quantiteUSDT,
-    #         "commission": t.commission
-    #     }
-    #     for t in transactions
-    # ]
-    # return jsonify(results)
+@lecture_seule
+@etag_tables('transactions', 'fournisseurs', 'beneficiaires')
+def get_benefices_transactions():
+    # Bénéfice de chaque transaction lu dans la table "benefices" ; filtres debut/fin
+    # (dates ISO, fin exclue) et pagination par curseur comme /trans/all
+    args = request.args
+    try:
+        limit = parse_limit(args.get('limit'), default=DEFAULT_LIMIT)
+        query = select_benefices(args.get('after')).where(
+            *periode(Benefice.date_transaction, args.get('debut'), args.get('fin'))
+        )
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return jsonify({
+        "benefices": [benefice_en_dict(row) for row in rows],
+        "next": encode_cursor(rows[-1].date_transaction, rows[-1].transaction_id) if has_more else None
+    }), 200
+
+############## BÉNÉFICES PAR PÉRIODE ##########
+@main.route('/cal/periodes', methods=['GET'])
+@lecture_seule
+@etag_tables('transactions', 'fournisseurs', 'beneficiaires')
+def get_benefices_periodes():
+    # periode=jour|semaine|mois, debut/fin (AAAA-MM-JJ, inclus) ; "after" est la date de
+    # début de la dernière période de la page précédente
+    args = request.args
+    taille = args.get('periode', 'jour')
+    if taille not in PERIODES:
+        return jsonify({"message": f"periode doit valoir {', '.join(PERIODES)}"}), 400
+
+    try:
+        limit = parse_limit(args.get('limit'), default=DEFAULT_LIMIT)
+        debut = lire_date(args.get('debut'), 'debut')
+        fin = lire_date(args.get('fin'), 'fin')
+        after = lire_date(args.get('after'), 'after')
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    periodes, suivant = benefices_par_periode(taille, debut, fin, after, limit)
+    return jsonify({"periode": taille, "benefices": periodes, "next": suivant}), 200
 
 
 ##########################################################################################
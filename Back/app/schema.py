@@ -0,0 +1,84 @@
+import os
+import re
+
+import click
+from flask.cli import ScriptInfo
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+# Scripts de migration nommés "<révision>_<description>.py", révisions numérotées dans l'ordre
+_FICHIER_REVISION = re.compile(r'^(\d+)_\w+\.py$')
+
+
+def derniere_revision(dossier):
+    # Révision la plus récente d'après les noms des scripts, sans importer alembic : suffit à
+    # reconnaître une base à jour au démarrage (voir revision_head pour la vérification complète)
+    revisions = [
+        correspondance.group(1) for correspondance in map(_FICHIER_REVISION.match, os.listdir(os.path.join(dossier, 'versions')))
+        if correspondance
+    ]
+    return max(revisions, key=int, default=None)
+
+
+def revision_head(dossier):
+    # Dernière révision des scripts du dossier, lue par alembic (sans se connecter à la base) ;
+    # plusieurs têtes (branches non fusionnées) ou aucune : démarrage refusé
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config()
+    config.set_main_option('script_location', dossier)
+    heads = ScriptDirectory.from_config(config).get_heads()
+    if len(heads) != 1:
+        raise RuntimeError(
+            f"Migrations de {dossier} : une seule révision head attendue, trouvé {heads or 'aucune'} "
+            "(fusionner les branches avec \"flask db merge\")"
+        )
+    return heads[0]
+
+
+def revisions_appliquees(db):
+    # Contenu de la table alembic_version (vide si la base n'a jamais été migrée)
+    try:
+        with db.engine.connect() as connexion:
+            return set(connexion.execute(text('SELECT version_num FROM alembic_version')).scalars())
+    except SQLAlchemyError:
+        return set()
+
+
+def extension_migrate(app, db, dossier):
+    # Flask-Migrate (et alembic, long à importer) n'est chargé que pour migrer ou pour les
+    # commandes "flask db"
+    if 'migrate' not in app.extensions:
+        from flask_migrate import Migrate
+        Migrate(app, db, directory=dossier)
+    return app.extensions['migrate']
+
+
+def mettre_a_jour_schema(app, db, dossier):
+    # Une seule requête au démarrage quand le schéma est à jour (alembic n'est pas importé) ;
+    # sinon vérifie les scripts avec alembic et applique les migrations en attente (crée les
+    # tables si elles n'existent pas). Renvoie True si des migrations ont été appliquées.
+    if derniere_revision(dossier) in revisions_appliquees(db):
+        return False
+
+    revision_head(dossier)
+    from flask_migrate import upgrade
+    extension_migrate(app, db, dossier)
+    upgrade(directory=dossier)
+    return True
+
+
+class CommandesMigration(click.Command):
+    # Commande "flask db" : les sous-commandes de Flask-Migrate ne sont chargées qu'à l'appel
+    def __init__(self, app, db, dossier):
+        super().__init__(
+            'db', help='Migrations de la base (Flask-Migrate).', add_help_option=False,
+            context_settings={'ignore_unknown_options': True, 'allow_extra_args': True},
+        )
+        self.app, self.db, self.dossier = app, db, dossier
+
+    def invoke(self, ctx):
+        extension_migrate(self.app, self.db, self.dossier)
+        from flask_migrate.cli import db as groupe
+        return groupe.main(ctx.args, prog_name=ctx.command_path, obj=ctx.find_object(ScriptInfo))
@@ -0,0 +1,91 @@
+import gzip
+from decimal import Decimal
+
+import orjson
+from flask import request
+from flask.json.provider import JSONProvider
+
+try:
+    import brotli  # Dépendance optionnelle : compression "br"
+except ImportError:
+    brotli = None
+
+# Corps des réponses 500 non gérées par la route (Flask et vues asynchrones) : le détail de
+# l'exception va dans le journal, jamais dans la réponse
+CORPS_ERREUR_INTERNE = {"message": "Erreur interne"}
+
+# Types JSON compressés après coup (les réponses en streaming ne le sont pas)
+TYPES_COMPRESSIBLES = ('application/json', 'application/x-ndjson', 'text/csv')
+
+
+def _par_defaut(valeur):
+    # Types non gérés nativement par orjson (datetime et date le sont, en ISO 8601) :
+    # les colonnes Numeric sont renvoyées comme des nombres
+    if isinstance(valeur, Decimal):
+        return float(valeur)
+    raise TypeError(f"Type non sérialisable en JSON : {type(valeur).__name__}")
+
+
+class OrjsonProvider(JSONProvider):
+    # Sérialisation JSON de l'application (jsonify, request.json) via orjson :
+    # Decimal en nombre, datetime/date en ISO 8601, quelle que soit la route
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_par_defaut).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        contenu = orjson.dumps(obj, default=_par_defaut, option=orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(contenu, mimetype='application/json')
+
+
+def encoder_json(obj):
+    # Encodage JSON (bytes) avec les mêmes règles que jsonify
+    return orjson.dumps(obj, default=_par_defaut)
+
+
+def ligne_ndjson(obj):
+    # Une ligne NDJSON encodée avec les mêmes règles que jsonify
+    return orjson.dumps(obj, default=_par_defaut, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def encodage_accepte(encodages):
+    # Encodage préféré parmi ceux acceptés (en-tête Accept-Encoding déjà analysé)
+    if brotli is not None and encodages['br']:
+        return 'br'
+    if encodages['gzip']:
+        return 'gzip'
+    return None
+
+
+def compresser(contenu, encodage, niveau):
+    if encodage == 'br':
+        return brotli.compress(contenu, quality=min(niveau, 11))
+    return gzip.compress(contenu, compresslevel=niveau)
+
+
+def compresser_reponse(response, taille_min, niveau):
+    # after_request : compression gzip/brotli négociée via Accept-Encoding,
+    # seulement pour les réponses volumineuses et déjà entièrement construites
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code != 200
+            or response.mimetype not in TYPES_COMPRESSIBLES
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    contenu = response.get_data()
+    encodage = encodage_accepte(request.accept_encodings) if len(contenu) >= taille_min else None
+    if encodage is None:
+        return response
+
+    response.set_data(compresser(contenu, encodage, niveau))
+    response.headers['Content-Encoding'] = encodage
+
+    # Chaque encodage est une représentation distincte : ETag distinct
+    etag, faible = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encodage}", weak=faible)
+    return response
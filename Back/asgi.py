@@ -0,0 +1,4 @@
+from app.asgi import create_asgi_app
+
+# Mode ASGI : uvicorn asgi:app (le mode WSGI reste servi par run.py et gunicorn)
+app = create_asgi_app()
@@ -0,0 +1,74 @@
+"""Comparaison de jsonify (fournisseur JSON par défaut de Flask) et d'OrjsonProvider.
+
+Sérialise une liste de transactions telle que la construisent les routes
+(Decimal, datetime), sans base de données :
+
+    python bench/bench_json.py --rows 100000
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app.serialisation import OrjsonProvider  # noqa: E402
+
+
+def transactions(nb):
+    debut = datetime(2024, 1, 1)
+    return [
+        {
+            "id": i,
+            "montantFCFA": 600_000 + i % 1000,
+            "tauxConv": 600 + i % 20,
+            "montantUSDT": Decimal("1000.00") + Decimal(i % 100) / 100,
+            "dateTransaction": debut + timedelta(seconds=i * 30),
+        }
+        for i in range(nb)
+    ]
+
+
+def mesurer(app, donnees, repetitions):
+    durees = []
+    with app.app_context():
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            reponse = jsonify({"transactions": donnees})
+            durees.append((time.perf_counter() - debut) * 1000)
+        contenu = reponse.get_data()
+    return {
+        "mediane_ms": round(statistics.median(durees), 2),
+        "octets": len(contenu),
+        "octets_gzip": len(gzip.compress(contenu, compresslevel=6)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repetitions', type=int, default=10)
+    args = parser.parse_args()
+
+    donnees = transactions(args.rows)
+    resultats = {}
+    for nom, provider in (("jsonify (défaut)", DefaultJSONProvider), ("orjson", OrjsonProvider)):
+        app = Flask(__name__)
+        app.json = provider(app)
+        resultats[nom] = mesurer(app, donnees, args.repetitions)
+
+    print(f"{args.rows} transactions")
+    print(f"{'encodeur':20} {'médiane (ms)':>14} {'octets':>12} {'octets gzip':>12}")
+    for nom, r in resultats.items():
+        print(f"{nom:20} {r['mediane_ms']:>14} {r['octets']:>12} {r['octets_gzip']:>12}")
+
+
+if __name__ == '__main__':
+    main()
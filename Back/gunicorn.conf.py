@@ -0,0 +1,63 @@
+import multiprocessing
+import os
+import tempfile
+
+# Serveur de production : gunicorn -c gunicorn.conf.py
+#
+# - l'application est chargée une fois dans le processus maître (preload_app) puis partagée
+#   par les workers en copy-on-write ;
+# - chaque worker ouvre ses propres connexions et remplit ses caches avant d'accepter du trafic ;
+# - redémarrage sans perte de requêtes : "kill -HUP <maître>" relance les workers un par un
+#   sur la configuration relue (les workers en cours terminent leurs requêtes pendant
+#   graceful_timeout) ; pour recharger le code avec preload_app, "kill -USR2 <maître>" démarre
+#   un nouveau maître, puis "kill -WINCH" et "kill -QUIT" sur l'ancien.
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+
+# Nombre de processus et de threads par processus (worker "gthread" au-delà d'un thread)
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Nombre de workers connu de l'application (taille du pool de hachage de chaque worker)
+os.environ['WEB_CONCURRENCY'] = str(workers)
+# Métriques Prometheus additionnées sur tous les workers (mode multiprocessus de
+# prometheus_client) : la variable doit être définie avant le chargement de l'application
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'full-crypto-metriques'))
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+preload_app = True
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Recyclage périodique des workers (0 = jamais), décalé pour ne pas les relancer ensemble
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    # Maître prêt : il ne sert pas de requêtes, ses connexions (migrations) sont fermées
+    from app.prechauffage import fermer_connexions
+    fermer_connexions(server.app.wsgi())
+
+    # Métriques des workers d'un serveur précédent : repartir de zéro
+    from app.metriques import vider_dossier_metriques
+    vider_dossier_metriques()
+
+
+def post_fork(server, worker):
+    from app.prechauffage import liberer_connexions_heritees
+    liberer_connexions_heritees(worker.app.wsgi())
+
+
+def child_exit(server, worker):
+    # Jauges du worker arrêté retirées de /metrics
+    from app.metriques import processus_termine
+    processus_termine(worker.pid)
+
+
+def post_worker_init(worker):
+    # Dernière étape avant que le worker n'accepte des connexions
+    from app.prechauffage import prechauffer
+    prechauffer(worker.app.wsgi(), threads)
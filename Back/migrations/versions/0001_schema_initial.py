@@ -0,0 +1,96 @@
+"""Schéma initial
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+Les bases créées auparavant par db.create_all() contiennent déjà ces
+tables : elles ne sont créées que si elles n'existent pas.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existantes = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existantes:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password', sa.String(length=200), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email')
+        )
+
+    if 'transactions' not in existantes:
+        op.create_table(
+            'transactions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('montant_FCFA', sa.Integer(), nullable=False),
+            sa.Column('taux_convenu', sa.Integer(), nullable=False),
+            sa.Column('montant_USDT', sa.Numeric(precision=10, scale=2), nullable=False),
+            sa.Column('date_transaction', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if 'fournisseurs' not in existantes:
+        op.create_table(
+            'fournisseurs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('nom', sa.String(length=100), nullable=False),
+            sa.Column('taux_jour', sa.Integer(), nullable=False),
+            sa.Column('quantite_USDT', sa.Numeric(precision=10, scale=2), nullable=False),
+            sa.Column('transaction_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('nom')
+        )
+
+    if 'beneficiaires' not in existantes:
+        op.create_table(
+            'beneficiaires',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('nom', sa.String(length=100), nullable=False),
+            sa.Column('commission_USDT', sa.Numeric(precision=10, scale=2), nullable=False),
+            sa.Column('fournisseur_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['fournisseur_id'], ['fournisseurs.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('nom')
+        )
+
+    if 'compteurs' not in existantes:
+        op.create_table(
+            'compteurs',
+            sa.Column('nom', sa.String(length=50), nullable=False),
+            sa.Column('valeur', sa.Numeric(precision=20, scale=2), nullable=False),
+            sa.PrimaryKeyConstraint('nom')
+        )
+
+    if 'volumes_journaliers' not in existantes:
+        op.create_table(
+            'volumes_journaliers',
+            sa.Column('jour', sa.Date(), nullable=False),
+            sa.Column('nb_transactions', sa.Integer(), nullable=False),
+            sa.Column('volume_FCFA', sa.BigInteger(), nullable=False),
+            sa.Column('volume_USDT', sa.Numeric(precision=20, scale=2), nullable=False),
+            sa.Column('somme_taux', sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint('jour')
+        )
+
+
+def downgrade():
+    op.drop_table('volumes_journaliers')
+    op.drop_table('compteurs')
+    op.drop_table('beneficiaires')
+    op.drop_table('fournisseurs')
+    op.drop_table('transactions')
+    op.drop_table('users')
@@ -0,0 +1,31 @@
+"""Index sur les clés étrangères et la date des transactions
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tri et pagination par curseur de /trans/all, filtres par période
+    op.create_index('ix_transactions_date_transaction_id', 'transactions', ['date_transaction', 'id'])
+    # Fournisseurs d'une transaction (chargement, suppression en cascade)
+    op.create_index('ix_fournisseurs_transaction_id', 'fournisseurs', ['transaction_id'])
+    # Bénéficiaires d'un fournisseur (/all/four, /four/<id>, mises à jour)
+    op.create_index('ix_beneficiaires_fournisseur_id', 'beneficiaires', ['fournisseur_id'])
+
+
+def downgrade():
+    op.drop_index('ix_beneficiaires_fournisseur_id', table_name='beneficiaires')
+    op.drop_index('ix_fournisseurs_transaction_id', table_name='fournisseurs')
+    op.drop_index('ix_transactions_date_transaction_id', table_name='transactions')
@@ -0,0 +1,29 @@
+"""Liste de révocation des jetons de session
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'jetons_revoques',
+        sa.Column('jti', sa.String(length=32), nullable=False),
+        sa.Column('expire_le', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('jti')
+    )
+
+
+def downgrade():
+    op.drop_table('jetons_revoques')
@@ -0,0 +1,50 @@
+"""Suppression en cascade des fournisseurs et bénéficiaires par la base
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:30:00.000000
+
+Les clés étrangères fournisseurs.transaction_id et beneficiaires.fournisseur_id
+passent en ON DELETE CASCADE : supprimer une transaction supprime ses
+fournisseurs et leurs bénéficiaires en une seule requête, sans les charger.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# Nom donné aux clés étrangères (celles créées sans nom sont renommées au passage)
+CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s'}
+
+CLES = (
+    ('fournisseurs', 'transaction_id', 'transactions'),
+    ('beneficiaires', 'fournisseur_id', 'fournisseurs'),
+)
+
+
+def _remplacer_cle(table, colonne, cible, ondelete):
+    # Sous SQLite la table est recréée (mode batch) ; ailleurs ALTER TABLE direct
+    existantes = [
+        cle for cle in sa.inspect(op.get_bind()).get_foreign_keys(table)
+        if cle['constrained_columns'] == [colonne]
+    ]
+    nom = CONVENTION['fk'] % {'table_name': table, 'column_0_name': colonne}
+    with op.batch_alter_table(table, naming_convention=CONVENTION) as batch:
+        for cle in existantes:
+            batch.drop_constraint(cle['name'] or nom, type_='foreignkey')
+        batch.create_foreign_key(nom, cible, [colonne], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    for table, colonne, cible in CLES:
+        _remplacer_cle(table, colonne, cible, 'CASCADE')
+
+
+def downgrade():
+    for table, colonne, cible in reversed(CLES):
+        _remplacer_cle(table, colonne, cible, None)
@@ -0,0 +1,72 @@
+"""Index des endpoints de recherche
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 11:00:00.000000
+
+Btree sur les montants des transactions et le taux des fournisseurs, et sur
+lower(nom) des fournisseurs et bénéficiaires (recherche par préfixe). Sous
+PostgreSQL, index trigrammes (pg_trgm) sur lower(nom) pour la recherche par
+sous-chaîne, si l'extension peut être installée.
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+TABLES_NOM = ('fournisseurs', 'beneficiaires')
+
+
+def _trigrammes_disponibles(bind):
+    # CREATE EXTENSION demande des droits suffisants : sans eux, pas d'index trigrammes
+    try:
+        with bind.begin_nested():
+            bind.exec_driver_sql('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        return True
+    except sa.exc.DBAPIError:
+        logger.warning("Extension pg_trgm indisponible : pas d'index trigrammes sur les noms")
+        return False
+
+
+def upgrade():
+    bind = op.get_bind()
+    postgresql = bind.dialect.name == 'postgresql'
+
+    # Filtres par montant et par taux
+    op.create_index('ix_transactions_montant_FCFA', 'transactions', ['montant_FCFA'])
+    op.create_index('ix_transactions_montant_USDT', 'transactions', ['montant_USDT'])
+    op.create_index('ix_fournisseurs_taux_jour', 'fournisseurs', ['taux_jour'])
+
+    # Recherche par préfixe insensible à la casse : lower(nom) LIKE 'abc%'
+    # (text_pattern_ops pour que PostgreSQL utilise l'index quelle que soit la collation)
+    for table in TABLES_NOM:
+        if postgresql:
+            op.execute(f'CREATE INDEX ix_{table}_nom_lower ON {table} (lower(nom) text_pattern_ops)')
+        else:
+            op.create_index(f'ix_{table}_nom_lower', table, [sa.text('lower(nom)')])
+
+    # Recherche par sous-chaîne : lower(nom) LIKE '%abc%'
+    if postgresql and _trigrammes_disponibles(bind):
+        for table in TABLES_NOM:
+            op.execute(
+                f'CREATE INDEX IF NOT EXISTS ix_{table}_nom_trgm ON {table} '
+                'USING gin (lower(nom) gin_trgm_ops)'
+            )
+
+
+def downgrade():
+    for table in reversed(TABLES_NOM):
+        op.execute(f'DROP INDEX IF EXISTS ix_{table}_nom_trgm')
+        op.drop_index(f'ix_{table}_nom_lower', table_name=table)
+    op.drop_index('ix_fournisseurs_taux_jour', table_name='fournisseurs')
+    op.drop_index('ix_transactions_montant_USDT', table_name='transactions')
+    op.drop_index('ix_transactions_montant_FCFA', table_name='transactions')
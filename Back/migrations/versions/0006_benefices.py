@@ -0,0 +1,47 @@
+"""Table des bénéfices par transaction
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 12:00:00.000000
+
+Marge des fournisseurs, commissions des bénéficiaires et bénéfice de chaque
+transaction, tenus à jour par les routes d'écriture (voir app/benefices.py).
+La table est remplie au démarrage suivant si elle est vide.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'benefices',
+        sa.Column('transaction_id', sa.Integer(), nullable=False),
+        sa.Column('date_transaction', sa.DateTime(), nullable=True),
+        sa.Column('nb_fournisseurs', sa.Integer(), nullable=False),
+        sa.Column('nb_beneficiaires', sa.Integer(), nullable=False),
+        sa.Column('quantite_USDT', sa.Numeric(precision=20, scale=2), nullable=False),
+        sa.Column('marge', sa.Numeric(precision=20, scale=2), nullable=False),
+        sa.Column('commissions', sa.Numeric(precision=20, scale=2), nullable=False),
+        sa.Column('benefice', sa.Numeric(precision=20, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['transaction_id'], ['transactions.id'],
+            name='fk_benefices_transaction_id', ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('transaction_id')
+    )
+    op.create_index(
+        'ix_benefices_date_transaction_transaction_id', 'benefices',
+        ['date_transaction', 'transaction_id'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_benefices_date_transaction_transaction_id', table_name='benefices')
+    op.drop_table('benefices')
@@ -0,0 +1,59 @@
+"""Compteurs répartis sur plusieurs lignes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 09:00:00.000000
+
+Chaque compteur (et chaque version de table) est réparti sur SLOTS lignes
+(nom, slot) dont la somme donne la valeur : deux écritures concurrentes qui
+tombent sur des lignes différentes ne s'attendent plus jusqu'au commit. La
+valeur existante est gardée dans le slot 0, les autres slots partent de zéro.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# Doit correspondre à app.compteurs.COMPTEUR_SLOTS
+SLOTS = 16
+
+
+def _remplacer_cle_primaire(colonnes):
+    # Sous SQLite la table est recréée (mode batch) ; ailleurs ALTER TABLE direct
+    existante = sa.inspect(op.get_bind()).get_pk_constraint('compteurs')
+    with op.batch_alter_table('compteurs', recreate='auto') as batch:
+        if existante.get('name'):
+            batch.drop_constraint(existante['name'], type_='primary')
+        batch.create_primary_key('pk_compteurs', colonnes)
+
+
+def upgrade():
+    with op.batch_alter_table('compteurs') as batch:
+        batch.add_column(sa.Column('slot', sa.Integer(), nullable=False, server_default='0'))
+    _remplacer_cle_primaire(['nom', 'slot'])
+
+    compteurs = sa.table('compteurs', sa.column('nom', sa.String), sa.column('slot', sa.Integer), sa.column('valeur', sa.Numeric))
+    noms = [nom for (nom,) in op.get_bind().execute(sa.select(compteurs.c.nom))]
+    if noms:
+        op.bulk_insert(compteurs, [
+            {'nom': nom, 'slot': slot, 'valeur': 0} for nom in noms for slot in range(1, SLOTS)
+        ])
+
+
+def downgrade():
+    # Les slots sont additionnés dans le slot 0 avant de supprimer la colonne
+    compteurs = sa.table('compteurs', sa.column('nom', sa.String), sa.column('slot', sa.Integer), sa.column('valeur', sa.Numeric))
+    connexion = op.get_bind()
+    totaux = connexion.execute(sa.select(compteurs.c.nom, sa.func.sum(compteurs.c.valeur)).group_by(compteurs.c.nom)).all()
+    connexion.execute(sa.delete(compteurs).where(compteurs.c.slot != 0))
+    for nom, total in totaux:
+        connexion.execute(sa.update(compteurs).where(compteurs.c.nom == nom).values(valeur=total))
+
+    _remplacer_cle_primaire(['nom'])
+    with op.batch_alter_table('compteurs') as batch:
+        batch.drop_column('slot')
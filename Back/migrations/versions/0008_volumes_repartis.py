@@ -0,0 +1,58 @@
+"""Cumuls journaliers répartis sur plusieurs lignes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-20 09:00:00.000000
+
+Comme les compteurs (0007), le cumul de chaque jour est réparti sur des lignes
+(jour, slot) dont la somme donne la valeur : deux transactions concurrentes du
+même jour ne mettent plus à jour la même ligne. Les lignes d'un slot sont créées
+à la première écriture ; les cumuls existants sont gardés dans le slot 0.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+COLONNES = ('nb_transactions', 'volume_FCFA', 'volume_USDT', 'somme_taux')
+
+
+def _remplacer_cle_primaire(colonnes):
+    # Sous SQLite la table est recréée (mode batch) ; ailleurs ALTER TABLE direct
+    existante = sa.inspect(op.get_bind()).get_pk_constraint('volumes_journaliers')
+    with op.batch_alter_table('volumes_journaliers', recreate='auto') as batch:
+        if existante.get('name'):
+            batch.drop_constraint(existante['name'], type_='primary')
+        batch.create_primary_key('pk_volumes_journaliers', colonnes)
+
+
+def upgrade():
+    with op.batch_alter_table('volumes_journaliers') as batch:
+        batch.add_column(sa.Column('slot', sa.Integer(), nullable=False, server_default='0'))
+    _remplacer_cle_primaire(['jour', 'slot'])
+
+
+def downgrade():
+    # Les slots sont additionnés dans le slot 0 avant de supprimer la colonne
+    volumes = sa.table(
+        'volumes_journaliers', sa.column('jour', sa.Date), sa.column('slot', sa.Integer),
+        *[sa.column(nom) for nom in COLONNES]
+    )
+    connexion = op.get_bind()
+    totaux = connexion.execute(
+        sa.select(volumes.c.jour, *[sa.func.sum(volumes.c[nom]) for nom in COLONNES]).group_by(volumes.c.jour)
+    ).all()
+    connexion.execute(sa.delete(volumes))
+    if totaux:
+        op.bulk_insert(volumes, [
+            {'jour': jour, 'slot': 0, **dict(zip(COLONNES, sommes))} for jour, *sommes in totaux
+        ])
+
+    _remplacer_cle_primaire(['jour'])
+    with op.batch_alter_table('volumes_journaliers') as batch:
+        batch.drop_column('slot')
@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Transaction, Fournisseur, Beneficiaire
+
+# Configuration commune des tests : base SQLite en mémoire (une par application), hachage
+# rapide dans le processus, pas de journal des requêtes ni de cache des entités
+CONFIG_TEST = {
+    'TESTING': True,
+    'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+    'DATABASE_REPLICA_URLS': [],
+    'HASH_WORKERS': 0,
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+    'LOG_REQUESTS': False,
+    'SLOW_REQUEST_MS': 0,
+    'DASHBOARD_CACHE_TTL': 0,
+    'ENTITY_CACHE_BACKEND': None,
+    'TRANSACTION_WRITE_BEHIND': False,
+}
+
+
+@pytest.fixture
+def creer_app():
+    # Fabrique d'applications : creer_app(CLE=valeur, ...) remplace des valeurs de CONFIG_TEST
+    applications = []
+
+    def fabrique(**config):
+        app = create_app({**CONFIG_TEST, **config})
+        applications.append(app)
+        return app
+
+    yield fabrique
+    for app in applications:
+        with app.app_context():
+            db.session.remove()
+            for moteur in db.engines.values():
+                moteur.dispose()
+
+
+@pytest.fixture
+def app(creer_app):
+    return creer_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class CompteurRequetes:
+    # Requêtes SQL exécutées sur le moteur principal pendant un appel
+    def __init__(self, app):
+        with app.app_context():
+            self.moteur = db.engine
+        self.instructions = []
+        event.listen(self.moteur, 'before_cursor_execute', self._compter)
+
+    def _compter(self, connexion, curseur, instruction, parametres, contexte, executemany):
+        self.instructions.append(instruction)
+
+    def compter(self, fonction, *args, **kwargs):
+        # Renvoie (résultat de l'appel, nombre de requêtes SQL exécutées)
+        self.instructions = []
+        resultat = fonction(*args, **kwargs)
+        return resultat, len(self.instructions)
+
+    def fermer(self):
+        event.remove(self.moteur, 'before_cursor_execute', self._compter)
+
+
+@pytest.fixture
+def requetes_sql():
+    # requetes_sql(app) : compteur des requêtes SQL de cette application
+    compteurs = []
+
+    def fabrique(app):
+        compteur = CompteurRequetes(app)
+        compteurs.append(compteur)
+        return compteur
+
+    yield fabrique
+    for compteur in compteurs:
+        compteur.fermer()
+
+
+def peupler(app, nb_fournisseurs, nb_beneficiaires=3):
+    # Une transaction par fournisseur, "nb_beneficiaires" bénéficiaires par fournisseur, écrits
+    # directement en base (compteurs et agrégats non tenus à jour) ; renvoie les ids des
+    # fournisseurs et des bénéficiaires
+    fournisseur_ids, beneficiaire_ids = [], []
+    with app.app_context():
+        for i in range(nb_fournisseurs):
+            transaction = Transaction(montant_FCFA=600_000, taux_convenu=600, montant_USDT=1000)
+            fournisseur = Fournisseur(nom=f"Fournisseur {i}", taux_jour=590, quantite_USDT=1000, transaction=transaction)
+            fournisseur.beneficiaires = [
+                Beneficiaire(nom=f"Bénéficiaire {i}-{j}", commission_USDT=1) for j in range(nb_beneficiaires)
+            ]
+            db.session.add(transaction)
+            db.session.flush()
+            fournisseur_ids.append(fournisseur.id)
+            beneficiaire_ids.extend(benef.id for benef in fournisseur.beneficiaires)
+        db.session.commit()
+    return fournisseur_ids, beneficiaire_ids
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app import analytique, db
+from app.models import VolumeJournalier
+
+
+def _volumes(client, **parametres):
+    response = client.get('/analytics/volumes', query_string=parametres)
+    assert response.status_code == 200
+    return response.get_json()['volumes']
+
+
+def test_cumuls_tenus_a_jour(client):
+    ids = []
+    for montant in (600_000, 1_200_000):
+        response = client.post('/trans/add', json={"montantFCFA": montant, "tauxConv": 600})
+        ids.append(response.get_json()['transaction']['id'])
+
+    [jour] = _volumes(client)
+    assert (jour['nb_transactions'], jour['volume_FCFA'], jour['volume_USDT'], jour['taux_moyen']) == (2, 1_800_000, 3000.0, 600)
+
+    assert client.delete(f'/trans/delete/{ids[0]}').status_code == 200
+    [jour] = _volumes(client)
+    assert (jour['nb_transactions'], jour['volume_FCFA']) == (1, 1_200_000)
+
+
+def test_regroupement_par_mois(client):
+    lignes = [
+        {"montantFCFA": 1000, "tauxConv": 500, "dateTransaction": datetime(2026, 3, jour, 10).isoformat()}
+        for jour in (2, 9, 30)
+    ] + [{"montantFCFA": 3000, "tauxConv": 500, "dateTransaction": datetime(2026, 4, 1, 11).isoformat()}]
+    assert client.post('/trans/bulk', json=lignes).status_code == 201
+
+    mois = _volumes(client, periode='mois', debut='2026-01-01', fin='2026-12-31')
+    assert [(m['periode'], m['nb_transactions'], m['volume_FCFA']) for m in mois] == [
+        ('2026-03-01', 3, 3000), ('2026-04-01', 1, 3000),
+    ]
+    assert client.get('/analytics/volumes?periode=annee').status_code == 400
+
+
+def test_jour_reparti_sur_les_slots(app, client, monkeypatch):
+    # Deux écritures du même jour sur des slots différents, la suppression sur un troisième
+    ids = []
+    for slot, montant in ((1, 600_000), (2, 1_200_000)):
+        monkeypatch.setattr(analytique, 'slot_du_thread', lambda slot=slot: slot)
+        ids.append(client.post('/trans/add', json={"montantFCFA": montant, "tauxConv": 600}).get_json()['transaction']['id'])
+    monkeypatch.setattr(analytique, 'slot_du_thread', lambda: 5)
+    assert client.delete(f'/trans/delete/{ids[0]}').status_code == 200
+
+    with app.app_context():
+        lignes = db.session.execute(
+            select(VolumeJournalier.slot, VolumeJournalier.nb_transactions, VolumeJournalier.volume_FCFA)
+            .order_by(VolumeJournalier.slot)
+        ).all()
+    assert [tuple(ligne) for ligne in lignes] == [(1, 1, 600_000), (2, 1, 1_200_000), (5, -1, -600_000)]
+
+    [jour] = _volumes(client)
+    assert (jour['nb_transactions'], jour['volume_FCFA'], jour['volume_USDT'], jour['taux_moyen']) == (1, 1_200_000, 2000.0, 600)
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import queue
+import time
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from app import asgi, db, routes
+from app.asgi import ApplicationAsgi, create_asgi_app
+from app.bases import ENTETE_PRIMAIRE
+from app.journal import GestionnaireFile
+
+
+@pytest.fixture
+def app_fichier(creer_app, tmp_path):
+    # Base fichier : le moteur asynchrone (aiosqlite) et l'application Flask lisent la même base
+    def fabrique(**config):
+        return creer_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'base.db'}", **config)
+    return fabrique
+
+
+def _executer(appli, *requetes, concurrentes=False):
+    # Requêtes (méthode, chemin, options httpx) envoyées à l'application ASGI dans une même
+    # boucle d'événements, les unes après les autres ou toutes ensemble
+    async def appeler():
+        transport = httpx.ASGITransport(app=appli)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                envois = [client.request(methode, chemin, **options) for methode, chemin, options in requetes]
+                if concurrentes:
+                    return await asyncio.gather(*envois)
+                return [await envoi for envoi in envois]
+        finally:
+            await appli.fermer()
+    return asyncio.run(appeler())
+
+
+def _get(*chemins, **options):
+    return [('GET', chemin, options) for chemin in chemins]
+
+
+def _donnees(client):
+    # Transactions, fournisseur et bénéficiaire écrits par l'API (compteurs tenus à jour)
+    assert client.post('/trans/bulk', json=[
+        {"montantFCFA": 600_000 + i, "tauxConv": 600, "dateTransaction": f"2026-03-0{i + 1}T10:00:00"} for i in range(3)
+    ]).status_code == 201
+    transaction_id = client.get('/trans/all?limit=1').get_json()['transactions'][0]['id']
+    fournisseur = client.post('/add/four', json={"nom": "F1", "taux_jour": 590, "quantite_USDT": 500, "transaction_id": transaction_id})
+    beneficiaire = client.post('/add/benef', json={"nom": "B1", "commission_USDT": "1.25", "fournisseur_nom": "F1"})
+    return fournisseur.get_json()['fournisseur']['id'], beneficiaire.get_json()['beneficiaire']['id']
+
+
+def _corps(response):
+    if response.headers['Content-Type'] == 'application/x-ndjson':
+        return [json.loads(ligne) for ligne in response.text.splitlines()]
+    return response.json() if response.content else None
+
+
+def test_vues_asynchrones_identiques_aux_routes_flask(app_fichier):
+    app = app_fichier()
+    client = app.test_client()
+    fournisseur_id, beneficiaire_id = _donnees(client)
+    chemins = [
+        '/trans/all?limit=2', '/trans/all?limit=2&after=x', '/trans/all?format=ndjson', '/trans/all',
+        f'/four/{fournisseur_id}', '/four/999', f'/benef/{beneficiaire_id}', '/benef/999',
+        '/total/fr', '/total/tr', '/total/bn', '/dashboard/summary',
+    ]
+    appli = create_asgi_app(app)
+    assert all(any(motif.match(chemin.split('?')[0]) for _, motif, _, _ in asgi.VUES) for chemin in chemins)
+
+    reponses = _executer(appli, *_get(*chemins))
+    for chemin, response in zip(chemins, reponses):
+        attendu = client.get(chemin)
+        assert response.status_code == attendu.status_code, chemin
+        assert _corps(response) == (attendu.get_json() if attendu.mimetype == 'application/json' else [
+            json.loads(ligne) for ligne in attendu.get_data(as_text=True).splitlines()
+        ]), chemin
+        assert response.headers.get('ETag') == attendu.headers.get('ETag'), chemin
+
+    # ETag et 304 identiques, représentation NDJSON distincte
+    etag = client.get('/trans/all?limit=2').headers['ETag']
+    [response, ndjson] = _executer(create_asgi_app(app), *_get('/trans/all?limit=2', headers={'If-None-Match': etag}),
+                                   *_get('/trans/all?limit=2', headers={'Accept': 'application/x-ndjson', 'If-None-Match': etag}))
+    assert (response.status_code, response.headers['ETag']) == (304, etag)
+    assert 'Accept' in response.headers['Vary']
+    assert ndjson.status_code == 200 and ndjson.headers['ETag'] != etag
+
+
+def _messages():
+    file = queue.Queue()
+    gestionnaire = GestionnaireFile(file)
+    logging.getLogger('app').addHandler(gestionnaire)
+
+    def lire():
+        logging.getLogger('app').removeHandler(gestionnaire)
+        return [file.get_nowait() for _ in range(file.qsize())]
+    return lire
+
+
+def test_memes_hooks_que_flask(app_fichier):
+    app = app_fichier(LOG_REQUESTS=True)
+    fournisseur_id, _ = _donnees(app.test_client())
+    etiquettes = {'method': 'GET', 'route': '/four/<int:id>'}
+    avant = REGISTRY.get_sample_value('http_requests_total', {**etiquettes, 'status': '200'}) or 0
+    avant_sql = REGISTRY.get_sample_value('db_statements_per_request_sum', etiquettes) or 0
+
+    lire = _messages()
+    response, inconnu, metriques = _executer(
+        create_asgi_app(app),
+        *_get(f'/four/{fournisseur_id}', headers={'X-Request-ID': 'req-async', 'Origin': 'http://frontend.exemple'}),
+        *_get('/four/999'), *_get('/metrics'),
+    )
+    messages = lire()
+
+    # Identifiant de requête renvoyé et ajouté au journal, CORS comme flask_cors
+    assert response.headers['X-Request-ID'] == 'req-async'
+    assert len(inconnu.headers['X-Request-ID']) == 32
+    assert response.headers['Access-Control-Allow-Origin'] == 'http://frontend.exemple'
+    assert ENTETE_PRIMAIRE in response.headers['Access-Control-Expose-Headers']
+    [ligne] = [m for m in messages if m.name == 'app.requetes' and getattr(m, 'request_id', None) == 'req-async']
+    assert (ligne.route, ligne.statut) == ('/four/<int:id>', 200)
+
+    # Métriques sous la règle Flask de la route, requêtes SQL du moteur asynchrone comptées
+    assert REGISTRY.get_sample_value('http_requests_total', {**etiquettes, 'status': '200'}) == avant + 1
+    assert REGISTRY.get_sample_value('http_requests_total', {**etiquettes, 'status': '404'}) >= 1
+    assert REGISTRY.get_sample_value('db_statements_per_request_sum', etiquettes) > avant_sql
+    assert 'route="/four/<int:id>"' in metriques.text
+
+
+def test_erreur_interne_sans_detail(app_fichier, monkeypatch):
+    app = app_fichier(TESTING=False)
+
+    def echec(*args):
+        raise RuntimeError("mot de passe de la base")
+
+    # Vue asynchrone et route Flask (servie par le pool de threads)
+    monkeypatch.setattr(asgi, 'document_beneficiaire', echec)
+    monkeypatch.setattr(routes, 'volumes_par_periode', echec)
+    _donnees(app.test_client())
+    lire = _messages()
+    reponses = _executer(create_asgi_app(app), *_get('/benef/1', '/analytics/volumes'))
+    messages = lire()
+    for response in reponses:
+        assert response.status_code == 500
+        assert response.json() == {"message": "Erreur interne"}
+        assert response.headers['X-Request-ID']
+    assert sum('mot de passe de la base' in (m.exc_text or '') for m in messages) == 2
+
+
+def test_replique_et_lecture_primaire(app_fichier, tmp_path):
+    app = app_fichier(DATABASE_REPLICA_URLS=[f"sqlite:///{tmp_path / 'replique.db'}"])
+    # Réplica en retard : schéma sans lignes
+    with app.app_context():
+        db.metadata.create_all(db.engines['replique_0'])
+
+    [ecriture] = _executer(create_asgi_app(app), ('POST', '/trans/add', {'json': {"montantFCFA": 600, "tauxConv": 600}}))
+    assert ecriture.status_code == 201
+
+    # Autre client (sans le cookie) : réplica, sauf en renvoyant l'en-tête reçu après l'écriture
+    sans_entete, avec_entete = _executer(
+        create_asgi_app(app), *_get('/total/tr'), *_get('/total/tr', headers={ENTETE_PRIMAIRE: ecriture.headers[ENTETE_PRIMAIRE]}),
+    )
+    assert sans_entete.json() == {"total": 0}
+    assert avec_entete.json() == {"total": 1}
+
+
+def test_requetes_lentes_concurrentes(app_fichier, monkeypatch):
+    # Bien plus de requêtes simultanées que de threads du pool WSGI : chacune attend la base
+    # (attente simulée par asyncio.sleep, comme une requête lente sous asyncpg) sans thread
+    app = app_fichier(ASGI_WSGI_WORKERS=2)
+    _donnees(app.test_client())
+    nombre, attente = 200, 0.5
+    en_cours = {'actuel': 0, 'maximum': 0}
+    lire_compteurs = ApplicationAsgi.lire_compteurs
+
+    async def lecture_lente(self, requete, ttl=0):
+        en_cours['actuel'] += 1
+        en_cours['maximum'] = max(en_cours['maximum'], en_cours['actuel'])
+        await asyncio.sleep(attente)
+        en_cours['actuel'] -= 1
+        return await lire_compteurs(self, requete, ttl)
+
+    monkeypatch.setattr(ApplicationAsgi, 'lire_compteurs', lecture_lente)
+    debut = time.perf_counter()
+    reponses = _executer(create_asgi_app(app), *_get(*['/total/tr'] * nombre), concurrentes=True)
+    duree = time.perf_counter() - debut
+
+    assert [response.json() for response in reponses] == [{"total": 3}] * nombre
+    assert en_cours['maximum'] == nombre
+    # Deux threads auraient demandé nombre * attente / 2 = 50 s
+    assert duree < 10
@@ -0,0 +1,72 @@
+import random
+
+from sqlalchemy import event
+
+from app import bases, db
+from tests.conftest import peupler
+
+
+def test_un_seul_replica_par_requete(creer_app, tmp_path, monkeypatch):
+    app = creer_app(DATABASE_REPLICA_URLS=[f"sqlite:///{tmp_path / f'replique_{i}.db'}" for i in range(3)])
+    moteurs_utilises = []
+    with app.app_context():
+        for cle in ('replique_0', 'replique_1', 'replique_2'):
+            moteur = db.engines[cle]
+            db.metadata.create_all(moteur)
+            event.listen(moteur, 'before_cursor_execute', lambda *args, cle=cle: moteurs_utilises.append(cle))
+    peupler(app, 2)
+
+    tirages = []
+
+    def choix(sequence):
+        tirages.append(len(sequence))
+        return random.Random(len(tirages)).choice(sequence)
+
+    monkeypatch.setattr(bases.random, 'choice', choix)
+    client = app.test_client()
+    for _ in range(5):
+        moteurs_utilises.clear()
+        # /all/four exécute deux requêtes (fournisseurs puis bénéficiaires)
+        assert client.get('/all/four').status_code == 200
+        assert len(moteurs_utilises) == 2
+        assert len(set(moteurs_utilises)) == 1
+    assert tirages == [3] * 5
+
+
+def _app_avec_replique_vide(creer_app, tmp_path):
+    # Réplica en retard : schéma créé mais aucune ligne
+    app = creer_app(DATABASE_REPLICA_URLS=[f"sqlite:///{tmp_path / 'replique.db'}"])
+    with app.app_context():
+        db.metadata.create_all(db.engines['replique_0'])
+    return app
+
+
+def _nb_transactions(client, **entetes):
+    response = client.get('/trans/all?limit=10', headers=entetes)
+    assert response.status_code == 200
+    return len(response.get_json()['transactions'])
+
+
+def test_lecture_apres_ecriture_meme_origine(creer_app, tmp_path):
+    app = _app_avec_replique_vide(creer_app, tmp_path)
+    client = app.test_client()
+    assert _nb_transactions(client) == 0
+    assert client.post('/trans/add', json={"montantFCFA": 600, "tauxConv": 600}).status_code == 201
+    # Cookie renvoyé par le navigateur : lecture sur la base principale
+    assert _nb_transactions(client) == 1
+
+
+def test_lecture_apres_ecriture_autre_origine(creer_app, tmp_path):
+    app = _app_avec_replique_vide(creer_app, tmp_path)
+    # Frontend d'une autre origine : fetch sans "credentials", pas de cookie
+    client = app.test_client(use_cookies=False)
+    origine = {'Origin': 'http://frontend.exemple'}
+
+    response = client.post('/trans/add', json={"montantFCFA": 600, "tauxConv": 600}, headers=origine)
+    assert bases.ENTETE_PRIMAIRE in response.headers['Access-Control-Expose-Headers']
+    jusqua = response.headers[bases.ENTETE_PRIMAIRE]
+
+    assert _nb_transactions(client, **origine) == 0
+    assert _nb_transactions(client, **origine, **{bases.ENTETE_PRIMAIRE: jusqua}) == 1
+    # Date non posée par le serveur (trop lointaine) : ignorée
+    assert _nb_transactions(client, **origine, **{bases.ENTETE_PRIMAIRE: str(float(jusqua) + 3600)}) == 0
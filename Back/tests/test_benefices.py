@@ -0,0 +1,218 @@
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app import db
+from app.models import Benefice, Beneficiaire, Fournisseur, Transaction
+
+
+def _table(app):
+    # Lignes de la table "benefices" : transaction -> (fournisseurs, bénéficiaires, quantité, marge, commissions, bénéfice)
+    with app.app_context():
+        return {
+            ligne.transaction_id: (
+                ligne.nb_fournisseurs, ligne.nb_beneficiaires,
+                Decimal(ligne.quantite_USDT), Decimal(ligne.marge), Decimal(ligne.commissions), Decimal(ligne.benefice),
+            )
+            for ligne in db.session.scalars(select(Benefice))
+        }
+
+
+def _recalcule(app):
+    # Mêmes valeurs calculées en Python depuis les tables de base (formules de /calculer)
+    with app.app_context():
+        resultat = {}
+        for transaction in db.session.scalars(select(Transaction)):
+            fournisseurs = db.session.scalars(select(Fournisseur).filter_by(transaction_id=transaction.id)).all()
+            nb_beneficiaires, quantite, marge, commissions = 0, Decimal(0), Decimal(0), Decimal(0)
+            for fournisseur in fournisseurs:
+                beneficiaires = db.session.scalars(select(Beneficiaire).filter_by(fournisseur_id=fournisseur.id)).all()
+                nb_beneficiaires += len(beneficiaires)
+                quantite += fournisseur.quantite_USDT
+                marge += (transaction.taux_convenu - fournisseur.taux_jour) * fournisseur.quantite_USDT
+                commissions += sum(b.commission_USDT for b in beneficiaires) * fournisseur.quantite_USDT
+            resultat[transaction.id] = (len(fournisseurs), nb_beneficiaires, quantite, marge, commissions, marge - commissions)
+        return resultat
+
+
+def _verifier(app, transaction_id, attendu):
+    table = _table(app)
+    # Toutes les lignes suivent les tables de base, pas seulement celle modifiée
+    assert table == _recalcule(app)
+    if attendu is None:
+        assert transaction_id not in table
+    else:
+        nb_fournisseurs, nb_beneficiaires, quantite, marge, commissions, benefice = attendu
+        assert table[transaction_id] == (nb_fournisseurs, nb_beneficiaires, *map(Decimal, (quantite, marge, commissions, benefice)))
+
+
+def _ok(response, code=200):
+    assert response.status_code == code, response.get_json()
+    return response.get_json()
+
+
+def test_benefices_apres_chaque_ecriture(app, client):
+    # Transactions : import en masse (dates fixées), ajout unitaire
+    _ok(client.post('/trans/bulk', json=[
+        {"montantFCFA": 600_000, "tauxConv": 600, "dateTransaction": "2026-03-01T10:00:00"},
+        {"montantFCFA": 610_000, "tauxConv": 610, "dateTransaction": "2026-03-02T10:00:00"},
+    ]), 201)
+    with app.app_context():
+        t1, t2 = db.session.scalars(select(Transaction.id).order_by(Transaction.id)).all()
+    _verifier(app, t1, (0, 0, 0, 0, 0, 0))
+    t3 = _ok(client.post('/trans/add', json={"montantFCFA": 500_000, "tauxConv": 500}), 201)['transaction']['id']
+    _verifier(app, t3, (0, 0, 0, 0, 0, 0))
+
+    # Fournisseurs : ajout ; marge (600 - 590) * 500
+    f1 = _ok(client.post('/add/four', json={"nom": "F1", "taux_jour": 590, "quantite_USDT": 500, "transaction_id": t1}), 201)['fournisseur']['id']
+    _verifier(app, t1, (1, 0, 500, 5000, 0, 5000))
+    f2 = _ok(client.post('/add/four', json={"nom": "F2", "taux_jour": 595, "quantite_USDT": 100, "transaction_id": t1}), 201)['fournisseur']['id']
+    _verifier(app, t1, (2, 0, 600, 5500, 0, 5500))
+
+    # Bénéficiaires : ajout et modification ; commission 1.5 * 500
+    b1 = _ok(client.post('/add/benef', json={"nom": "B1", "commission_USDT": 1.5, "fournisseur_nom": "F1"}))['beneficiaire']['id']
+    _verifier(app, t1, (2, 1, 600, 5500, 750, 4750))
+    _ok(client.put(f'/update/benef/{b1}', json={"nom": "B1", "commission_USDT": 2, "fournisseur_nom": "F1"}))
+    _verifier(app, t1, (2, 1, 600, 5500, 1000, 4500))
+
+    # Fournisseur modifié avec sa liste de bénéficiaires (écriture groupée) : (2 + 0.25) * 400
+    _ok(client.put(f'/update/four/{f1}', json={"quantite_USDT": 400, "beneficiaires": [
+        {"id": b1, "nom": "B1", "commission_USDT": 2},
+        {"nom": "B2", "commission_USDT": "0.25"},
+    ]}))
+    _verifier(app, t1, (2, 2, 500, 4500, 900, 3600))
+
+    # Fournisseur déplacé vers une autre transaction : les deux lignes sont recalculées
+    _ok(client.put(f'/update/four/{f1}', json={"transaction_id": t2}))
+    _verifier(app, t1, (1, 0, 100, 500, 0, 500))
+    _verifier(app, t2, (1, 2, 400, 8000, 900, 7100))
+
+    # Bénéficiaire déplacé vers un autre fournisseur : 0.25 * 100 passe de t2 à t1
+    with app.app_context():
+        b2 = db.session.scalar(select(Beneficiaire.id).filter_by(nom="B2"))
+    _ok(client.put(f'/update/benef/{b2}', json={"nom": "B2", "commission_USDT": "0.25", "fournisseur_nom": "F2"}))
+    _verifier(app, t1, (1, 1, 100, 500, 25, 475))
+    _verifier(app, t2, (1, 1, 400, 8000, 800, 7200))
+
+    # Transaction modifiée : nouveau taux convenu, (620 - 590) * 400
+    _ok(client.put(f'/trans/update/{t2}', json={"montantFCFA": 620_000, "tauxConv": 620}))
+    _verifier(app, t2, (1, 1, 400, 12000, 800, 11200))
+
+    # Suppressions : bénéficiaire, fournisseur (ses bénéficiaires par cascade), transactions
+    _ok(client.delete(f'/delete/benef/{b1}'))
+    _verifier(app, t2, (1, 0, 400, 12000, 0, 12000))
+    _ok(client.delete(f'/delete/four/{f2}'))
+    _verifier(app, t1, (0, 0, 0, 0, 0, 0))
+    _ok(client.delete(f'/trans/delete/{t2}'))
+    _verifier(app, t2, None)
+    with app.app_context():
+        assert db.session.scalar(select(Fournisseur.id).filter_by(id=f1)) is None
+    _ok(client.delete('/trans/delete', json={"ids": [t1, t3]}))
+    assert _table(app) == {}
+
+
+def test_api_cal(app, client):
+    _ok(client.post('/trans/bulk', json=[{"montantFCFA": 600_000, "tauxConv": 600, "dateTransaction": "2026-03-01T10:00:00"}]), 201)
+    with app.app_context():
+        transaction_id = db.session.scalar(select(Transaction.id))
+    _ok(client.post('/add/four', json={"nom": "F1", "taux_jour": 590, "quantite_USDT": "333.33", "transaction_id": transaction_id}), 201)
+    _ok(client.post('/add/benef', json={"nom": "B1", "commission_USDT": "0.35", "fournisseur_nom": "F1"}))
+
+    [ligne] = _ok(client.get('/cal'))['benefices']
+    # 10 * 333.33 = 3333.30 ; 0.35 * 333.33 = 116.6655 arrondi à 116.67
+    assert ligne == {
+        "transaction_id": transaction_id, "dateTransaction": "2026-03-01T10:00:00",
+        "nb_fournisseurs": 1, "nb_beneficiaires": 1,
+        "quantite_USDT": 333.33, "marge": 3333.3, "commissions": 116.67, "benefice": 3216.63,
+    }
+
+
+# Du vendredi 27 février au 1er avril 2026 : la semaine du lundi 23 février déborde sur mars
+DATES = [
+    datetime(2026, 2, 27, 9), datetime(2026, 2, 28, 23, 59), datetime(2026, 3, 1, 0, 0),
+    datetime(2026, 3, 1, 0, 0), datetime(2026, 3, 2, 8), datetime(2026, 3, 9, 12), datetime(2026, 4, 1, 7),
+]
+
+
+@pytest.fixture
+def transactions_datees(app, client):
+    # Une transaction par date (deux à la même heure le 1er mars), chacune avec un fournisseur :
+    # bénéfice (600 - 590) * (i + 1)
+    _ok(client.post('/trans/bulk', json=[
+        {"montantFCFA": 600_000, "tauxConv": 600, "dateTransaction": date.isoformat()} for date in DATES
+    ]), 201)
+    with app.app_context():
+        ids = db.session.scalars(select(Transaction.id).order_by(Transaction.date_transaction, Transaction.id)).all()
+    for i, transaction_id in enumerate(ids):
+        _ok(client.post('/add/four', json={"nom": f"F{i}", "taux_jour": 590, "quantite_USDT": i + 1, "transaction_id": transaction_id}), 201)
+    return ids
+
+
+def _pages(client, route, cle, **parametres):
+    pages, after = [], None
+    while True:
+        corps = _ok(client.get(route, query_string={**parametres, **({'after': after} if after else {})}))
+        pages.append(corps[cle])
+        after = corps['next']
+        if after is None:
+            return pages
+
+
+def test_cal_pagination(client, transactions_datees):
+    pages = _pages(client, '/cal', 'benefices', limit=3)
+    assert [[ligne['transaction_id'] for ligne in page] for page in pages] == [
+        transactions_datees[0:3], transactions_datees[3:6], transactions_datees[6:],
+    ]
+    # Deux transactions à la même date de part et d'autre d'une page
+    assert pages[0][2]['dateTransaction'] == pages[1][0]['dateTransaction']
+    assert [ligne['benefice'] for page in pages for ligne in page] == [10.0 * (i + 1) for i in range(len(DATES))]
+
+    # Filtres debut/fin (fin exclue) avec la pagination
+    pages = _pages(client, '/cal', 'benefices', limit=1, debut='2026-02-28', fin='2026-03-02')
+    assert [ligne['transaction_id'] for page in pages for ligne in page] == transactions_datees[1:4]
+    assert client.get('/cal?after=xyz').status_code == 400
+
+
+def _periodes(pages):
+    return [[(p['periode'], p['nb_transactions'], p['benefice']) for p in page] for page in pages]
+
+
+def test_cal_periodes_pagination(client, transactions_datees):
+    jours = _pages(client, '/cal/periodes', 'benefices', periode='jour', limit=2)
+    assert _periodes(jours) == [
+        [('2026-02-27', 1, 10.0), ('2026-02-28', 1, 20.0)],
+        [('2026-03-01', 2, 70.0), ('2026-03-02', 1, 50.0)],
+        [('2026-03-09', 1, 60.0), ('2026-04-01', 1, 70.0)],
+    ]
+
+    # La semaine du 23 février regroupe fin février et le 1er mars
+    semaines = _pages(client, '/cal/periodes', 'benefices', periode='semaine', limit=1)
+    assert _periodes(semaines) == [
+        [('2026-02-23', 4, 100.0)], [('2026-03-02', 1, 50.0)], [('2026-03-09', 1, 60.0)], [('2026-03-30', 1, 70.0)],
+    ]
+
+    mois = _pages(client, '/cal/periodes', 'benefices', periode='mois', limit=2)
+    assert _periodes(mois) == [[('2026-02-01', 2, 30.0), ('2026-03-01', 4, 180.0)], [('2026-04-01', 1, 70.0)]]
+
+
+def test_cal_periodes_after(client, transactions_datees):
+    # "after" au milieu d'une période : reprise à la période suivante
+    corps = _ok(client.get('/cal/periodes', query_string={'periode': 'semaine', 'after': '2026-02-25', 'limit': 2}))
+    assert [p['periode'] for p in corps['benefices']] == ['2026-03-02', '2026-03-09']
+    assert corps['next'] == '2026-03-09'
+    corps = _ok(client.get('/cal/periodes', query_string={'periode': 'mois', 'after': '2026-02-28'}))
+    assert [p['periode'] for p in corps['benefices']] == ['2026-03-01', '2026-04-01']
+    assert corps['next'] is None
+
+    # debut/fin inclus, combinés avec after
+    corps = _ok(client.get('/cal/periodes', query_string={
+        'periode': 'jour', 'debut': '2026-02-28', 'fin': '2026-03-09', 'after': '2026-02-28',
+    }))
+    assert [(p['periode'], p['nb_transactions']) for p in corps['benefices']] == [
+        ('2026-03-01', 2), ('2026-03-02', 1), ('2026-03-09', 1),
+    ]
+
+    assert client.get('/cal/periodes?after=01-03-2026').status_code == 400
+    assert client.get('/cal/periodes?periode=annee').status_code == 400
@@ -0,0 +1,116 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app import db
+from app.beneficiaires import differences_beneficiaires
+from app.models import Beneficiaire
+from tests.conftest import peupler
+
+ECRITURE_BENEFICIAIRES = re.compile(r'^(INSERT INTO|UPDATE|DELETE FROM) beneficiaires\b')
+
+
+def _lignes(*lignes):
+    return [SimpleNamespace(id=id, nom=nom, commission_USDT=commission) for id, nom, commission in lignes]
+
+
+def test_differences():
+    existants = _lignes((1, "A", 1), (2, "B", 2), (3, "C", 3))
+    a_supprimer, a_modifier, a_inserer = differences_beneficiaires(existants, [
+        {"nom": "A", "commission_USDT": 1},             # inchangé (retrouvé par son nom)
+        {"id": 2, "nom": "B2", "commission_USDT": 2},   # renommé
+        {"nom": "D", "commission_USDT": "4.005"},       # nouveau
+    ])
+    assert a_supprimer == [3]
+    assert [(ligne["id"], ligne["nom"]) for ligne in a_modifier] == [(2, "B2")]
+    assert [(ligne["nom"], str(ligne["commission_USDT"])) for ligne in a_inserer] == [("D", "4.01")]
+
+
+@pytest.mark.parametrize('soumis', [
+    [{"nom": "A", "commission_USDT": "NaN"}],
+    [{"nom": "A", "commission_USDT": float("nan")}],
+    [{"nom": "A", "commission_USDT": "Infinity"}],
+    [{"nom": "A", "commission_USDT": "abc"}],
+    [{"nom": "A", "commission_USDT": 1}, {"nom": "A", "commission_USDT": 2}],
+    [{"id": 99, "nom": "A", "commission_USDT": 1}],
+    [{"nom": "A"}],
+])
+def test_differences_refusees(soumis):
+    with pytest.raises(ValueError):
+        differences_beneficiaires(_lignes((1, "A", 1)), soumis)
+
+
+def _beneficiaires(app, fournisseur_id):
+    with app.app_context():
+        return db.session.execute(
+            select(Beneficiaire.id, Beneficiaire.nom, Beneficiaire.commission_USDT)
+            .filter_by(fournisseur_id=fournisseur_id).order_by(Beneficiaire.id)
+        ).all()
+
+
+def _mettre_a_jour(client, fournisseur_id, beneficiaires):
+    return client.put(f'/update/four/{fournisseur_id}', json={"beneficiaires": beneficiaires})
+
+
+def _total(client):
+    return client.get('/dashboard/summary').get_json()['total_beneficiaires']
+
+
+def test_lignes_inchangees_gardent_leur_id(app, client, requetes_sql):
+    [fournisseur_id], _ = peupler(app, 1, nb_beneficiaires=3)
+    avant = _beneficiaires(app, fournisseur_id)
+    total = _total(client)
+
+    soumis = [
+        {"id": avant[0].id, "nom": avant[0].nom, "commission_USDT": 1},   # inchangé
+        {"id": avant[1].id, "nom": "Renommé", "commission_USDT": 5},       # modifié
+        {"nom": "Nouveau 1", "commission_USDT": 2},
+        {"nom": "Nouveau 2", "commission_USDT": 3},
+    ]
+    compteur = requetes_sql(app)
+    response, _ = compteur.compter(_mettre_a_jour, client, fournisseur_id, soumis)
+    assert response.status_code == 200
+
+    # Une requête groupée par type d'écriture sur "beneficiaires"
+    ecritures = [i.split()[0] for i in compteur.instructions if ECRITURE_BENEFICIAIRES.match(i)]
+    assert sorted(ecritures) == ["DELETE", "INSERT", "UPDATE"]
+
+    apres = _beneficiaires(app, fournisseur_id)
+    assert apres[0] == avant[0]
+    assert (apres[1].id, apres[1].nom, int(apres[1].commission_USDT)) == (avant[1].id, "Renommé", 5)
+    assert [ligne.nom for ligne in apres] == [avant[0].nom, "Renommé", "Nouveau 1", "Nouveau 2"]
+    # Trois bénéficiaires deviennent quatre : +1 sur le compteur
+    assert _total(client) == total + 1
+
+
+def test_echange_de_noms(app, client):
+    [fournisseur_id], _ = peupler(app, 1, nb_beneficiaires=3)
+    a, b, c = _beneficiaires(app, fournisseur_id)
+
+    # Échange A <-> B et rotation avec C dans la même requête
+    response = _mettre_a_jour(client, fournisseur_id, [
+        {"id": a.id, "nom": b.nom, "commission_USDT": 1},
+        {"id": b.id, "nom": c.nom, "commission_USDT": 1},
+        {"id": c.id, "nom": a.nom, "commission_USDT": 1},
+    ])
+    assert response.status_code == 200
+    assert [(ligne.id, ligne.nom) for ligne in _beneficiaires(app, fournisseur_id)] == [
+        (a.id, b.nom), (b.id, c.nom), (c.id, a.nom),
+    ]
+
+    response = _mettre_a_jour(client, fournisseur_id, [
+        {"id": a.id, "nom": a.nom, "commission_USDT": 1},
+        {"id": b.id, "nom": b.nom, "commission_USDT": 1},
+    ])
+    assert response.status_code == 200
+    assert [(ligne.id, ligne.nom) for ligne in _beneficiaires(app, fournisseur_id)] == [(a.id, a.nom), (b.id, b.nom)]
+
+
+def test_commission_non_finie_refusee(app, client):
+    [fournisseur_id], _ = peupler(app, 1, nb_beneficiaires=1)
+    avant = _beneficiaires(app, fournisseur_id)
+    response = _mettre_a_jour(client, fournisseur_id, [{"nom": "X", "commission_USDT": "NaN"}])
+    assert response.status_code == 400
+    assert _beneficiaires(app, fournisseur_id) == avant
@@ -0,0 +1,79 @@
+import io
+
+from sqlalchemy import text
+
+from app import db
+
+
+def _importer(client, lignes):
+    response = client.post('/trans/bulk', json=lignes)
+    return response.status_code, response.get_json()
+
+
+def _total(client):
+    return client.get('/dashboard/summary').get_json()['total_transactions']
+
+
+def test_erreurs_par_ligne(client):
+    statut, resultat = _importer(client, [
+        {"montantFCFA": 600000, "tauxConv": 600},
+        {"montantFCFA": "abc", "tauxConv": 600},
+        {"montantFCFA": 600000.5, "tauxConv": 600},
+        {"montantFCFA": 600000, "tauxConv": 599.9},
+        {"montantFCFA": 2**31, "tauxConv": 600},
+        {"montantFCFA": 2**31 - 1, "tauxConv": 1},
+        {"montantFCFA": 1000, "tauxConv": 500, "dateTransaction": "hier"},
+        {"montantFCFA": 1000, "tauxConv": 500, "dateTransaction": "2026-01-01T10:00:00"},
+    ])
+    assert statut == 201
+    assert resultat['inserees'] == 2
+    assert [(erreur['ligne'], erreur['message']) for erreur in resultat['erreurs']] == [
+        (2, "Données invalides"),
+        (3, "montantFCFA et tauxConv doivent être des entiers"),
+        (4, "montantFCFA et tauxConv doivent être des entiers"),
+        (5, "Valeur hors limites"),
+        (6, "Valeur hors limites"),
+        (7, "dateTransaction invalide"),
+    ]
+    assert _total(client) == 2
+
+
+def test_ligne_refusee_par_la_base(app, client):
+    # Seule la ligne refusée est signalée : les autres lignes du lot sont enregistrées
+    with app.app_context():
+        db.session.execute(text(
+            "CREATE TRIGGER refus BEFORE INSERT ON transactions WHEN NEW.montant_FCFA = 666 "
+            "BEGIN SELECT RAISE(ABORT, 'refus'); END"
+        ))
+        db.session.commit()
+
+    statut, resultat = _importer(client, [
+        {"montantFCFA": 1000, "tauxConv": 500},
+        {"montantFCFA": 666, "tauxConv": 1},
+        {"montantFCFA": 3000, "tauxConv": 500},
+    ])
+    assert statut == 201
+    assert resultat['inserees'] == 2
+    assert resultat['erreurs'] == [{"ligne": 2, "message": "Ligne refusée par la base (contrainte non respectée)"}]
+    assert _total(client) == 2
+    montants = [int(t['montantFCFA']) for t in client.get('/trans/all').get_json()['transactions']]
+    assert sorted(montants) == [1000, 3000]
+
+
+def test_import_csv(client):
+    contenu = "montantFCFA,tauxConv\n600000,600\n,600\n1200000,600\n"
+    response = client.post('/trans/bulk', data={'file': (io.BytesIO(contenu.encode()), 'transactions.csv')})
+    resultat = response.get_json()
+    assert response.status_code == 201
+    assert resultat['inserees'] == 2
+    assert [erreur['ligne'] for erreur in resultat['erreurs']] == [2]
+
+
+def test_aucune_ligne_valide(client):
+    statut, resultat = _importer(client, [{"montantFCFA": -1, "tauxConv": 600}])
+    assert statut == 400
+    assert resultat['rejetees'] == 1
+
+
+def test_format_non_supporte(client):
+    assert client.post('/trans/bulk', data="x", content_type='text/plain').status_code == 415
@@ -0,0 +1,105 @@
+import importlib
+
+import config
+import fakeredis
+import pytest
+
+from app import db
+from app.cache import CacheMemoire, cle_fournisseur, creer_cache
+from tests.conftest import peupler
+
+
+def _nom_fournisseur(client, id):
+    response = client.get(f'/four/{id}')
+    assert response.status_code == 200
+    return response.get_json()['fournisseur']['nom']
+
+
+def test_invalidation_apres_modification(creer_app):
+    app = creer_app(ENTITY_CACHE_BACKEND='memoire')
+    [id], _ = peupler(app, 1)
+    client = app.test_client()
+
+    assert _nom_fournisseur(client, id) == "Fournisseur 0"
+    with app.app_context():
+        assert app.extensions['cache_entites'].get(cle_fournisseur(id)) is not None
+
+    response = client.put(f'/update/four/{id}', json={"nom": "Renommé", "taux_jour": 590, "quantite_USDT": 1000})
+    assert response.status_code == 200
+    assert _nom_fournisseur(client, id) == "Renommé"
+
+
+def test_cache_redis_partage_entre_processus(creer_app, tmp_path):
+    # Deux applications sur la même base et le même serveur Redis (simulé) : l'écriture de
+    # l'une invalide le document lu par l'autre
+    serveur = fakeredis.FakeServer()
+    config = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'base.db'}",
+        'ENTITY_CACHE_BACKEND': 'redis',
+        'WEB_CONCURRENCY': 2,
+    }
+    worker_a, worker_b = creer_app(**config), creer_app(**config)
+    for app in (worker_a, worker_b):
+        app.extensions['cache_entites'].client = fakeredis.FakeRedis(server=serveur)
+    [id], _ = peupler(worker_a, 1)
+
+    assert _nom_fournisseur(worker_b.test_client(), id) == "Fournisseur 0"
+    response = worker_a.test_client().put(f'/update/four/{id}', json={"nom": "Renommé", "taux_jour": 590, "quantite_USDT": 1000})
+    assert response.status_code == 200
+    assert _nom_fournisseur(worker_b.test_client(), id) == "Renommé"
+
+
+def test_cache_memoire_refuse_avec_plusieurs_processus():
+    assert isinstance(creer_cache({'ENTITY_CACHE_BACKEND': 'memoire', 'WEB_CONCURRENCY': 1}), CacheMemoire)
+    with pytest.raises(RuntimeError):
+        creer_cache({'ENTITY_CACHE_BACKEND': 'memoire', 'WEB_CONCURRENCY': 4})
+
+
+def test_absence_chargee_depuis_la_base_principale(creer_app, tmp_path):
+    # Réplica vide (en retard) : le document mis en cache vient quand même de la base principale
+    app = creer_app(
+        ENTITY_CACHE_BACKEND='memoire',
+        DATABASE_REPLICA_URLS=[f"sqlite:///{tmp_path / 'replique.db'}"],
+    )
+    with app.app_context():
+        db.metadata.create_all(db.engines['replique_0'])
+    [id], _ = peupler(app, 1)
+    client = app.test_client()
+
+    # Les listes @lecture_seule lisent bien le réplica
+    assert client.get('/all/four').get_json()['fournisseurs'] == []
+    assert _nom_fournisseur(client, id) == "Fournisseur 0"
+
+
+def test_redis_injoignable_lecture_en_base(creer_app):
+    # Port fermé : chaque accès au cache échoue, les routes répondent depuis la base
+    app = creer_app(ENTITY_CACHE_BACKEND='redis', ENTITY_CACHE_URL='redis://127.0.0.1:1/0')
+    [id], [benef_id, *_] = peupler(app, 1)
+    client = app.test_client()
+    client.post('/save', json={"email": "awa@exemple.com", "password": "secret"})
+
+    assert _nom_fournisseur(client, id) == "Fournisseur 0"
+    assert client.get(f'/benef/{benef_id}').status_code == 200
+    assert client.get('/user?email=awa@exemple.com').status_code == 200
+    response = client.put(f'/update/four/{id}', json={"nom": "Renommé"})
+    assert response.status_code == 200
+    assert _nom_fournisseur(client, id) == "Renommé"
+
+
+@pytest.mark.parametrize('environ, attendu', [
+    ({}, 'memoire'),
+    ({'WEB_CONCURRENCY': '4'}, 'none'),
+    ({'WEB_CONCURRENCY': '4', 'ENTITY_CACHE_URL': 'redis://cache:6379/0'}, 'redis'),
+    ({'WEB_CONCURRENCY': '4', 'ENTITY_CACHE_BACKEND': 'redis'}, 'redis'),
+])
+def test_backend_par_defaut(monkeypatch, environ, attendu):
+    # Le paquet optionnel redis n'est utilisé que s'il est demandé explicitement
+    for nom in ('WEB_CONCURRENCY', 'ENTITY_CACHE_URL', 'ENTITY_CACHE_BACKEND'):
+        monkeypatch.delenv(nom, raising=False)
+    for nom, valeur in environ.items():
+        monkeypatch.setenv(nom, valeur)
+    try:
+        assert importlib.reload(config).Config.ENTITY_CACHE_BACKEND == attendu
+    finally:
+        monkeypatch.undo()
+        importlib.reload(config)
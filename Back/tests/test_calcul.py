@@ -0,0 +1,71 @@
+import pytest
+
+from app.calcul import MAX_SCENARIOS
+
+RESULTATS = ("montantUSDT", "beneficeUSDT", "beneficeTotalFCFA", "beneficeBeneficiaire")
+
+
+def _lot(client, donnees):
+    return client.post('/calculer/batch', json=donnees)
+
+
+def test_meme_arrondi_que_calculer(client):
+    # Valeurs dont l'arrondi à 2 décimales tombe à mi-chemin
+    scenarios = [
+        {"montantFCFA": 1000, "tauxConvenu": 3, "tauxFournisseur": 2.675, "quantiteUSDT": 1, "commission": 0.125},
+        {"montantFCFA": 1.005, "tauxConvenu": 1, "tauxFournisseur": 0.5, "quantiteUSDT": 3.3, "commission": 1.115},
+        {"montantFCFA": 600_000, "tauxConvenu": 610.5, "tauxFournisseur": 598.25, "quantiteUSDT": 982.7, "commission": 0.35},
+    ]
+    response = _lot(client, {nom: [s[nom] for s in scenarios] for nom in scenarios[0]})
+    assert response.status_code == 200
+    resultats = response.get_json()['resultats']
+    for i, scenario in enumerate(scenarios):
+        attendu = client.post('/calculer', json=scenario).get_json()
+        assert {nom: resultats[nom][i] for nom in RESULTATS} == {nom: attendu[nom] for nom in RESULTATS}
+
+
+def test_grille(client):
+    response = _lot(client, {
+        "grille": {"tauxConvenu": {"debut": 600, "fin": 620, "pas": 10}, "quantiteUSDT": [100, 200]},
+        "montantFCFA": 1_200_000, "tauxFournisseur": 590,
+    })
+    assert response.status_code == 200
+    corps = response.get_json()
+    assert corps['n'] == 6
+    assert corps['parametres']['tauxConvenu'] == [600, 600, 610, 610, 620, 620]
+    assert corps['parametres']['quantiteUSDT'] == [100, 200] * 3
+    assert corps['parametres']['montantFCFA'] == [1_200_000] * 6
+    assert corps['resultats']['beneficeTotalFCFA'] == [1000, 2000, 2000, 4000, 3000, 6000]
+
+
+def test_diffusion(client):
+    corps = _lot(client, {"montantFCFA": [600, 1200], "tauxConvenu": 600}).get_json()
+    assert corps['resultats']['montantUSDT'] == [1, 2]
+    response = _lot(client, {"montantFCFA": [1, 2, 3], "tauxConvenu": [600, 610]})
+    assert response.status_code == 400
+    assert "même longueur" in response.get_json()['error']
+
+
+@pytest.mark.parametrize('donnees', [
+    {"montantFCFA": 1000, "tauxConvenu": [600, 0]},
+    {"montantFCFA": "nan", "tauxConvenu": 600},
+    {"montantFCFA": [1000, "inf"], "tauxConvenu": 600},
+    {"montantFCFA": 1000, "tauxConvenu": 600, "grille": {"quantiteUSDT": {"debut": 0, "fin": "inf", "pas": 1}}},
+    {"montantFCFA": 1e308, "tauxConvenu": 1e-308},
+    {"montantFCFA": "abc", "tauxConvenu": 600},
+    {"grille": {"tauxConvenu": {"debut": 600, "fin": 500, "pas": 1}}},
+])
+def test_valeurs_refusees(client, donnees):
+    response = _lot(client, donnees)
+    assert response.status_code == 400
+    assert response.get_json()['error']
+
+
+def test_nombre_de_scenarios_limite(client):
+    # 1001 x 1001 scénarios : refusé avant le calcul
+    axe = {"debut": 1, "fin": 1001, "pas": 1}
+    response = _lot(client, {"grille": {"tauxConvenu": axe, "quantiteUSDT": axe}})
+    assert response.status_code == 400
+    assert str(MAX_SCENARIOS) in response.get_json()['error']
+    response = _lot(client, {"grille": {"tauxConvenu": {"debut": 0, "fin": MAX_SCENARIOS, "pas": 1}}})
+    assert response.status_code == 400
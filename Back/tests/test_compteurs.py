@@ -0,0 +1,58 @@
+import threading
+
+from sqlalchemy import select
+
+from app import db
+from app.compteurs import COMPTEUR_SLOTS, ajuster_compteurs, lire_compteurs, marquer_modifiees
+from app.models import Compteur
+
+
+def _dans_un_thread(app, fonction):
+    def executer():
+        with app.app_context():
+            fonction()
+            db.session.commit()
+    thread = threading.Thread(target=executer)
+    thread.start()
+    thread.join()
+
+
+def _slots_utilises(nom):
+    return set(db.session.scalars(select(Compteur.slot).where(Compteur.nom == nom, Compteur.valeur != 0)))
+
+
+def test_slots_crees_au_demarrage(app):
+    with app.app_context():
+        slots = db.session.scalars(select(Compteur.slot).where(Compteur.nom == 'transactions')).all()
+        assert sorted(slots) == list(range(COMPTEUR_SLOTS))
+
+
+def test_ecritures_reparties_et_additionnees(app):
+    for _ in range(20):
+        _dans_un_thread(app, lambda: ajuster_compteurs(transactions=1, volume_FCFA=1000))
+
+    with app.app_context():
+        compteurs = lire_compteurs()
+        assert compteurs['transactions'] == 20
+        assert compteurs['volume_FCFA'] == 20_000
+        # 20 threads tirés au hasard parmi 16 slots : plusieurs lignes ont été écrites
+        assert len(_slots_utilises('transactions')) > 1
+
+
+def test_meme_slot_dans_un_thread(app):
+    with app.app_context():
+        marquer_modifiees('fournisseurs', fournisseurs=1)
+        marquer_modifiees('beneficiaires', beneficiaires=2)
+        db.session.commit()
+        slots = _slots_utilises('fournisseurs') | _slots_utilises('beneficiaires') | _slots_utilises('version_fournisseurs')
+        assert len(slots) == 1
+        assert lire_compteurs()['version_fournisseurs'] == 1
+
+
+def test_resume_apres_ecritures(client):
+    for montant in (600_000, 1_200_000):
+        assert client.post('/trans/add', json={"montantFCFA": montant, "tauxConv": 600}).status_code == 201
+    resume = client.get('/dashboard/summary').get_json()
+    assert resume['total_transactions'] == 2
+    assert resume['volume_FCFA'] == 1_800_000
+    assert resume['volume_USDT'] == 3000.0
@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import func, select, text
+
+from app import db, ecriture
+from app.models import Transaction
+
+
+@pytest.fixture
+def app_groupee(creer_app, tmp_path):
+    # Écriture groupée sur une base fichier (le thread d'écriture a sa propre connexion)
+    def fabrique(**config):
+        return creer_app(**{
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'base.db'}",
+            'TRANSACTION_WRITE_BEHIND': True,
+            **config,
+        })
+    return fabrique
+
+
+def _en_parallele(app, montants):
+    # Une requête /trans/add par thread, lancées ensemble ; renvoie les réponses dans l'ordre
+    reponses = [None] * len(montants)
+    depart = threading.Barrier(len(montants))
+
+    def envoyer(i, montant):
+        client = app.test_client()
+        depart.wait()
+        reponses[i] = client.post('/trans/add', json={"montantFCFA": montant, "tauxConv": 600})
+
+    threads = [threading.Thread(target=envoyer, args=(i, montant)) for i, montant in enumerate(montants)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return reponses
+
+
+def _taille_lots():
+    return REGISTRY.get_sample_value('transaction_write_batch_size_sum') or 0
+
+
+def test_ecritures_concurrentes_groupees(app_groupee):
+    app = app_groupee(TRANSACTION_BATCH_WAIT_MS=50)
+    avant = _taille_lots()
+    reponses = _en_parallele(app, [600 * (i + 1) for i in range(20)])
+
+    assert [r.status_code for r in reponses] == [201] * 20
+    transactions = [r.get_json()['transaction'] for r in reponses]
+    assert len({t['id'] for t in transactions}) == 20
+    assert all(t['dateTransaction'] for t in transactions)
+    assert [t['montantUSDT'] for t in transactions] == [float(i + 1) for i in range(20)]
+    assert _taille_lots() == avant + 20
+
+    with app.app_context():
+        assert db.session.scalar(select(func.count(Transaction.id))) == 20
+    assert app.test_client().get('/dashboard/summary').get_json()['total_transactions'] == 20
+
+
+def test_ligne_refusee_isolee(app_groupee):
+    app = app_groupee(TRANSACTION_BATCH_WAIT_MS=200)
+    with app.app_context():
+        db.session.execute(text(
+            "CREATE TRIGGER refus BEFORE INSERT ON transactions WHEN NEW.montant_FCFA = 666 "
+            "BEGIN SELECT RAISE(ABORT, 'refus'); END"
+        ))
+        db.session.commit()
+
+    reponses = _en_parallele(app, [600, 666, 1200])
+    assert [r.status_code for r in reponses] == [201, 500, 201]
+    assert 'refus' not in reponses[1].get_data(as_text=True)
+    with app.app_context():
+        assert sorted(db.session.scalars(select(Transaction.montant_FCFA))) == [600, 1200]
+
+
+def _bloquer_ecrivain(monkeypatch):
+    # Le thread d'écriture attend "liberer" avant de valider chaque lot ; "pris" signale
+    # qu'un lot a été retiré de la file
+    pris, liberer = threading.Event(), threading.Event()
+    valider = ecriture._valider_lot
+
+    def valider_bloque(lot):
+        pris.set()
+        liberer.wait(timeout=10)
+        valider(lot)
+
+    monkeypatch.setattr(ecriture, '_valider_lot', valider_bloque)
+    return pris, liberer
+
+
+def test_file_pleine(app_groupee, monkeypatch):
+    app = app_groupee(TRANSACTION_QUEUE_SIZE=1, TRANSACTION_BATCH_SIZE=1)
+    pris, liberer = _bloquer_ecrivain(monkeypatch)
+    reponses = []
+
+    def envoyer():
+        reponses.append(app.test_client().post('/trans/add', json={"montantFCFA": 600, "tauxConv": 600}))
+
+    # Une transaction en cours d'écriture, une autre en file : la suivante est refusée
+    en_cours = threading.Thread(target=envoyer)
+    en_cours.start()
+    assert pris.wait(timeout=5)
+    en_file = threading.Thread(target=envoyer)
+    en_file.start()
+    while not ecriture._ecrivain['file'].full():
+        time.sleep(0.01)
+
+    response = app.test_client().post('/trans/add', json={"montantFCFA": 600, "tauxConv": 600})
+    assert response.status_code == 503
+
+    liberer.set()
+    en_cours.join()
+    en_file.join()
+    assert [r.status_code for r in reponses] == [201, 201]
+
+
+def test_confirmation_hors_delai(app_groupee, monkeypatch):
+    app = app_groupee(TRANSACTION_ACK_TIMEOUT=0.1)
+    pris, liberer = _bloquer_ecrivain(monkeypatch)
+    try:
+        response = app.test_client().post('/trans/add', json={"montantFCFA": 600, "tauxConv": 600})
+        assert response.status_code == 503
+    finally:
+        liberer.set()
+    # La transaction est tout de même validée une fois le thread libéré
+    for _ in range(100):
+        with app.app_context():
+            if db.session.scalar(select(func.count(Transaction.id))):
+                break
+        time.sleep(0.05)
+    with app.app_context():
+        assert db.session.scalar(select(func.count(Transaction.id))) == 1
@@ -0,0 +1,65 @@
+from tests.conftest import peupler
+
+
+def _etag(client, chemin, **entetes):
+    response = client.get(chemin, headers=entetes)
+    assert response.status_code == 200
+    return response.headers['ETag'].strip('"')
+
+
+def test_304_si_rien_na_change(app, client):
+    peupler(app, 2)
+    etag = _etag(client, '/all/four')
+    response = client.get('/all/four', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    assert response.headers['ETag'].strip('"') == etag
+
+
+def test_etag_change_apres_ecriture(app, client):
+    peupler(app, 2)
+    avant = _etag(client, '/all/four')
+
+    response = client.post('/add/benef', json={"nom": "Nouveau", "commission_USDT": 1, "fournisseur_nom": "Fournisseur 0"})
+    assert response.status_code == 200
+
+    response = client.get('/all/four', headers={'If-None-Match': f'"{avant}"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'].strip('"') != avant
+
+
+def test_etag_par_url_et_par_table(app, client):
+    peupler(app, 2)
+    assert _etag(client, '/all/four') != _etag(client, '/all/four?x=1')
+
+    # /all/four/nom ne lit que "fournisseurs" : un nouveau bénéficiaire ne change pas son ETag
+    etag_noms = _etag(client, '/all/four/nom')
+    client.post('/add/benef', json={"nom": "Nouveau", "commission_USDT": 1, "fournisseur_nom": "Fournisseur 0"})
+    assert _etag(client, '/all/four/nom') == etag_noms
+    assert client.get('/all/four/nom', headers={'If-None-Match': f'"{etag_noms}"'}).status_code == 304
+
+
+def test_variante_compressee(creer_app):
+    app = creer_app(COMPRESS_MIN_SIZE=10)
+    peupler(app, 5)
+    client = app.test_client()
+    etag = _etag(client, '/all/four', **{'Accept-Encoding': 'gzip'})
+    assert etag.endswith('-gzip')
+    response = client.get('/all/four', headers={'Accept-Encoding': 'gzip', 'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+
+
+def test_etag_par_representation(client):
+    client.post('/trans/add', json={"montantFCFA": 600_000, "tauxConv": 600})
+    json_ = client.get('/trans/all?limit=10')
+    ndjson = client.get('/trans/all?limit=10', headers={'Accept': 'application/x-ndjson'})
+    assert ndjson.mimetype == 'application/x-ndjson'
+    assert 'Accept' in json_.headers['Vary'] and 'Accept' in ndjson.headers['Vary']
+    assert json_.headers['ETag'] != ndjson.headers['ETag']
+
+    # L'ETag de la version JSON ne valide pas la version NDJSON (et inversement)
+    response = client.get('/trans/all?limit=10', headers={'Accept': 'application/x-ndjson', 'If-None-Match': json_.headers['ETag']})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    response = client.get('/trans/all?limit=10', headers={'Accept': 'application/x-ndjson', 'If-None-Match': ndjson.headers['ETag']})
+    assert response.status_code == 304
+    assert 'Accept' in response.headers['Vary']
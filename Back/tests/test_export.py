@@ -0,0 +1,120 @@
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app import db, export
+from app.export import COLONNES_EXPORT
+from app.models import Beneficiaire, Fournisseur, Transaction
+
+
+@pytest.fixture
+def grand_livre(app):
+    # T1 : un fournisseur avec deux bénéficiaires et un sans bénéficiaire ; T2 sans fournisseur ;
+    # T3 le mois suivant
+    with app.app_context():
+        t1 = Transaction(montant_FCFA=600_000, taux_convenu=600, montant_USDT=1000, date_transaction=datetime(2026, 3, 1, 10))
+        t2 = Transaction(montant_FCFA=300_000, taux_convenu=600, montant_USDT=500, date_transaction=datetime(2026, 3, 2, 9))
+        t3 = Transaction(montant_FCFA=120_000, taux_convenu=600, montant_USDT=200, date_transaction=datetime(2026, 4, 1, 8))
+        f1 = Fournisseur(nom="F1", taux_jour=590, quantite_USDT=600, transaction=t1)
+        f1.beneficiaires = [Beneficiaire(nom="B1", commission_USDT=Decimal('1.5')), Beneficiaire(nom="B2", commission_USDT=2)]
+        f2 = Fournisseur(nom="F2", taux_jour=595, quantite_USDT=400, transaction=t1)
+        f3 = Fournisseur(nom="F3", taux_jour=580, quantite_USDT=200, transaction=t3)
+        f3.beneficiaires = [Beneficiaire(nom="B3", commission_USDT=1)]
+        db.session.add_all([t1, t2, t3, f1, f2, f3])
+        db.session.commit()
+        return [t1.id, t2.id, t3.id]
+
+
+def _lignes_csv(contenu):
+    lignes = list(csv.reader(io.StringIO(contenu.decode())))
+    return lignes[0], lignes[1:]
+
+
+def _resume(lignes):
+    # (transaction, fournisseur, bénéficiaire) de chaque ligne, "" pour un enfant absent
+    return [(ligne[0], ligne[6], ligne[10]) for ligne in lignes]
+
+
+def test_csv(client, grand_livre):
+    t1, t2, t3 = map(str, grand_livre)
+    response = client.get('/trans/export')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=transactions.csv'
+
+    entete, lignes = _lignes_csv(response.get_data())
+    assert tuple(entete) == COLONNES_EXPORT
+    assert _resume(lignes) == [(t1, "F1", "B1"), (t1, "F1", "B2"), (t1, "F2", ""), (t2, "", ""), (t3, "F3", "B3")]
+    assert lignes[0][1:] == ["2026-03-01 10:00:00", "600000", "600", "1000.00", lignes[0][5], "F1", "590", "600.00", lignes[0][9], "B1", "1.50"]
+    # Transaction sans fournisseur : colonnes des enfants vides
+    assert lignes[3][5:] == [""] * 7
+
+
+def test_periode(client, grand_livre):
+    t1, t2, t3 = map(str, grand_livre)
+    # debut inclus, fin exclue
+    _, lignes = _lignes_csv(client.get('/trans/export?debut=2026-03-02&fin=2026-04-01T08:00:00').get_data())
+    assert _resume(lignes) == [(t2, "", "")]
+    _, lignes = _lignes_csv(client.get('/trans/export?debut=2026-03-02').get_data())
+    assert _resume(lignes) == [(t2, "", ""), (t3, "F3", "B3")]
+    # Période vide : en-tête seul
+    entete, lignes = _lignes_csv(client.get('/trans/export?fin=2026-01-01').get_data())
+    assert (tuple(entete), lignes) == (COLONNES_EXPORT, [])
+
+    assert client.get('/trans/export?debut=hier').status_code == 400
+    assert client.get('/trans/export?format=xlsx').status_code == 400
+
+
+def test_parquet(client, grand_livre):
+    pq = pytest.importorskip('pyarrow.parquet')
+    t1, t2, t3 = grand_livre
+    response = client.get('/trans/export?format=parquet&fin=2026-04-01')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/vnd.apache.parquet'
+
+    table = pq.read_table(io.BytesIO(response.get_data()))
+    assert tuple(table.column_names) == COLONNES_EXPORT
+    lignes = table.to_pylist()
+    assert [(l['transaction_id'], l['fournisseur_nom'], l['beneficiaire_nom']) for l in lignes] == [
+        (t1, "F1", "B1"), (t1, "F1", "B2"), (t1, "F2", None), (t2, None, None),
+    ]
+    assert lignes[0]['date_transaction'] == datetime(2026, 3, 1, 10)
+    assert (lignes[0]['montant_USDT'], lignes[0]['commission_USDT']) == (Decimal('1000.00'), Decimal('1.50'))
+    assert all(lignes[3][colonne] is None for colonne in COLONNES_EXPORT[5:])
+
+
+def test_parquet_indisponible(app, client, grand_livre, monkeypatch):
+    monkeypatch.setattr(export, 'parquet_disponible', lambda: False)
+    response = client.get('/trans/export?format=parquet')
+    assert response.status_code == 501
+    assert 'pyarrow' in response.get_json()['message']
+    # CSV toujours disponible
+    assert client.get('/trans/export').status_code == 200
+
+    resultat = app.test_cli_runner().invoke(args=['export', '--format', 'parquet'])
+    assert resultat.exit_code == 2
+    assert 'pyarrow' in resultat.output
+
+
+def test_commande(app, grand_livre, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    t1, t2, t3 = map(str, grand_livre)
+    runner = app.test_cli_runner()
+
+    resultat = runner.invoke(args=['export', '--debut', '2026-03-01', '--fin', '2026-03-02'])
+    assert resultat.exit_code == 0, resultat.output
+    entete, lignes = _lignes_csv(resultat.stdout_bytes)
+    assert tuple(entete) == COLONNES_EXPORT
+    assert _resume(lignes) == [(t1, "F1", "B1"), (t1, "F1", "B2"), (t1, "F2", "")]
+
+    sortie = tmp_path / 'grand_livre.parquet'
+    resultat = runner.invoke(args=['export', '--format', 'parquet', '--debut', '2026-03-02', '--sortie', str(sortie)])
+    assert resultat.exit_code == 0, resultat.output
+    table = pq.read_table(sortie)
+    assert tuple(table.column_names) == COLONNES_EXPORT
+    assert table.column('transaction_id').to_pylist() == [int(t2), int(t3)]
+
+    assert runner.invoke(args=['export', '--debut', 'hier']).exit_code == 2
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from app.hachage import HachageIndisponible, _executer
+
+
+def _lent(duree):
+    time.sleep(duree)
+    return duree
+
+
+def test_inscription_et_connexion(client):
+    identifiants = {"email": "awa@exemple.com", "password": "secret"}
+    assert client.post('/save', json=identifiants).status_code == 201
+    assert client.post('/save', json=identifiants).status_code == 409
+    assert client.post('/login', json=identifiants).status_code == 200
+    assert client.post('/login', json={**identifiants, "password": "faux"}).status_code == 401
+
+
+def test_calcul_trop_long_refuse(creer_app):
+    # Le calcul continue dans le pool, mais la requête n'attend pas plus de HASH_TIMEOUT
+    app = creer_app(HASH_WORKERS=1, HASH_TIMEOUT=0.2)
+    with app.app_context():
+        debut = time.monotonic()
+        with pytest.raises(HachageIndisponible):
+            _executer(_lent, 2)
+        assert time.monotonic() - debut < 1.5
+
+
+def test_place_liberee_a_la_fin_du_calcul(creer_app):
+    # La place d'un calcul abandonné n'est libérée qu'à sa fin : en attendant, la file est pleine
+    app = creer_app(HASH_WORKERS=1, HASH_TIMEOUT=0.1, HASH_MAX_PENDING=1, HASH_QUEUE_TIMEOUT=0.1)
+    with app.app_context():
+        with pytest.raises(HachageIndisponible):
+            _executer(_lent, 1)
+        with pytest.raises(HachageIndisponible):
+            _executer(_lent, 0)
+        time.sleep(1.2)
+        assert _executer(_lent, 0) == 0
+
+
+def test_pool_dans_un_processus(creer_app):
+    app = creer_app(HASH_WORKERS=1, HASH_TIMEOUT=5)
+    with app.app_context():
+        assert _executer(_lent, 0.01) == 0.01
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+from itsdangerous import URLSafeTimedSerializer
+
+from app import db
+from app.models import JetonRevoque
+
+IDENTIFIANTS = {"email": "awa@exemple.com", "password": "secret"}
+
+
+def _jeton(client):
+    client.post('/save', json=IDENTIFIANTS)
+    return client.post('/login', json=IDENTIFIANTS).get_json()['token']
+
+
+def _moi(client, jeton):
+    return client.get('/user/me', headers={'Authorization': f'Bearer {jeton}'})
+
+
+def test_jeton_verifie_sans_lecture_des_utilisateurs(app, client, requetes_sql):
+    jeton = _jeton(client)
+    compteur = requetes_sql(app)
+    response, _ = compteur.compter(_moi, client, jeton)
+    assert response.status_code == 200
+    assert response.get_json()['email'] == IDENTIFIANTS['email']
+    assert not any('users' in instruction for instruction in compteur.instructions)
+    assert client.get('/user/me').status_code == 401
+    assert _moi(client, 'pas-un-jeton').status_code == 401
+
+
+def test_deconnexion_revoque_le_jeton(client):
+    jeton = _jeton(client)
+    assert client.post('/logout', headers={'Authorization': f'Bearer {jeton}'}).status_code == 200
+    assert _moi(client, jeton).status_code == 401
+    # Un nouveau jeton reste valide
+    assert _moi(client, _jeton(client)).status_code == 200
+
+
+def test_revocation_par_un_autre_processus(creer_app):
+    # Révocation écrite en base par un autre worker : vue au rafraîchissement de la liste
+    app = creer_app(TOKEN_REVOCATION_REFRESH=0)
+    client = app.test_client()
+    jeton = _jeton(client)
+    assert _moi(client, jeton).status_code == 200
+
+    with app.app_context():
+        serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt='jeton-session')
+        jti = serializer.loads(jeton)['jti']
+        db.session.add(JetonRevoque(jti=jti, expire_le=datetime.utcnow() + timedelta(hours=1)))
+        db.session.commit()
+    assert _moi(client, jeton).status_code == 401
+
+
+def test_rotation_de_la_cle(creer_app):
+    app = creer_app(SECRET_KEY='ancienne-cle')
+    client = app.test_client()
+    jeton = _jeton(client)
+
+    # Nouvelle clé, l'ancienne gardée pour vérifier les jetons déjà émis
+    app.config.update(SECRET_KEY='nouvelle-cle', SECRET_KEY_FALLBACKS=['ancienne-cle'])
+    assert _moi(client, jeton).status_code == 200
+    nouveau = _jeton(client)
+    assert _moi(client, nouveau).status_code == 200
+
+    # Ancienne clé retirée : seuls les jetons signés avec la nouvelle restent valides
+    app.config.update(SECRET_KEY_FALLBACKS=[])
+    assert _moi(client, jeton).status_code == 401
+    assert _moi(client, nouveau).status_code == 200
+
+
+def test_jeton_expire(creer_app):
+    app = creer_app(TOKEN_MAX_AGE=-1)
+    client = app.test_client()
+    assert _moi(client, _jeton(client)).status_code == 401
@@ -0,0 +1,135 @@
+import json
+import logging
+import queue
+import sys
+
+import pytest
+
+from app import journal
+from app.journal import FiltreEchantillonnage, FormateurJson, GestionnaireFile
+
+
+def _record(niveau=logging.INFO, message="Message %s", args=("formaté",), **extra):
+    record = logging.LogRecord('app.test', niveau, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_formateur_json():
+    ligne = json.loads(FormateurJson().format(_record(request_id="abc", montant=12.5, _interne=1, objet=object())))
+    assert ligne["niveau"] == "INFO"
+    assert ligne["logger"] == "app.test"
+    assert ligne["message"] == "Message formaté"
+    assert ligne["date"].endswith("+00:00")
+    # Champs "extra" ajoutés tels quels (str() pour les autres types), attributs privés ignorés
+    assert (ligne["request_id"], ligne["montant"]) == ("abc", 12.5)
+    assert ligne["objet"].startswith("<object")
+    assert "_interne" not in ligne and "args" not in ligne and "exception" not in ligne
+
+
+def test_formateur_json_exception():
+    try:
+        raise ValueError("détail")
+    except ValueError:
+        record = _record(message="Échec", args=None)
+        record.exc_info = sys.exc_info()
+    ligne = json.loads(FormateurJson().format(record))
+    assert "ValueError: détail" in ligne["exception"]
+
+
+def test_echantillonnage_debug(monkeypatch):
+    filtre = FiltreEchantillonnage(0.25)
+    monkeypatch.setattr(journal.random, 'random', lambda: 0.5)
+    assert not filtre.filter(_record(logging.DEBUG))
+    # Taux propre au message, et niveaux supérieurs jamais échantillonnés
+    assert filtre.filter(_record(logging.DEBUG, echantillon=1))
+    assert filtre.filter(_record(logging.DEBUG, echantillon=0.75))
+    assert filtre.filter(_record(logging.INFO))
+    monkeypatch.setattr(journal.random, 'random', lambda: 0.2)
+    assert filtre.filter(_record(logging.DEBUG))
+    assert not filtre.filter(_record(logging.DEBUG, echantillon=0))
+
+
+def test_echantillonnage_proportion():
+    filtre = FiltreEchantillonnage(0.1)
+    gardes = sum(filtre.filter(_record(logging.DEBUG)) for _ in range(10_000))
+    assert 700 < gardes < 1300
+
+
+def test_file_pleine_messages_comptes():
+    file = queue.Queue(maxsize=2)
+    gestionnaire = GestionnaireFile(file)
+    for i in range(5):
+        gestionnaire.emit(_record(message="Message %d", args=(i,)))
+    # La requête n'attend pas : trois messages abandonnés et comptés
+    assert gestionnaire.perdus == 3
+    assert [file.get_nowait().message for _ in range(2)] == ["Message 0", "Message 1"]
+
+    # Place libérée : le nombre d'abandons est signalé avant le message suivant
+    gestionnaire.emit(_record(message="Message 5", args=()))
+    avertissement, suivant = file.get_nowait(), file.get_nowait()
+    assert (avertissement.levelname, avertissement.name) == ("WARNING", "app.journal")
+    assert avertissement.getMessage() == "3 messages de journal abandonnés (file pleine)"
+    assert suivant.getMessage() == "Message 5"
+    assert gestionnaire.perdus == 0
+
+
+def test_message_prepare_autonome():
+    gestionnaire = GestionnaireFile(queue.Queue())
+    try:
+        raise RuntimeError("trace")
+    except RuntimeError:
+        record = _record(message="Erreur %s", args=({"cle": "valeur"},))
+        record.exc_info = sys.exc_info()
+    prepare = gestionnaire.prepare(record)
+    # Message final et trace en texte, sans référence aux arguments ni à l'exception
+    assert (prepare.msg, prepare.args, prepare.exc_info) == ("Erreur {'cle': 'valeur'}", None, None)
+    assert "RuntimeError: trace" in prepare.exc_text
+    assert record.exc_info is not None
+
+
+@pytest.fixture
+def messages():
+    # Messages des loggers "app.*" tels que préparés pour le thread d'écriture
+    file = queue.Queue()
+    gestionnaire = GestionnaireFile(file)
+    racine = logging.getLogger('app')
+    racine.addHandler(gestionnaire)
+
+    def lire():
+        lus = []
+        while not file.empty():
+            lus.append(file.get_nowait())
+        return lus
+
+    yield lire
+    racine.removeHandler(gestionnaire)
+
+
+def test_id_requete_renvoye(client):
+    assert client.get('/total/tr', headers={'X-Request-ID': 'proxy-123:a.b_c'}).headers['X-Request-ID'] == 'proxy-123:a.b_c'
+    # Absent ou invalide : identifiant généré
+    for entete in ({}, {'X-Request-ID': 'avec espace'}, {'X-Request-ID': 'x' * 129}, {'X-Request-ID': 'a/b'}):
+        identifiant = client.get('/total/tr', headers=entete).headers['X-Request-ID']
+        assert len(identifiant) == 32 and identifiant != entete.get('X-Request-ID')
+    assert client.get('/total/tr').headers['X-Request-ID'] != client.get('/total/tr').headers['X-Request-ID']
+
+
+def test_id_requete_propage(creer_app, messages):
+    app = creer_app(LOG_REQUESTS=True)
+    client = app.test_client()
+    messages()
+
+    # Message d'une route (ici une erreur) et ligne de fin de requête portent le même identifiant
+    response = client.put('/update/four/1', data='pas du json', content_type='application/json', headers={'X-Request-ID': 'req-1'})
+    lus = messages()
+    assert {record.name for record in lus} >= {'app.routes', 'app.requetes'}
+    assert {record.request_id for record in lus} == {'req-1'}
+    [requete] = [record for record in lus if record.name == 'app.requetes']
+    assert (requete.methode, requete.route, requete.statut) == ('PUT', '/update/four/<int:id>', response.status_code)
+    assert requete.duree_ms >= 0
+
+    # Hors requête : pas d'identifiant
+    logging.getLogger('app.test').warning("Hors requête")
+    [hors_requete] = messages()
+    assert not hasattr(hors_requete, 'request_id')
@@ -0,0 +1,42 @@
+import pytest
+
+from tests.conftest import peupler
+
+
+def _requetes(creer_app, requetes_sql, nb_fournisseurs, chemin):
+    # Nombre de requêtes SQL de GET "chemin" avec nb_fournisseurs fournisseurs ayant
+    # chacun nb_fournisseurs bénéficiaires ; "chemin" reçoit les premiers ids créés
+    app = creer_app()
+    fournisseur_ids, beneficiaire_ids = peupler(app, nb_fournisseurs, nb_beneficiaires=nb_fournisseurs)
+    compteur = requetes_sql(app)
+    response, nombre = compteur.compter(
+        app.test_client().get, chemin.format(fournisseur=fournisseur_ids[0], beneficiaire=beneficiaire_ids[0])
+    )
+    assert response.status_code == 200
+    return response.get_json(), nombre
+
+
+@pytest.mark.parametrize('chemin', ['/all/four', '/all/benef', '/four/{fournisseur}', '/benef/{beneficiaire}'])
+def test_nombre_de_requetes_constant(creer_app, requetes_sql, chemin):
+    _, peu = _requetes(creer_app, requetes_sql, 2, chemin)
+    _, beaucoup = _requetes(creer_app, requetes_sql, 20, chemin)
+    assert peu == beaucoup
+
+
+def test_liste_des_fournisseurs_avec_beneficiaires(creer_app, requetes_sql):
+    donnees, _ = _requetes(creer_app, requetes_sql, 3, '/all/four')
+    fournisseurs = donnees['fournisseurs']
+    assert len(fournisseurs) == 3
+    assert [len(fournisseur['beneficiaires']) for fournisseur in fournisseurs] == [3, 3, 3]
+
+
+def test_fournisseur_par_id(creer_app, requetes_sql):
+    donnees, _ = _requetes(creer_app, requetes_sql, 2, '/four/{fournisseur}')
+    fournisseur = donnees['fournisseur']
+    assert fournisseur['nom'] == 'Fournisseur 0'
+    assert len(fournisseur['beneficiaires']) == 2
+
+
+def test_beneficiaire_par_id(creer_app, requetes_sql):
+    donnees, _ = _requetes(creer_app, requetes_sql, 2, '/benef/{beneficiaire}')
+    assert donnees['beneficiaire']['nom'] == 'Bénéficiaire 0-0'
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from prometheus_client import REGISTRY
+
+from app.prechauffage import prechauffer
+
+BACK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _requetes(route, statut='200'):
+    return REGISTRY.get_sample_value('http_requests_total', {'method': 'GET', 'route': route, 'status': statut}) or 0
+
+
+def test_requetes_mesurees(client):
+    avant = _requetes('/four/<int:id>', '404')
+    assert client.get('/four/999').status_code == 404
+    assert _requetes('/four/<int:id>', '404') == avant + 1
+
+    response = client.get('/metrics')
+    assert response.content_type.startswith('text/plain')
+    assert 'http_requests_total{method="GET",route="/four/<int:id>",status="404"}' in response.text
+    assert 'db_statements_per_request_bucket' in response.text
+
+
+def test_prechauffage_non_mesure(creer_app):
+    app = creer_app(WARMUP_PATHS=['/total/fr'])
+    avant = _requetes('/total/fr')
+    prechauffer(app, 1)
+    assert _requetes('/total/fr') == avant
+    app.test_client().get('/total/fr')
+    assert _requetes('/total/fr') == avant + 1
+
+
+def test_metriques_additionnees_entre_processus(tmp_path):
+    # Deux processus (workers) écrivent dans PROMETHEUS_MULTIPROC_DIR ; /metrics de l'un
+    # expose la somme des deux
+    script = textwrap.dedent('''
+        import multiprocessing
+        from tests.conftest import CONFIG_TEST
+        from app import create_app
+
+        def servir(nb):
+            client = create_app(CONFIG_TEST).test_client()
+            for _ in range(nb):
+                client.get('/total/tr')
+
+        if __name__ == '__main__':
+            contexte = multiprocessing.get_context('fork')
+            for nb in (2, 3):
+                processus = contexte.Process(target=servir, args=(nb,))
+                processus.start()
+                processus.join()
+            print(create_app(CONFIG_TEST).test_client().get('/metrics').text)
+    ''')
+    dossier = tmp_path / 'metriques'
+    dossier.mkdir()
+    sortie = subprocess.run(
+        [sys.executable, '-c', script], cwd=BACK, capture_output=True, text=True, check=True,
+        env={**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(dossier)},
+    ).stdout
+    assert 'http_requests_total{method="GET",route="/total/tr",status="200"} 5.0' in sortie
@@ -0,0 +1,141 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Beneficiaire, Fournisseur, Transaction
+
+NOMS = ("Alpha", "alphabet", "ALPHONSE", "Beta_1", "Beta21", "Taux 100%", "Taux 1000", "Gamma alpha")
+
+
+@pytest.fixture
+def fournisseur_ids(app):
+    # Un fournisseur par nom (taux_jour 590, 591, ...) et un bénéficiaire de même nom
+    ids = []
+    with app.app_context():
+        for i, nom in enumerate(NOMS):
+            transaction = Transaction(montant_FCFA=600_000, taux_convenu=600, montant_USDT=1000)
+            fournisseur = Fournisseur(nom=nom, taux_jour=590 + i, quantite_USDT=1000, transaction=transaction)
+            fournisseur.beneficiaires = [Beneficiaire(nom=nom, commission_USDT=1)]
+            db.session.add(transaction)
+            db.session.flush()
+            ids.append(fournisseur.id)
+        db.session.commit()
+    return ids
+
+
+def _chercher(client, route, cle, **parametres):
+    response = client.get(route, query_string=parametres)
+    assert response.status_code == 200
+    corps = response.get_json()
+    return corps[cle], corps['next']
+
+
+def _noms_fournisseurs(client, **parametres):
+    return [f['nom'] for f in _chercher(client, '/four/search', 'fournisseurs', **parametres)[0]]
+
+
+def _noms_beneficiaires(client, **parametres):
+    return [b['nom'] for b in _chercher(client, '/benef/search', 'beneficiaires', **parametres)[0]]
+
+
+@pytest.mark.parametrize('recherche', [_noms_fournisseurs, _noms_beneficiaires])
+def test_prefixe_et_sous_chaine(client, fournisseur_ids, recherche):
+    assert recherche(client, nom='alph', mode='prefixe') == ["Alpha", "alphabet", "ALPHONSE"]
+    assert recherche(client, nom='alph') == ["Alpha", "alphabet", "ALPHONSE", "Gamma alpha"]
+    assert recherche(client, nom='ALPHA', mode='contient') == ["Alpha", "alphabet", "Gamma alpha"]
+    assert recherche(client, nom='lpha', mode='prefixe') == []
+
+
+@pytest.mark.parametrize('recherche', [_noms_fournisseurs, _noms_beneficiaires])
+def test_caracteres_like_echappes(client, fournisseur_ids, recherche):
+    # "_" et "%" sont cherchés littéralement, pas comme jokers
+    assert recherche(client, nom='beta_') == ["Beta_1"]
+    assert recherche(client, nom='100%') == ["Taux 100%"]
+    assert recherche(client, nom='%') == ["Taux 100%"]
+    assert recherche(client, nom='_', mode='prefixe') == []
+
+
+def test_fournisseurs_par_taux(client, fournisseur_ids):
+    assert _noms_fournisseurs(client, taux_min=592, taux_max=594) == ["ALPHONSE", "Beta_1", "Beta21"]
+    assert _noms_fournisseurs(client, nom='alph', taux_min='591.5') == ["ALPHONSE", "Gamma alpha"]
+    assert _noms_fournisseurs(client, taux_max=590) == ["Alpha"]
+
+
+def test_beneficiaires_par_fournisseur(client, fournisseur_ids):
+    assert _noms_beneficiaires(client, fournisseur_id=fournisseur_ids[3]) == ["Beta_1"]
+    assert _noms_beneficiaires(client, nom='alpha', fournisseur_id=fournisseur_ids[0]) == ["Alpha"]
+
+
+@pytest.mark.parametrize('route, cle', [('/four/search', 'fournisseurs'), ('/benef/search', 'beneficiaires')])
+def test_pagination_par_id(client, fournisseur_ids, route, cle):
+    pages, after = [], None
+    while True:
+        lignes, after = _chercher(client, route, cle, nom='a', limit=3, **({'after': after} if after else {}))
+        pages.append([ligne['nom'] for ligne in lignes])
+        if after is None:
+            break
+    assert pages == [["Alpha", "alphabet", "ALPHONSE"], ["Beta_1", "Beta21", "Taux 100%"], ["Taux 1000", "Gamma alpha"]]
+
+
+@pytest.mark.parametrize('route, parametres', [
+    ('/four/search', {'taux_min': 'abc'}),
+    ('/four/search', {'taux_max': 'nan'}),
+    ('/four/search', {'taux_min': 'inf'}),
+    ('/four/search', {'nom': 'a', 'mode': 'regex'}),
+    ('/four/search', {'after': 'x'}),
+    ('/four/search', {'limit': '0'}),
+    ('/benef/search', {'fournisseur_id': 'un'}),
+    ('/benef/search', {'after': '-1'}),
+    ('/trans/search', {'montant_min': 'beaucoup'}),
+    ('/trans/search', {'usdt_max': 'nan'}),
+    ('/trans/search', {'debut': '01/03/2026'}),
+    ('/trans/search', {'fin': 'demain'}),
+    ('/trans/search', {'after': 'pas-un-curseur'}),
+])
+def test_bornes_invalides(client, route, parametres):
+    response = client.get(route, query_string=parametres)
+    assert response.status_code == 400
+    assert response.get_json()['message']
+
+
+@pytest.fixture
+def transactions(client):
+    # Six transactions datées, de part et d'autre du changement de mois
+    lignes = [
+        {"montantFCFA": montant, "tauxConv": 500, "dateTransaction": date.isoformat()}
+        for montant, date in (
+            (50_000, datetime(2026, 2, 27, 9)),
+            (100_000, datetime(2026, 2, 28, 23, 59)),
+            (150_000, datetime(2026, 3, 1)),
+            (200_000, datetime(2026, 3, 1, 12)),
+            (250_000, datetime(2026, 3, 2, 8)),
+            (300_000, datetime(2026, 3, 5)),
+        )
+    ]
+    assert client.post('/trans/bulk', json=lignes).status_code == 201
+
+
+def _montants(client, **parametres):
+    lignes, _ = _chercher(client, '/trans/search', 'transactions', **parametres)
+    return [ligne['montantFCFA'] for ligne in lignes]
+
+
+def test_transactions_par_intervalles(client, transactions):
+    # fin exclue, debut inclus
+    assert _montants(client, debut='2026-03-01', fin='2026-03-02T08:00:00') == [150_000, 200_000]
+    assert _montants(client, montant_min=100_000, montant_max=200_000) == [100_000, 150_000, 200_000]
+    # Montants USDT : montant / 500
+    assert _montants(client, usdt_min='400.5', usdt_max=500) == [250_000]
+    assert _montants(client, debut='2026-02-28', usdt_max=300) == [100_000, 150_000]
+
+
+def test_transactions_pagination(client, transactions):
+    pages, after = [], None
+    while True:
+        parametres = {'montant_min': 100_000, 'limit': 2, **({'after': after} if after else {})}
+        lignes, after = _chercher(client, '/trans/search', 'transactions', **parametres)
+        pages.append([ligne['montantFCFA'] for ligne in lignes])
+        if after is None:
+            break
+    assert pages == [[100_000, 150_000], [200_000, 250_000], [300_000]]
@@ -0,0 +1,60 @@
+import os
+import shutil
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from app import MIGRATIONS_DIR, compteurs
+from app.schema import derniere_revision, revision_head
+
+BACK = os.path.dirname(MIGRATIONS_DIR)
+
+
+def test_revision_head():
+    assert revision_head(MIGRATIONS_DIR) == '0008'
+    # Lecture rapide du démarrage : même révision que celle d'alembic
+    assert derniere_revision(MIGRATIONS_DIR) == revision_head(MIGRATIONS_DIR)
+
+
+def test_demarrage_sans_alembic_si_base_a_jour(tmp_path):
+    script = textwrap.dedent('''
+        import sys
+        from tests.conftest import CONFIG_TEST
+        from app import create_app
+
+        config = {**CONFIG_TEST, 'SQLALCHEMY_DATABASE_URI': sys.argv[1]}
+        create_app(config)
+        for nom in [nom for nom in sys.modules if nom.split('.')[0] in ('alembic', 'flask_migrate')]:
+            del sys.modules[nom]
+        create_app(config)
+        print(sorted(nom for nom in sys.modules if nom.split('.')[0] in ('alembic', 'flask_migrate')))
+    ''')
+    sortie = subprocess.run(
+        [sys.executable, '-c', script, f"sqlite:///{tmp_path / 'base.db'}"],
+        cwd=BACK, capture_output=True, text=True, check=True,
+    ).stdout
+    assert sortie.strip().splitlines()[-1] == '[]'
+
+
+def test_plusieurs_heads_refusees(tmp_path):
+    dossier = tmp_path / 'migrations'
+    shutil.copytree(MIGRATIONS_DIR, dossier, ignore=shutil.ignore_patterns('__pycache__'))
+    (dossier / 'versions' / '0008_bis.py').write_text(
+        "revision = '0008bis'\ndown_revision = '0007'\nbranch_labels = None\ndepends_on = None\n"
+    )
+    with pytest.raises(RuntimeError):
+        revision_head(str(dossier))
+
+
+def test_donnees_derivees_initialisees_apres_migration_seulement(creer_app, tmp_path, monkeypatch):
+    appels = []
+    monkeypatch.setattr(compteurs, 'initialiser_compteurs', lambda: appels.append('compteurs'))
+    config = {'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'base.db'}"}
+
+    creer_app(**config)
+    assert appels == ['compteurs']
+    # Schéma déjà à jour : le démarrage suivant ne relit pas les tables
+    creer_app(**config)
+    assert appels == ['compteurs']
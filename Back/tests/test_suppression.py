@@ -0,0 +1,95 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app import db
+from app.cache import cle_beneficiaire, cle_fournisseur
+from app.models import Benefice, Beneficiaire, Fournisseur, Transaction, VolumeJournalier
+
+
+def _arbre(app, client, montant=600_000, date=None):
+    # Une transaction, un fournisseur et deux bénéficiaires créés par l'API (compteurs tenus à
+    # jour) ; la date d'une transaction n'est fixée que par l'import en masse
+    if date:
+        donnees = {"montantFCFA": montant, "tauxConv": 600, "dateTransaction": date.isoformat()}
+        assert client.post('/trans/bulk', json=[donnees]).status_code == 201
+        with app.app_context():
+            transaction_id = db.session.scalar(select(func.max(Transaction.id)))
+    else:
+        transaction_id = client.post('/trans/add', json={"montantFCFA": montant, "tauxConv": 600}).get_json()['transaction']['id']
+    nom = f"Fournisseur {transaction_id}"
+    fournisseur = client.post('/add/four', json={
+        "nom": nom, "taux_jour": 590, "quantite_USDT": 1000, "transaction_id": transaction_id,
+    }).get_json()['fournisseur']
+    beneficiaires = [
+        client.post('/add/benef', json={"nom": f"{nom}-{j}", "commission_USDT": 1, "fournisseur_nom": nom}).get_json()['beneficiaire']
+        for j in range(2)
+    ]
+    return transaction_id, fournisseur['id'], [b['id'] for b in beneficiaires]
+
+
+def _compter(app, modele):
+    with app.app_context():
+        return db.session.scalar(select(func.count()).select_from(modele))
+
+
+def _resume(client):
+    resume = client.get('/dashboard/summary').get_json()
+    return resume['total_transactions'], resume['total_fournisseurs'], resume['total_beneficiaires']
+
+
+def test_suppression_en_cascade(creer_app):
+    app = creer_app(ENTITY_CACHE_BACKEND='memoire')
+    client = app.test_client()
+    transaction_id, fournisseur_id, beneficiaire_ids = _arbre(app, client)
+    _arbre(app, client, montant=1_200_000)
+
+    # Documents mis en cache avant la suppression
+    assert client.get(f'/four/{fournisseur_id}').status_code == 200
+    assert client.get(f'/benef/{beneficiaire_ids[0]}').status_code == 200
+    assert _resume(client) == (2, 2, 4)
+
+    assert client.delete(f'/trans/delete/{transaction_id}').status_code == 200
+
+    assert (_compter(app, Fournisseur), _compter(app, Beneficiaire), _compter(app, Benefice)) == (1, 2, 1)
+    assert _resume(client) == (1, 1, 2)
+    cache = app.extensions['cache_entites']
+    assert cache.get(cle_fournisseur(fournisseur_id)) is None
+    assert cache.get(cle_beneficiaire(beneficiaire_ids[0])) is None
+    assert client.get(f'/four/{fournisseur_id}').status_code == 404
+    assert client.get(f'/benef/{beneficiaire_ids[0]}').status_code == 404
+    assert client.delete(f'/trans/delete/{transaction_id}').status_code == 404
+
+
+def test_suppression_en_masse(app, client):
+    ids = [_arbre(app, client, date=datetime(2026, 3, jour, 10))[0] for jour in (1, 2, 3)]
+    _arbre(app, client, date=datetime(2026, 4, 1, 10))
+
+    response = client.delete('/trans/delete', json={"ids": ids[:2]})
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "message": "2 transaction(s) supprimée(s)", "transactions": 2, "fournisseurs": 2, "beneficiaires": 4,
+    }
+    assert _resume(client) == (2, 2, 4)
+
+    # Par période : reste de mars
+    response = client.delete('/trans/delete', json={"debut": "2026-03-01", "fin": "2026-04-01"})
+    assert response.get_json()['transactions'] == 1
+    assert _resume(client) == (1, 1, 2)
+    assert (_compter(app, Fournisseur), _compter(app, Beneficiaire), _compter(app, Benefice)) == (1, 2, 1)
+    with app.app_context():
+        jours = db.session.execute(
+            select(VolumeJournalier.jour, func.sum(VolumeJournalier.nb_transactions)).group_by(VolumeJournalier.jour)
+        ).all()
+        assert [(str(jour), nb) for jour, nb in jours if nb] == [('2026-04-01', 1)]
+
+    assert client.delete('/trans/delete', json={"ids": "1"}).status_code == 400
+    assert client.delete('/trans/delete', json={}).status_code == 400
+
+
+def test_suppression_fournisseur(app, client):
+    transaction_id, fournisseur_id, _ = _arbre(app, client)
+    assert client.delete(f'/delete/four/{fournisseur_id}').status_code == 200
+    assert _resume(client) == (1, 0, 0)
+    assert _compter(app, Beneficiaire) == 0
+    assert client.delete(f'/delete/four/{fournisseur_id}').status_code == 404
@@ -0,0 +1,75 @@
+import json
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Transaction
+from tests.conftest import peupler
+
+
+def _transactions(app, nombre):
+    # Transactions à dates distinctes (une par minute), écrites directement en base
+    debut = datetime(2026, 1, 1, 9, 0)
+    with app.app_context():
+        db.session.add_all(
+            Transaction(montant_FCFA=600_000 + i, taux_convenu=600, montant_USDT=1000,
+                        date_transaction=debut + timedelta(minutes=i))
+            for i in range(nombre)
+        )
+        db.session.commit()
+
+
+def test_liste_sans_limit_plafonnee(creer_app):
+    app = creer_app(TRANS_ALL_MAX_ROWS=3)
+    _transactions(app, 5)
+    client = app.test_client()
+
+    premiere = client.get('/trans/all').get_json()
+    assert [int(t['montantFCFA']) for t in premiere['transactions']] == [600_000, 600_001, 600_002]
+    assert premiere['next']
+
+    suite = client.get(f"/trans/all?after={premiere['next']}").get_json()
+    assert [int(t['montantFCFA']) for t in suite['transactions']] == [600_003, 600_004]
+    assert suite['next'] is None
+
+
+def test_liste_sans_limit_complete(creer_app):
+    app = creer_app(TRANS_ALL_MAX_ROWS=10)
+    _transactions(app, 5)
+    donnees = app.test_client().get('/trans/all').get_json()
+    assert len(donnees['transactions']) == 5
+    assert donnees['next'] is None
+
+
+def test_liste_vide(client):
+    assert client.get('/trans/all').status_code == 404
+
+
+def test_pagination(app, client):
+    _transactions(app, 5)
+    page = client.get('/trans/all?limit=2').get_json()
+    assert len(page['transactions']) == 2
+    page = client.get(f"/trans/all?limit=2&after={page['next']}").get_json()
+    assert [int(t['montantFCFA']) for t in page['transactions']] == [600_002, 600_003]
+    assert client.get('/trans/all?limit=abc').status_code == 400
+
+
+def test_ndjson(app, client):
+    _transactions(app, 3)
+    response = client.get('/trans/all?format=ndjson')
+    lignes = [json.loads(ligne) for ligne in response.get_data(as_text=True).splitlines()]
+    assert response.mimetype == 'application/x-ndjson'
+    assert [int(ligne['montantFCFA']) for ligne in lignes] == [600_000, 600_001, 600_002]
+
+
+def test_montants_en_nombres_partout(app, client):
+    # Même colonne Numeric, même encodage JSON dans la liste, le flux NDJSON et le fournisseur
+    [fournisseur_id], _ = peupler(app, 1)
+    [transaction] = client.get('/trans/all').get_json()['transactions']
+    [ligne] = [json.loads(ligne) for ligne in client.get('/trans/all?format=ndjson').get_data(as_text=True).splitlines()]
+    fournisseur = client.get(f'/four/{fournisseur_id}').get_json()['fournisseur']
+
+    assert transaction == ligne
+    assert (transaction['montantFCFA'], transaction['tauxConv'], transaction['montantUSDT']) == (600_000, 600, 1000)
+    assert isinstance(transaction['montantUSDT'], float)
+    assert transaction['montantUSDT'] == fournisseur['transaction']['montant_USDT']
+    assert fournisseur['taux_jour'] == 590
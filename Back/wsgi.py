@@ -0,0 +1,4 @@
+from app import create_app
+
+# Mode production : gunicorn -c gunicorn.conf.py (le serveur de développement reste run.py)
+app = create_app()